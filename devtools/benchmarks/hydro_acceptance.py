@@ -0,0 +1,85 @@
+"""
+Acceptance rate benchmark for hydropathy-conditioned residue distributions.
+
+hydro_seq draws random sequences and keeps the first one whose mean
+hydropathy is within allowed_error of the objective. This compares how
+many draws are accepted when residues come from:
+
+    binned      - the HydroDict / NeutralHydroDict list for the objective
+                  rounded to 0.1 (how hydro_seq used to pick residues)
+    continuous  - hydropathy_sampler.hydropathy_distribution, which is
+                  centred on the objective itself
+
+Objectives between the 0.1 bins are used on purpose (e.g. 2.04, 2.27)
+because those are where the binned lists are centred on the wrong value.
+The direct composition path in hydro_seq is not used here, only the
+random draws that it falls back to.
+
+Usage:
+    python hydro_acceptance.py [--length 100] [--draws 20000] [--neutral]
+"""
+import argparse
+
+import numpy as np
+
+from goose.backend.hydropathy_sampler import hydropathy_distribution, HYDROPATHY
+from goose.backend.residue_sampler import ResidueSampler, dict_sampler
+from goose.backend.disorder_lookup import AMINO_ACIDS
+
+
+def binned_sampler(mean_hydro, just_neutral):
+    '''
+    the sampler hydro_seq used before hydropathy_distribution
+    '''
+    rounded_value = str(round(mean_hydro, 1))
+    final_value = "{}_{}".format(rounded_value[0], rounded_value[2])
+    if just_neutral == False:
+        if mean_hydro > 6.1:
+            return dict_sampler('HydroDict', 'Hydro_dis_6_1')
+        return dict_sampler('HydroDict', 'Hydro_dis_' + final_value)
+    if mean_hydro > 9.0:
+        return dict_sampler('NeutralHydroDict', 'Neutral_hydro_dis_9_0')
+    if mean_hydro <= 1.0:
+        return dict_sampler('NeutralHydroDict', 'Neutral_hydro_dis_1_0')
+    return dict_sampler('NeutralHydroDict', 'Neutral_hydro_dis_' + final_value)
+
+
+def acceptance_rate(sampler, mean_hydro, length, draws, allowed_error, rng):
+    '''
+    returns the fraction of draws with a mean hydropathy within allowed_error
+    of mean_hydro (using the same rounding as hydro_seq)
+    '''
+    codes = sampler.sample_codes(draws, length, rng=rng)
+    positions = np.searchsorted(np.frombuffer(''.join(AMINO_ACIDS).encode('ascii'), dtype=np.uint8), codes)
+    hydropathy = np.round(HYDROPATHY[positions].mean(axis=1), 4)
+    return float(np.mean(np.abs(mean_hydro - hydropathy) <= allowed_error))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hydro_seq acceptance rates')
+    parser.add_argument('--length', type=int, default=100, help='Length of the sequences drawn')
+    parser.add_argument('--draws', type=int, default=20000, help='Number of sequences drawn per objective')
+    parser.add_argument('--allowed-error', type=float, default=0.05, help='Allowed hydropathy error')
+    parser.add_argument('--neutral', action='store_true', help='Use NeutralHydroDict (just_neutral=True)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random draws')
+    args = parser.parse_args()
+
+    start, stop = (1.0, 6.1) if args.neutral else (0.2, 6.1)
+    objectives = np.round(np.arange(start, stop, 0.23), 2)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'objective':>9s} {'binned':>8s} {'continuous':>10s}")
+    binned_rates, continuous_rates = [], []
+    for mean_hydro in objectives:
+        binned = acceptance_rate(binned_sampler(mean_hydro, args.neutral), mean_hydro,
+                                 args.length, args.draws, args.allowed_error, rng)
+        continuous = acceptance_rate(ResidueSampler(hydropathy_distribution(mean_hydro, just_neutral=args.neutral)),
+                                     mean_hydro, args.length, args.draws, args.allowed_error, rng)
+        binned_rates.append(binned)
+        continuous_rates.append(continuous)
+        print(f'{mean_hydro:9.2f} {binned:8.4f} {continuous:10.4f}')
+    print(f"{'mean':>9s} {np.mean(binned_rates):8.4f} {np.mean(continuous_rates):10.4f}")
+
+
+if __name__ == '__main__':
+    main()
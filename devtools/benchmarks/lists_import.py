@@ -0,0 +1,113 @@
+"""
+Import time and memory benchmark for goose.backend.lists.
+
+Each measurement is run in a fresh Python process. numpy is imported
+before the timer starts so that only the lists module itself is measured.
+For each module the benchmark reports:
+
+    import   - time and resident memory (RSS) added by importing the module
+    access   - time and RSS added by then using all of the large tables
+               (the lazily loaded version only loads them at this point)
+
+Both a cold import (no cached bytecode) and a warm import (bytecode cached
+by the cold import) are measured.
+
+Usage:
+    python lists_import.py [--legacy path/to/legacy_lists.py] [--repeats 3]
+
+A copy of the old lists.py (with all of the tables as literals) to compare
+against can be pulled out of git with:
+    git show e335d65:goose/backend/lists.py > legacy_lists.py
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+
+LISTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'goose', 'backend', 'lists.py')
+
+# run in the child process. Prints a json dict of the measurements.
+CHILD_SCRIPT = r'''
+import os, sys, time, json, importlib.util
+import numpy
+
+# make sure the cold import leaves bytecode for the warm import
+sys.dont_write_bytecode = False
+
+def rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+path = sys.argv[1]
+start_rss = rss()
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('lists_under_test', path)
+module = importlib.util.module_from_spec(spec)
+sys.modules['lists_under_test'] = module
+spec.loader.exec_module(module)
+import_time = time.perf_counter() - start
+import_rss = rss()
+
+start = time.perf_counter()
+tables = [module.HydroDict, module.NeutralHydroDict, module.alpha_helix_lists,
+          module.aa_dis_val_4_v3, module.disordered_list, module.neutral_IDR_list]
+access_time = time.perf_counter() - start
+access_rss = rss()
+
+print(json.dumps({'import_time': import_time, 'import_rss': import_rss - start_rss,
+                  'access_time': access_time, 'access_rss': access_rss - import_rss}))
+'''
+
+
+def clear_bytecode(path):
+    cache_dir = os.path.join(os.path.dirname(path), '__pycache__')
+    if not os.path.isdir(cache_dir):
+        return
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    for cached in os.listdir(cache_dir):
+        if cached.startswith(module_name + '.'):
+            os.remove(os.path.join(cache_dir, cached))
+
+
+def measure(path, cold):
+    if cold:
+        clear_bytecode(path)
+    output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT, path], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def report(label, path, repeats):
+    for cold in [True, False]:
+        runs = [measure(path, cold) for _ in range(repeats)]
+        best = {key: min([run[key] for run in runs]) for key in runs[0]}
+        print(f"{label:8s} {'cold' if cold else 'warm'}  "
+              f"import {best['import_time']*1000:9.1f} ms {best['import_rss']/1e6:8.1f} MB   "
+              f"access {best['access_time']*1000:9.1f} ms {best['access_rss']/1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark importing goose.backend.lists')
+    parser.add_argument('--legacy', help='Path to a lists.py with the tables as literals to compare against')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of runs of each measurement (best is reported)')
+    args = parser.parse_args()
+
+    report('current', os.path.abspath(LISTS_PATH), args.repeats)
+    if args.legacy is not None:
+        # copy it so its bytecode can be cleared without touching anything else
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy_path = os.path.join(temp_dir, 'legacy_lists.py')
+            shutil.copy(args.legacy, legacy_path)
+            report('legacy', legacy_path, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Accuracy and throughput of disorder lookup tables.
+
+Each table is compared to metapredict on the same set of test sequences.
+The test sequences are random disordered sequences (drawn from the
+HydroDict lists over a range of hydropathy values, so that there are
+sequences that are and aren't predicted to be disordered). For each
+table the benchmark reports:
+
+    mae        - mean absolute difference from the metapredict profiles
+    pearson    - correlation of the per-residue values with metapredict
+    agreement  - fraction of residues on the same side of
+                 parameters.DISORDER_THRESHOLD as metapredict
+    lookups/s  - residues looked up per second with lookup_disorder_batch
+
+The built-in table (aa_dis_val_4_v3) is always included. Other tables are
+made with devtools/scripts/build_lookup_table.py.
+
+Usage:
+    python lookup_table_accuracy.py [table.npz ...] [--sequences 500] [--length 100]
+"""
+import time
+import argparse
+
+import numpy as np
+
+from goose.backend import parameters
+from goose.backend.disorder_lookup import load_lookup_table
+from goose.backend.hydropathy_sampler import hydropathy_distribution
+from goose.backend.residue_sampler import ResidueSampler
+
+
+def test_sequences(num_sequences, length, seed):
+    '''
+    returns num_sequences random sequences with hydropathy from 1 to 6
+    '''
+    rng = np.random.default_rng(seed)
+    sequences = []
+    for mean_hydro in rng.uniform(1, 6, num_sequences):
+        sequences.append(ResidueSampler(hydropathy_distribution(mean_hydro)).sample(length, rng=rng))
+    return sequences
+
+
+def throughput(table, sequences, repeats):
+    '''
+    returns the number of residues looked up per second (best of repeats)
+    '''
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        table.lookup_disorder_batch(sequences)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(sequences) * len(sequences[0]) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare disorder lookup tables to metapredict')
+    parser.add_argument('tables', nargs='*', help='Table files to compare to aa_dis_val_4_v3')
+    parser.add_argument('--sequences', type=int, default=500, help='Number of test sequences')
+    parser.add_argument('--length', type=int, default=100, help='Length of the test sequences')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of runs of the throughput measurement')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the test sequences')
+    args = parser.parse_args()
+
+    import metapredict as meta
+    sequences = test_sequences(args.sequences, args.length, args.seed)
+    reference = np.array([prediction[1] for prediction in meta.predict_disorder_batch(sequences, show_progress_bar=False)])
+    threshold = parameters.DISORDER_THRESHOLD
+
+    print(f"{'table':24s} {'classes':>7s} {'context':>7s} {'mae':>7s} {'pearson':>7s} {'agreement':>9s} {'lookups/s':>12s}")
+    for table in [load_lookup_table(None)] + [load_lookup_table(path) for path in args.tables]:
+        values = table.lookup_disorder_batch(sequences)
+        mae = float(np.mean(np.abs(values - reference)))
+        pearson = float(np.corrcoef(values.ravel(), reference.ravel())[0, 1])
+        agreement = float(np.mean((values >= threshold) == (reference >= threshold)))
+        print(f'{table.name:24s} {len(table.classes):7d} {table.context_length:7d} {mae:7.4f} {pearson:7.4f} {agreement:9.4f} '
+              f'{throughput(table, sequences, args.repeats):12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark for goose.backend.optimizer_state.PropertyState.
+
+Makes random substitutions and swaps to sequences of increasing length
+and times reading the mean hydropathy, FCR, NCPR, sigma and delta after
+every change from a PropertyState against working them out again from
+the whole sequence with the Protein functions (what the optimizers used
+to do). Also checks that the values agree.
+
+Usage:
+    python property_state.py [--changes 200] [--with-delta]
+"""
+import time
+import random
+import argparse
+
+from goose.backend.protein import Protein
+from goose.backend.optimizer_state import PropertyState
+
+
+LENGTHS = [50, 100, 500, 1000, 5000]
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+
+
+def make_changes(length, num_changes):
+    changes = []
+    for _ in range(num_changes):
+        if random.random() < 0.5:
+            changes.append(('substitute', random.randrange(length), random.choice(AMINO_ACIDS)))
+        else:
+            changes.append(('swap', random.randrange(length), random.randrange(length)))
+    return changes
+
+
+def with_state(sequence, changes, with_delta):
+    state = PropertyState(sequence)
+    values = []
+    for change, first, second in changes:
+        if change == 'substitute':
+            state.substitute(first, second)
+        else:
+            state.swap(first, second)
+        current = (state.mean_hydropathy, state.FCR, state.NCPR, state.sigma)
+        if with_delta:
+            current = current + (state.delta,)
+        values.append(current)
+    return values
+
+
+def recomputed(sequence, changes, with_delta):
+    residues = list(sequence)
+    values = []
+    for change, first, second in changes:
+        if change == 'substitute':
+            residues[first] = second
+        else:
+            residues[first], residues[second] = residues[second], residues[first]
+        current_sequence = ''.join(residues)
+        current = (Protein.calc_mean_hydro(current_sequence), Protein.calc_FCR(current_sequence),
+                   Protein.calc_NCPR(current_sequence), Protein.calc_sigma(current_sequence))
+        if with_delta:
+            current = current + (Protein.calc_delta(current_sequence),)
+        values.append(current)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PropertyState against recomputing properties')
+    parser.add_argument('--changes', type=int, default=200, help='Number of substitutions / swaps per sequence')
+    parser.add_argument('--with-delta', action='store_true', help='Also read delta after every change')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random sequences')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"{'length':>7s} {'state':>12s} {'recompute':>12s} {'max diff':>9s}")
+    for length in LENGTHS:
+        sequence = ''.join(random.choices(AMINO_ACIDS, k=length))
+        changes = make_changes(length, args.changes)
+
+        start = time.perf_counter()
+        state_values = with_state(sequence, changes, args.with_delta)
+        state_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recomputed_values = recomputed(sequence, changes, args.with_delta)
+        recompute_time = time.perf_counter() - start
+
+        max_difference = max(abs(a - b) for state_row, recomputed_row in zip(state_values, recomputed_values) for a, b in zip(state_row, recomputed_row))
+        print(f'{length:7d} {state_time*1000:9.2f} ms {recompute_time*1000:9.2f} ms {max_difference:9.1e}')
+
+
+if __name__ == '__main__':
+    main()
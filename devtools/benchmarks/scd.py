@@ -0,0 +1,68 @@
+"""
+Benchmark for Protein.calc_SCD.
+
+Times calc_SCD on random sequences of increasing length up to
+parameters.MAXIMUM_LENGTH and checks that it gives the same values as the
+old version (a double loop over every pair of residues). The old version
+is only timed up to --legacy-max-length because it needs about L**2 / 2
+interpreted iterations (5x10^7 at 10000 residues).
+
+Usage:
+    python scd.py [--legacy-max-length 2000] [--repeats 3]
+
+The old version is pulled out of git with:
+    git show e335d65:goose/backend/protein.py > legacy_protein.py
+and passed with --legacy legacy_protein.py.
+"""
+import time
+import random
+import argparse
+import importlib.util
+
+from goose.backend import parameters
+from goose.backend.protein import Protein
+
+
+LENGTHS = [10, 100, 500, 1000, 2000, 5000, parameters.MAXIMUM_LENGTH]
+
+
+def best_time(function, sequence, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = function(sequence)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def load_legacy(path):
+    spec = importlib.util.spec_from_file_location('legacy_protein', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Protein.calc_SCD
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Protein.calc_SCD')
+    parser.add_argument('--legacy', help='Path to the old protein.py to compare against')
+    parser.add_argument('--legacy-max-length', type=int, default=2000, help='Longest sequence the old version is run on')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of runs of each measurement (best is reported)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random sequences')
+    args = parser.parse_args()
+
+    legacy_SCD = load_legacy(args.legacy) if args.legacy is not None else None
+    random.seed(args.seed)
+    print(f"{'length':>7s} {'calc_SCD':>12s} {'legacy':>12s} {'same':>5s}")
+    for length in LENGTHS:
+        sequence = ''.join(random.choices('ACDEFGHIKLMNPQRSTVWY', k=length))
+        current_time, current_value = best_time(Protein.calc_SCD, sequence, args.repeats)
+        if legacy_SCD is not None and length <= args.legacy_max_length:
+            legacy_time, legacy_value = best_time(legacy_SCD, sequence, 1)
+            print(f'{length:7d} {current_time*1000:9.3f} ms {legacy_time*1000:9.1f} ms {str(current_value == legacy_value):>5s}')
+        else:
+            print(f'{length:7d} {current_time*1000:9.3f} ms {"-":>12s} {"-":>5s}')
+
+
+if __name__ == '__main__':
+    main()
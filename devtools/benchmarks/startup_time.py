@@ -0,0 +1,66 @@
+"""
+Startup time benchmark for goose.
+
+Each measurement is run in a fresh Python process and reports:
+
+    import goose        - time to import goose
+    first sequence      - time from the start of the process to the first
+                          create.sequence (includes importing goose and
+                          whatever the first prediction loads)
+    first properties    - time from the start of the process to the first
+                          analyze.properties
+
+It also lists which of the heavy dependencies (metapredict, torch,
+PredictDSSP, sparrow) are loaded right after importing goose. None of
+them should be; they are only imported the first time they are used.
+
+Usage:
+    python startup_time.py [--repeats 3] [--length 100]
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+
+HEAVY_MODULES = ['metapredict', 'torch', 'PredictDSSP', 'sparrow']
+
+# run in the child process. Prints a json dict of the measurements.
+CHILD_SCRIPT = r'''
+import sys, time, json
+start = time.perf_counter()
+import goose
+import_time = time.perf_counter() - start
+loaded = [name for name in json.loads(sys.argv[3]) if name in sys.modules]
+if sys.argv[1] == 'sequence':
+    goose.create.sequence(int(sys.argv[2]))
+elif sys.argv[1] == 'properties':
+    goose.analyze.properties('MDEKRSGQNPTAVLIFWYHC' * (int(sys.argv[2]) // 20 + 1))
+first_time = time.perf_counter() - start
+print(json.dumps({'import_time': import_time, 'first_time': first_time, 'loaded': loaded}))
+'''
+
+
+def measure(task, length):
+    output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT, task, str(length), json.dumps(HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark goose startup time')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of runs of each measurement (best is reported)')
+    parser.add_argument('--length', type=int, default=100, help='Length of the sequence made / analyzed')
+    args = parser.parse_args()
+
+    import_runs = [measure('import', args.length) for _ in range(args.repeats)]
+    print(f"import goose      {min([run['import_time'] for run in import_runs])*1000:9.1f} ms")
+    loaded = import_runs[0]['loaded']
+    print(f"loaded on import  {', '.join(loaded) if loaded else 'none of ' + ', '.join(HEAVY_MODULES)}")
+    for task, label in [('sequence', 'first sequence'), ('properties', 'first properties')]:
+        runs = [measure(task, args.length) for _ in range(args.repeats)]
+        print(f"{label:17s} {min([run['first_time'] for run in runs])*1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
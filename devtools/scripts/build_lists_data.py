@@ -0,0 +1,90 @@
+"""
+Builds goose/data/goose_lists.npz, the binary file that holds the large
+tables used by goose.backend.lists, from a Python module that defines
+them as literals (the format lists.py used to be in).
+
+The weighted amino acid lists are stored as uint8 arrays of the amino
+acid letters (in their original order), the dicts of lists are stored as
+arrays of keys and the names of the lists they point to, and the
+aa_dis_val_4_v3 disorder values (which have 3 decimal places) are stored
+as integer thousandths so that they load back as exactly the same floats.
+
+Usage:
+    python build_lists_data.py path/to/legacy_lists.py [--out goose/data/goose_lists.npz]
+
+A legacy copy of lists.py can be pulled out of git with:
+    git show e335d65:goose/backend/lists.py > legacy_lists.py
+"""
+import os
+import argparse
+import importlib.util
+
+import numpy as np
+
+
+# names that are kept as literals in lists.py rather than in the data file
+SMALL_LISTS = ['starter_disordered', 'amino_acids', 'D_E', 'K_R', 'charged_list']
+
+# dicts whose values are other lists in the module
+LIST_DICTS = ['HydroDict', 'NeutralHydroDict', 'alpha_helix_lists']
+
+DISORDER_TABLE = 'aa_dis_val_4_v3'
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location('legacy_lists', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_arrays(module):
+    arrays = {}
+    list_names = []
+    for name, value in vars(module).items():
+        if name.startswith('__') or name in SMALL_LISTS or name in LIST_DICTS or name == DISORDER_TABLE:
+            continue
+        if type(value) == list:
+            arrays[name] = np.frombuffer(''.join(value).encode('ascii'), dtype=np.uint8)
+            list_names.append(name)
+
+    # the dicts point at the lists above, several keys can point at the same list
+    for dict_name in LIST_DICTS:
+        keys = []
+        targets = []
+        for key, value in getattr(module, dict_name).items():
+            target = [name for name in list_names if getattr(module, name) is value]
+            if len(target) != 1:
+                raise ValueError(f'Could not find the list for {dict_name}[{key}]')
+            keys.append(key)
+            targets.append(target[0])
+        arrays[f'{dict_name}__keys'] = np.array(keys)
+        arrays[f'{dict_name}__lists'] = np.array(targets)
+
+    table = getattr(module, DISORDER_TABLE)
+    values = np.array(list(table.values()), dtype=np.float64)
+    thousandths = np.round(values * 1000).astype(np.uint16)
+    if not np.array_equal(thousandths / 1000, values):
+        raise ValueError(f'{DISORDER_TABLE} has values with more than 3 decimal places')
+    arrays[f'{DISORDER_TABLE}__keys'] = np.array(list(table.keys()), dtype='S4')
+    arrays[f'{DISORDER_TABLE}__values'] = thousandths
+
+    arrays['list_names'] = np.array(list_names)
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the goose lists data file from a legacy lists.py')
+    parser.add_argument('legacy_lists', help='Path to a lists.py with the tables as literals')
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(__file__), '..', '..', 'goose', 'data', 'goose_lists.npz'),
+                        help='Where to write the data file')
+    args = parser.parse_args()
+
+    module = load_module(args.legacy_lists)
+    arrays = build_arrays(module)
+    np.savez_compressed(args.out, **arrays)
+    print(f'Wrote {len(arrays)} arrays to {os.path.abspath(args.out)} ({os.path.getsize(args.out)} bytes)')
+
+
+if __name__ == '__main__':
+    main()
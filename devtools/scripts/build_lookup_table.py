@@ -0,0 +1,118 @@
+"""
+Builds a disorder lookup table (see goose.backend.disorder_lookup.LookupTable)
+from metapredict.
+
+For every context (context_length amino acid classes) and every possible
+next residue, the table holds the average predicted disorder of the next
+residue when it follows the context at the end of a disordered sequence.
+Each value is the average over --samples sequences, each made of a random
+disordered prefix (drawn from lists.disordered_list), the context (with
+each class replaced by a random amino acid of that class) and the next
+residue. The contexts are split into chunks that are predicted in a pool
+of worker processes.
+
+Alphabets:
+    reduced - the 12 letter alphabet of aa_dis_val_4_v3 (aromatics merged,
+              K/R merged, G/S merged, ...)
+    full    - every amino acid in its own class
+
+The table is written as an .npz file that can be loaded with
+LookupTable.from_file, used by the lookup disorder backend
+(LookupBackend(table=path)) and, for tables with a context of 4, by
+get_optimal_residue (set_optimal_residue_table(path)). Use
+devtools/benchmarks/lookup_table_accuracy.py to compare tables.
+
+Usage:
+    python build_lookup_table.py out.npz [--alphabet full] [--context 4]
+        [--samples 4] [--prefix-length 20] [--workers 8] [--chunk-size 256]
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from goose.backend.disorder_lookup import LookupTable, AMINO_ACIDS, REDUCED_RESIDUES, REDUCED_ALPHABET
+from goose.backend.residue_sampler import list_sampler
+
+
+ALPHABETS = {'reduced': (''.join([REDUCED_RESIDUES[aa] for aa in AMINO_ACIDS]), ''.join(REDUCED_ALPHABET)),
+             'full': (''.join(AMINO_ACIDS), ''.join(AMINO_ACIDS))}
+
+
+def context_classes(row_num, classes, context_length):
+    '''
+    returns the classes of the context for a row of the table
+    '''
+    digits = []
+    for _ in range(0, context_length):
+        row_num, digit = divmod(row_num, len(classes))
+        digits.append(classes[digit])
+    return digits[::-1]
+
+
+def predict_chunk(task):
+    '''
+    returns the disorder values for rows start to stop of the table. Runs in a worker process.
+    '''
+    import metapredict as meta
+    start, stop, residue_classes, classes, context_length, samples, prefix_length, seed = task
+    rng = np.random.default_rng(seed)
+    members = {residue_class: [aa for aa, aa_class in zip(AMINO_ACIDS, residue_classes) if aa_class == residue_class] for residue_class in classes}
+    prefixes = list_sampler('disordered_list').sample_batch(samples*(stop-start), prefix_length, rng=rng)
+
+    sequences = []
+    for row_num in range(start, stop):
+        context = context_classes(row_num, classes, context_length)
+        for sample_num in range(0, samples):
+            prefix = prefixes[(row_num-start)*samples + sample_num]
+            context_residues = ''.join([members[residue_class][rng.integers(len(members[residue_class]))] for residue_class in context])
+            for next_residue in AMINO_ACIDS:
+                sequences.append(prefix + context_residues + next_residue)
+
+    predictions = meta.predict_disorder_batch(sequences, show_progress_bar=False)
+    # value of the last residue, in the order the sequences were made
+    last_values = np.array([prediction[1][-1] for prediction in predictions], dtype=np.float64)
+    return start, last_values.reshape(stop-start, samples, len(AMINO_ACIDS)).mean(axis=1)
+
+
+def build_table(alphabet, context_length, samples, prefix_length, workers, chunk_size, seed, name):
+    residue_classes, classes = ALPHABETS[alphabet]
+    num_rows = len(classes)**context_length
+    values = np.zeros((num_rows, len(AMINO_ACIDS)), dtype=np.float64)
+    tasks = [(start, min(start+chunk_size, num_rows), residue_classes, classes, context_length, samples, prefix_length, seed+chunk_num)
+             for chunk_num, start in enumerate(range(0, num_rows, chunk_size))]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, (start, chunk_values) in enumerate(pool.map(predict_chunk, tasks)):
+            values[start:start+len(chunk_values)] = chunk_values
+            print(f'\r{done+1}/{len(tasks)} chunks ({time.perf_counter()-started:.0f} s)', end='', flush=True)
+    print()
+    # stored as thousandths, so round to 3 decimal places here as well
+    return LookupTable(residue_classes, classes, context_length, np.round(values, 3), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a disorder lookup table from metapredict')
+    parser.add_argument('out', help='Where to write the table (.npz)')
+    parser.add_argument('--alphabet', choices=list(ALPHABETS.keys()), default='full', help='How the amino acids in the context are grouped')
+    parser.add_argument('--context', type=int, default=4, help='Number of residues before the next residue')
+    parser.add_argument('--samples', type=int, default=4, help='Number of sequences averaged for each value')
+    parser.add_argument('--prefix-length', type=int, default=20, help='Length of the disordered sequence before the context')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=256, help='Number of contexts predicted together by a worker')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random prefixes and class members')
+    args = parser.parse_args()
+
+    num_rows = len(ALPHABETS[args.alphabet][1])**args.context
+    print(f'{num_rows} contexts x {len(AMINO_ACIDS)} residues x {args.samples} samples = {num_rows*len(AMINO_ACIDS)*args.samples} predictions')
+    table = build_table(args.alphabet, args.context, args.samples, args.prefix_length, args.workers, args.chunk_size,
+                        args.seed, os.path.splitext(os.path.basename(args.out))[0])
+    table.save(args.out)
+    print(f'Wrote {table} to {os.path.abspath(args.out)} ({os.path.getsize(args.out)} bytes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,16 @@
 from .create import *
 from .analyze import *
 
-# Handle versioneer
-from ._version import get_versions
-versions = get_versions()
-__version__ = versions['version']
-__git_revision__ = versions['full-revisionid']
-del get_versions, versions
+
+# Handle versioneer. In built distributions _version.py holds the version 
+# as a literal (versioneer writes it at build time). In a source checkout
+# working it out can mean running git, so it is only done the first time 
+# __version__ is used rather than on import.
+def __getattr__(name):
+    if name in ('__version__', '__git_revision__'):
+        from ._version import get_versions
+        versions = get_versions()
+        globals()['__version__'] = versions['version']
+        globals()['__git_revision__'] = versions['full-revisionid']
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -4,14 +4,35 @@ User facing functionality for analysis of generated proteins.
 Limited for now, planning on expanding on in the future
 '''
 
-from goose.backend.protein import Protein
-from sparrow import Protein as pr
+from goose.backend.protein import Protein, calc_properties_batch as _calc_properties_batch
+
+# sparrow and the predictors (which need torch) are slow to import, so 
+# they are only imported the first time they are used.
+
+def _kappa(sequence):
+	from sparrow import Protein as pr
+	return pr(sequence).kappa
+
+def _predict_nes_seq(sequence):
+	from goose.backend.predictors.predict_nes import predict_nes_seq
+	return predict_nes_seq(sequence)
+
+def _predict_mitochondrial_targeting(sequence):
+	from goose.backend.predictors.predict_mito import predict_mitochondrial_targeting
+	return predict_mitochondrial_targeting(sequence)
+
+def _predict_nls_seq(sequence):
+	from goose.backend.predictors.predict_nls import predict_nls_seq
+	return predict_nls_seq(sequence)
+
+def _predict_phosphorylation(sequence):
+	from goose.backend.predictors.predict_phosphosite import predict_phosphorylation
+	return predict_phosphorylation(sequence)
+
+def _predict_tad_seq(sequence):
+	from goose.backend.predictors.predict_tad import predict_tad_seq
+	return predict_tad_seq(sequence)
 
-from goose.backend.predictors.predict_nes import predict_nes_seq as _predict_nes_seq
-from goose.backend.predictors.predict_mito import predict_mitochondrial_targeting as _predict_mitochondrial_targeting
-from goose.backend.predictors.predict_nls import predict_nls_seq as _predict_nls_seq
-from goose.backend.predictors.predict_phosphosite import predict_phosphorylation as _predict_phosphorylation
-from goose.backend.predictors.predict_tad import predict_tad_seq as _predict_tad_seq
 
 def properties(sequence, fractions=True):
 	'''
@@ -31,13 +52,40 @@ def properties(sequence, fractions=True):
 		returns a dictionary of the properties. 
 	'''
 	props_dict = Protein.calc_basic_properties(sequence)
-	props_dict['kappa'] = pr(sequence).kappa
+	props_dict['kappa'] = _kappa(sequence)
 	# if fractions are wanted, add to dict
 	if fractions == True:
 		props_dict['fractions'] = Protein.calc_frac(sequence)
 	# return the dict
 	return props_dict
 
+def properties_batch(sequences, lengths=None, fractions=True):
+	'''
+	analyzes the sequence properties of many sequences at once. Much 
+	faster than calling properties for each sequence. Kappa is not 
+	included.
+
+	parameters
+	-----------
+	sequences : list or np.ndarray
+		a list of amino acid sequences, or a 2-D uint8 array of the 
+		ASCII codes of the sequences with one sequence per row (rows
+		can be padded at the end if lengths is given)
+	lengths : np.ndarray
+		the length of each sequence in the array
+	fractions : bool
+		whether or not to include the specific fractions 
+		of all amino acids for each sequence
+
+	returns
+	-------
+	props_dict : dict
+		returns a dictionary of numpy arrays with one value per sequence
+		for length, FCR, NCPR, hydropathy, sigma, delta and SCD. 
+		If fractions is True, 'fractions' is a dict of amino acid : array.
+	'''
+	return _calc_properties_batch(sequences, lengths=lengths, fractions=fractions)
+
 def phosphosites(sequence, raw_vals = False):
 	'''
 	for getting analysis of potential phosphosites
@@ -280,7 +328,7 @@ def everything(sequence):
 	'''
 	# first get the basics
 	all_info = Protein.calc_all_properties(sequence)
-	all_info['kappa'] = pr(sequence).kappa
+	all_info['kappa'] = _kappa(sequence)
 	# now get the rest
 	all_info['predicted phosphosites'] = phosphosites(sequence)
 	all_info['predicted cellular localization'] = cellular_localization(sequence)
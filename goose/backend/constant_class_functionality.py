@@ -12,8 +12,6 @@ from goose.backend.amino_acids import AminoAcid
 from goose.backend.protein import Protein
 
 
-from metapredict import meta
-
 # standard amino acids
 amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
 
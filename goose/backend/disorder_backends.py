@@ -0,0 +1,193 @@
+'''
+Disorder predictors that can be used by goose.backend.predict_disorder.
+
+Every backend has a predict method for a single sequence and a
+predict_batch method for a list of sequences, both returning per-residue
+disorder values. The backend used by GOOSE can be set globally with
+set_disorder_backend or chosen for a single call by passing backend= to
+the prediction functions in goose.backend.predict_disorder (and to
+check_disorder / sequence_variant_disorder).
+
+Backends that ship with GOOSE:
+
+   metapredict - metapredict, the default.
+   lookup - the fast_predict_disorder lookup table (or another lookup
+            table, see LookupBackend). Orders of magnitude faster than
+            metapredict but much less accurate. Useful for coarse screening.
+   stub - a deterministic, very cheap stand in that just smooths a per
+          residue propensity. It is not a disorder predictor; it is for
+          benchmarking and load testing the generation code in isolation.
+'''
+
+import numpy as np
+
+from goose.goose_exceptions import GooseInputError
+
+
+class DisorderBackend:
+    '''
+    Base class for disorder backends. Subclasses need to implement
+    predict and version. predict_batch can be overwritten if the
+    predictor can do batches more efficiently than one sequence
+    at a time.
+
+    cache_predictions sets whether predictions from the backend should
+    be kept in the disorder cache and the persistent disorder store.
+    This is only worth it for backends that are expensive to run.
+    '''
+    name = 'base'
+    cache_predictions = False
+
+    def version(self):
+        '''
+        returns a string that identifies the predictor (and its version).
+        Used to keep predictions from different predictors apart.
+        '''
+        raise NotImplementedError('Disorder backends must implement version()')
+
+    def predict(self, sequence):
+        '''
+        returns the per-residue disorder of sequence.
+        '''
+        raise NotImplementedError('Disorder backends must implement predict()')
+
+    def predict_batch(self, sequences):
+        '''
+        returns a list of per-residue disorder profiles in the order of sequences.
+        '''
+        return [self.predict(sequence) for sequence in sequences]
+
+    def __repr__(self):
+        return f'<DisorderBackend {self.version()}>'
+
+
+class MetapredictBackend(DisorderBackend):
+    '''
+    Disorder predictions from metapredict.
+    '''
+    name = 'metapredict'
+    cache_predictions = True
+
+    def version(self):
+        import metapredict
+        return f'metapredict-{metapredict.__version__}'
+
+    def predict(self, sequence):
+        import metapredict as meta
+        return meta.predict_disorder(sequence)
+
+    def predict_batch(self, sequences):
+        import metapredict as meta
+        # metapredict returns [sequence, disorder] pairs in the input order
+        return [prediction[1] for prediction in meta.predict_disorder_batch(sequences, show_progress_bar=False)]
+
+
+class LookupBackend(DisorderBackend):
+    '''
+    Disorder estimated from a lookup table. By default this is the 4
+    residue table used by fast_predict_disorder (aa_dis_val_4_v3), other
+    tables (a LookupTable or the path to a table file, see
+    goose.backend.disorder_lookup) can be passed as table.
+    '''
+    name = 'lookup'
+
+    def __init__(self, table=None):
+        from goose.backend.disorder_lookup import load_lookup_table
+        self.table = load_lookup_table(table)
+
+    def version(self):
+        return f'lookup-{self.table.name}'
+
+    def predict(self, sequence):
+        return self.table.lookup_disorder(sequence)
+
+    def predict_batch(self, sequences):
+        # sequences of the same length are looked up together
+        by_length = {}
+        for seq_num in range(0, len(sequences)):
+            by_length.setdefault(len(sequences[seq_num]), []).append(seq_num)
+        predictions = [None]*len(sequences)
+        for seq_nums in by_length.values():
+            for seq_num, disorder in zip(seq_nums, self.table.lookup_disorder_batch([sequences[seq_num] for seq_num in seq_nums])):
+                predictions[seq_num] = disorder
+        return predictions
+
+
+class StubBackend(DisorderBackend):
+    '''
+    Deterministic and cheap stand in for a disorder predictor.
+    The value for each residue is a propensity based on the
+    hydropathy of the residue (hydrophobic residues get low values)
+    averaged over a window of 5 residues.
+    '''
+    name = 'stub'
+
+    # residue propensities, 1 - hydropathy/11.25 so values are between 0.2 and 1
+    propensities = {'A': 0.44, 'C': 0.3778, 'D': 0.9111, 'E': 0.9111, 'F': 0.3511, 'G': 0.6356,
+                    'H': 0.8844, 'I': 0.2, 'K': 0.9467, 'L': 0.2622, 'M': 0.4311, 'N': 0.9111,
+                    'P': 0.7422, 'Q': 0.9111, 'R': 1.0, 'S': 0.6711, 'T': 0.6622, 'V': 0.2267,
+                    'W': 0.68, 'Y': 0.7156}
+
+    def version(self):
+        return 'stub-1'
+
+    def predict(self, sequence):
+        values = np.array([self.propensities.get(aa, 0.5) for aa in sequence])
+        if len(values) < 5:
+            return values
+        # average over 5 residues, repeating the terminal values at the ends
+        padded = np.concatenate(([values[0]]*2, values, [values[-1]]*2))
+        return np.convolve(padded, np.ones(5)/5, mode='valid')
+
+
+# backends that can be selected by name
+DISORDER_BACKENDS = {'metapredict': MetapredictBackend, 'lookup': LookupBackend, 'stub': StubBackend}
+
+# one instance of each named backend
+_BACKEND_INSTANCES = {}
+
+# name or instance of the backend used when one isn't specified
+_DEFAULT_BACKEND = 'metapredict'
+
+
+def register_disorder_backend(name, backend_class):
+    '''
+    makes a DisorderBackend subclass selectable by name.
+    '''
+    if not issubclass(backend_class, DisorderBackend):
+        raise GooseInputError('Disorder backends must be subclasses of DisorderBackend.')
+    DISORDER_BACKENDS[name] = backend_class
+    _BACKEND_INSTANCES.pop(name, None)
+
+
+def get_disorder_backend(backend=None):
+    '''
+    returns a DisorderBackend instance.
+
+    Parameters
+    ----------
+    backend : None, String, or DisorderBackend
+        None returns the current default backend, a string returns
+        the backend registered with that name, and a DisorderBackend
+        instance is returned as is.
+    '''
+    if backend is None:
+        backend = _DEFAULT_BACKEND
+    if isinstance(backend, DisorderBackend):
+        return backend
+    if backend not in DISORDER_BACKENDS:
+        raise GooseInputError(f'Unknown disorder backend {backend}. Options are {list(DISORDER_BACKENDS.keys())}')
+    if backend not in _BACKEND_INSTANCES:
+        _BACKEND_INSTANCES[backend] = DISORDER_BACKENDS[backend]()
+    return _BACKEND_INSTANCES[backend]
+
+
+def set_disorder_backend(backend):
+    '''
+    sets the backend used for disorder predictions when one isn't
+    specified. Takes a backend name or a DisorderBackend instance.
+    '''
+    global _DEFAULT_BACKEND
+    # make sure it's a usable backend before setting it
+    get_disorder_backend(backend)
+    _DEFAULT_BACKEND = backend
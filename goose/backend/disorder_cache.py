@@ -0,0 +1,141 @@
+'''
+Bounded, thread-safe cache for predicted disorder profiles.
+
+The same sequence is frequently predicted several times within a single
+call chain (checking a generated sequence, getting the disorder of the
+starting sequence for a variant, checking the variant, optimizing it...).
+The cache here holds the disorder profile for each exact sequence so that
+it only has to be predicted once. It is used by the functions in
+goose.backend.predict_disorder, which is what all of the backend code
+uses to predict disorder.
+'''
+
+import threading
+from collections import OrderedDict
+
+from goose.goose_exceptions import GooseInputError
+
+
+# supported eviction policies.
+# lru - evict the least recently used profile
+# fifo - evict the profile that was added to the cache first
+EVICTION_POLICIES = ['lru', 'fifo']
+
+
+class DisorderCache:
+    '''
+    Thread-safe cache of disorder profiles keyed on the exact sequence.
+
+    Parameters
+    ----------
+    maxsize : Int
+        The maximum number of disorder profiles held in the cache.
+        Setting maxsize to 0 turns off caching.
+
+    eviction : String
+        How to choose which profile to remove once the cache is full.
+        Options are 'lru' (least recently used) and 'fifo' (oldest first)
+    '''
+    def __init__(self, maxsize=10000, eviction='lru'):
+        self.__check_settings(maxsize, eviction)
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__profiles = OrderedDict()
+        self.__lock = threading.Lock()
+
+
+    def __check_settings(self, maxsize, eviction):
+        if type(maxsize) != int or maxsize < 0:
+            raise GooseInputError('The disorder cache size must be an integer greater than or equal to 0.')
+        if eviction not in EVICTION_POLICIES:
+            raise GooseInputError(f'The disorder cache eviction policy must be one of {EVICTION_POLICIES}.')
+
+
+    def __len__(self):
+        return len(self.__profiles)
+
+
+    def __contains__(self, sequence):
+        return sequence in self.__profiles
+
+
+    def get(self, sequence):
+        '''
+        returns the cached disorder profile for sequence or None if
+        the sequence is not in the cache. Updates the hit/miss counts.
+        '''
+        with self.__lock:
+            profile = self.__profiles.get(sequence)
+            if profile is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.eviction == 'lru':
+                self.__profiles.move_to_end(sequence)
+            return profile
+
+
+    def put(self, sequence, profile):
+        '''
+        adds the disorder profile for sequence to the cache, evicting
+        profiles if the cache is full.
+        '''
+        if self.maxsize == 0:
+            return
+        with self.__lock:
+            if sequence in self.__profiles:
+                if self.eviction == 'lru':
+                    self.__profiles.move_to_end(sequence)
+                self.__profiles[sequence] = profile
+                return
+            self.__profiles[sequence] = profile
+            while len(self.__profiles) > self.maxsize:
+                self.__profiles.popitem(last=False)
+                self.evictions += 1
+
+
+    def resize(self, maxsize=None, eviction=None):
+        '''
+        changes the size and / or eviction policy of the cache.
+        If the cache is shrunk, profiles are evicted until it fits.
+        '''
+        if maxsize == None:
+            maxsize = self.maxsize
+        if eviction == None:
+            eviction = self.eviction
+        self.__check_settings(maxsize, eviction)
+        with self.__lock:
+            self.maxsize = maxsize
+            self.eviction = eviction
+            while len(self.__profiles) > self.maxsize:
+                self.__profiles.popitem(last=False)
+                self.evictions += 1
+
+
+    def clear(self):
+        '''
+        removes all profiles from the cache and resets the statistics.
+        '''
+        with self.__lock:
+            self.__profiles.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+    def info(self):
+        '''
+        returns a dict with the cache statistics.
+        '''
+        with self.__lock:
+            total = self.hits + self.misses
+            if total == 0:
+                hit_rate = 0.0
+            else:
+                hit_rate = self.hits / total
+            return {'hits': self.hits, 'misses': self.misses, 'hit_rate': hit_rate,
+                    'evictions': self.evictions, 'size': len(self.__profiles),
+                    'maxsize': self.maxsize, 'eviction': self.eviction}
@@ -0,0 +1,224 @@
+'''
+Cross-thread micro-batching of disorder predictions.
+
+When GOOSE is used from many threads at once (for example in a threaded
+job server), each thread makes its own small disorder prediction. Batched
+predictions are much more efficient than many small ones, so the
+coalescer here collects the predictions requested by all threads for a
+short time and runs them as a single batch, then hands each thread its
+own results.
+
+The coalescer is off by default. It is turned on with
+goose.backend.predict_disorder.enable_disorder_coalescer, after which
+every prediction that misses the disorder cache goes through it. Nothing
+else changes for the callers.
+'''
+
+import os
+import time
+import threading
+
+from goose.goose_exceptions import GooseInputError
+
+
+class _PendingRequest:
+    '''
+    A list of sequences from a single caller waiting to be predicted.
+    '''
+    def __init__(self, backend, sequences):
+        self.backend = backend
+        self.sequences = sequences
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class DisorderCoalescer:
+    '''
+    Collects prediction requests from any number of threads and predicts
+    them in batches on a single worker thread.
+
+    A batch is run once max_batch_size sequences are waiting or once the
+    oldest waiting request has waited max_wait seconds, whichever comes
+    first. Requests for different backends are never put in the same batch.
+
+    Parameters
+    ----------
+    max_batch_size : Int
+        The maximum number of sequences predicted in a single batch.
+        A single request with more sequences than this is still
+        predicted as one batch.
+
+    max_wait : Float
+        The maximum time (in seconds) a request waits for other requests
+        before its batch is run.
+    '''
+    def __init__(self, max_batch_size=64, max_wait=0.005):
+        if type(max_batch_size) != int or max_batch_size < 1:
+            raise GooseInputError('max_batch_size for the disorder coalescer must be an integer greater than 0.')
+        if max_wait < 0:
+            raise GooseInputError('max_wait for the disorder coalescer cannot be negative.')
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.num_batches = 0
+        self.num_requests = 0
+        self.num_sequences = 0
+        self.__pending = []
+        self.__condition = threading.Condition()
+        self.__running = True
+        # the worker thread only exists in the process it was started in
+        self.__pid = os.getpid()
+        self.__worker = threading.Thread(target=self.__run, name='goose-disorder-coalescer', daemon=True)
+        self.__worker.start()
+
+
+    def __forked(self):
+        '''
+        returns True in a process forked from the one the worker was
+        started in. There is no worker thread there (and the condition 
+        may have been held by another thread when the process forked).
+        '''
+        return os.getpid() != self.__pid
+
+
+    def predict_batch(self, backend, sequences):
+        '''
+        returns the predictions from backend for sequences (in the same
+        order), predicted along with whatever other threads asked for
+        at the same time. Blocks until the predictions are done.
+        '''
+        sequences = list(sequences)
+        if sequences == []:
+            return []
+        # in a forked process nothing would run the batches, so 
+        # predict the sequences here
+        if self.__forked():
+            return backend.predict_batch(sequences)
+        request = _PendingRequest(backend, sequences)
+        with self.__condition:
+            running = self.__running
+            if running == True:
+                self.__pending.append((time.monotonic(), request))
+                self.__condition.notify()
+        # if the coalescer was stopped while this thread was on its 
+        # way in, just predict the sequences here
+        if running == False:
+            return backend.predict_batch(sequences)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+
+    def predict(self, backend, sequence):
+        '''
+        returns the prediction from backend for a single sequence.
+        '''
+        return self.predict_batch(backend, [sequence])[0]
+
+
+    def __take_batch(self):
+        '''
+        removes and returns the requests for the next batch. Takes the
+        oldest request plus any later requests for the same backend
+        until the batch is full. Must be called holding the condition.
+        '''
+        backend = self.__pending[0][1].backend
+        batch = []
+        remaining = []
+        batch_size = 0
+        for queued_at, request in self.__pending:
+            if request.backend is backend and (batch == [] or batch_size + len(request.sequences) <= self.max_batch_size):
+                batch.append(request)
+                batch_size += len(request.sequences)
+            else:
+                remaining.append((queued_at, request))
+        self.__pending = remaining
+        return batch
+
+
+    def __ready(self):
+        '''
+        returns how long to wait before the next batch should be run
+        (0 if it should be run now). Must be called holding the condition.
+        '''
+        oldest_backend = self.__pending[0][1].backend
+        waiting = sum([len(request.sequences) for queued_at, request in self.__pending if request.backend is oldest_backend])
+        if waiting >= self.max_batch_size:
+            return 0
+        return max(0, self.__pending[0][0] + self.max_wait - time.monotonic())
+
+
+    def __run(self):
+        '''
+        worker thread, runs batches until the coalescer is stopped.
+        '''
+        while True:
+            with self.__condition:
+                while True:
+                    if self.__pending == []:
+                        if self.__running == False:
+                            return
+                        self.__condition.wait()
+                        continue
+                    wait_time = self.__ready()
+                    if wait_time == 0 or self.__running == False:
+                        break
+                    self.__condition.wait(wait_time)
+                batch = self.__take_batch()
+            self.__predict(batch)
+
+
+    def __predict(self, batch):
+        '''
+        predicts the sequences for a batch of requests and hands
+        each request its results.
+        '''
+        # predict each unique sequence once
+        unique_sequences = []
+        seen = set()
+        for request in batch:
+            for sequence in request.sequences:
+                if sequence not in seen:
+                    unique_sequences.append(sequence)
+                    seen.add(sequence)
+        try:
+            predictions = dict(zip(unique_sequences, batch[0].backend.predict_batch(unique_sequences)))
+            for request in batch:
+                request.results = [predictions[sequence] for sequence in request.sequences]
+        except Exception as error:
+            # the callers get the error rather than the worker dying
+            for request in batch:
+                request.error = error
+        self.num_batches += 1
+        self.num_requests += len(batch)
+        self.num_sequences += len(unique_sequences)
+        for request in batch:
+            request.done.set()
+
+
+    def stop(self):
+        '''
+        runs anything that is still waiting and stops the worker thread.
+        '''
+        if self.__forked():
+            self.__running = False
+            return
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify()
+        self.__worker.join()
+
+
+    def info(self):
+        '''
+        returns a dict with the number of batches, requests and unique
+        sequences predicted by the coalescer and the average batch size.
+        '''
+        if self.num_batches == 0:
+            average_batch_size = 0.0
+        else:
+            average_batch_size = self.num_sequences / self.num_batches
+        return {'batches': self.num_batches, 'requests': self.num_requests,
+                'sequences': self.num_sequences, 'average_batch_size': average_batch_size,
+                'max_batch_size': self.max_batch_size, 'max_wait': self.max_wait}
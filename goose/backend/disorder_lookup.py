@@ -0,0 +1,378 @@
+'''
+Array version of the aa_dis_val_4_v3 lookup table.
+
+aa_dis_val_4_v3 holds approximate disorder values for each of the 20
+amino acids following every combination of 4 amino acids, where the 4
+amino acids are written in a reduced 12 letter alphabet (all aromatics
+are 'W', L/V/I are 'L', and so on, see optimal_residue_key). Here the
+table is compiled (once, the first time it is needed) into a dense
+array with one row for each reduced 4 amino acid context, where the row
+number is the context written as a base 12 number, and one column for
+each possible next residue. Looking up disorder values is then just
+indexing into that array, which can be done for a whole sequence (or a
+whole batch of sequences) at once.
+
+lookup_disorder_batch is the vectorized version of fast_predict_disorder.
+It takes a list of sequences of the same length or a uint8 matrix of
+sequences (one row per sequence, ASCII codes, see encode_sequences).
+'''
+
+import os
+import threading
+
+import numpy as np
+
+from goose.backend import lists
+from goose.goose_exceptions import GooseInputError
+
+
+# number of residues before a residue that its value is looked up with
+CONTEXT_LENGTH = 4
+
+# amino acids in the order used to make aa_dis_val_4_v3 (the columns of the table)
+AMINO_ACIDS = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+
+# reduced alphabet used for the 4 amino acids before the next residue
+REDUCED_RESIDUES = {'F': 'W', 'W': 'W', 'Y': 'W', 'C': 'C', 'L': 'L', 'V': 'L', 'I': 'L',
+                    'M': 'M', 'A': 'A', 'H': 'H', 'K': 'K', 'R': 'K', 'Q': 'Q', 'N': 'Q',
+                    'D': 'D', 'E': 'D', 'G': 'G', 'S': 'G', 'T': 'T', 'P': 'P'}
+
+# the 12 letters of the reduced alphabet, in the order used for the base 12 encoding
+REDUCED_ALPHABET = ['A', 'C', 'D', 'G', 'H', 'K', 'L', 'M', 'P', 'Q', 'T', 'W']
+
+
+class _ReducedTranslation(dict):
+    '''
+    str.translate table for the reduced alphabet. Anything that
+    isn't an amino acid is dropped (as optimal_residue_key always has).
+    '''
+    def __missing__(self, key):
+        return None
+
+_REDUCED_TRANSLATION = _ReducedTranslation({ord(aa): reduced for aa, reduced in REDUCED_RESIDUES.items()})
+
+# reduced residue -> base 12 digit
+_REDUCED_DIGITS = {reduced: digit for digit, reduced in enumerate(REDUCED_ALPHABET)}
+
+# value used in the code arrays for anything that isn't an amino acid
+_INVALID = 255
+
+# ASCII code -> base 12 digit of the reduced residue
+_REDUCED_CODES = np.full(256, _INVALID, dtype=np.uint8)
+for aa, reduced in REDUCED_RESIDUES.items():
+    _REDUCED_CODES[ord(aa)] = REDUCED_ALPHABET.index(reduced)
+
+# ASCII code -> column of the table
+_RESIDUE_CODES = np.full(256, _INVALID, dtype=np.uint8)
+for aa_num, aa in enumerate(AMINO_ACIDS):
+    _RESIDUE_CODES[ord(aa)] = aa_num
+
+# the table, made the first time it is needed
+_TABLE = None
+_table_lock = threading.Lock()
+
+
+def reduced_key(four_amino_acids):
+    '''
+    returns four_amino_acids written in the reduced alphabet. This is the
+    key for the aa_dis_val_4_v3 dict. Non amino acids are dropped.
+    '''
+    return four_amino_acids.translate(_REDUCED_TRANSLATION)
+
+
+def context_index(key):
+    '''
+    returns the row of the table for a reduced 4 amino acid key.
+    Raises a KeyError for anything that isn't a key of aa_dis_val_4_v3.
+    '''
+    if len(key) != 4:
+        raise KeyError(key)
+    try:
+        return ((_REDUCED_DIGITS[key[0]]*12 + _REDUCED_DIGITS[key[1]])*12 + _REDUCED_DIGITS[key[2]])*12 + _REDUCED_DIGITS[key[3]]
+    except KeyError:
+        raise KeyError(key)
+
+
+def disorder_table():
+    '''
+    returns the table as a read-only float array with shape (12**4, 20).
+    Row i is the 4 amino acid context with base 12 digits i, column j
+    is AMINO_ACIDS[j] as the next residue.
+    '''
+    global _TABLE
+    if _TABLE is None:
+        with _table_lock:
+            if _TABLE is None:
+                keys = lists.load_data_array('aa_dis_val_4_v3__keys')
+                thousandths = lists.load_data_array('aa_dis_val_4_v3__values')
+                # work out which row each key of the dict goes in
+                digits = _REDUCED_CODES[np.frombuffer(keys.tobytes(), dtype=np.uint8).reshape(-1, 4)].astype(np.int64)
+                rows = ((digits[:, 0]*12 + digits[:, 1])*12 + digits[:, 2])*12 + digits[:, 3]
+                table = np.zeros((12**4, len(AMINO_ACIDS)), dtype=np.float64)
+                # values are stored as thousandths, dividing gives the same floats as the dict
+                table[rows] = thousandths / 1000
+                table.setflags(write=False)
+                _TABLE = table
+    return _TABLE
+
+
+def disorder_row(key):
+    '''
+    returns the disorder values for the 20 amino acids following a
+    reduced 4 amino acid key (the same values as aa_dis_val_4_v3[key]).
+    '''
+    return disorder_table()[context_index(key)]
+
+
+def encode_sequences(sequences):
+    '''
+    returns a list of sequences of the same length as a 2-D uint8
+    array of ASCII codes with one row per sequence. A 2-D uint8 array
+    is returned as is and a single sequence gives a single row.
+    '''
+    if isinstance(sequences, np.ndarray):
+        return np.atleast_2d(sequences).astype(np.uint8, copy=False)
+    if isinstance(sequences, str):
+        sequences = [sequences]
+    if len(sequences) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    length = len(sequences[0])
+    for sequence in sequences:
+        if len(sequence) != length:
+            raise GooseInputError('All sequences in a batch must be the same length.')
+    return np.frombuffer(''.join(sequences).encode('ascii'), dtype=np.uint8).reshape(len(sequences), length)
+
+
+def decode_sequences(encoded):
+    '''
+    returns the sequences in a 2-D uint8 array of ASCII codes as a list of strings.
+    '''
+    encoded = np.atleast_2d(np.asarray(encoded, dtype=np.uint8))
+    return [row.tobytes().decode('ascii') for row in encoded]
+
+
+def context_indices(encoded):
+    '''
+    returns the table row used for each residue of each sequence in a
+    2-D uint8 array of ASCII codes. Each residue uses the 4 residues before
+    it, except the first 4 residues, which all use the first 4 residues.
+    '''
+    digits = _REDUCED_CODES[encoded].astype(np.int64)
+    if np.any(digits == _INVALID):
+        raise GooseInputError('Sequences can only contain the 20 standard amino acids.')
+    num_sequences, length = encoded.shape
+    if length < CONTEXT_LENGTH:
+        raise GooseInputError(f'Sequences must be at least {CONTEXT_LENGTH} amino acids long to look up disorder values.')
+    rows = np.empty((num_sequences, length), dtype=np.int64)
+    # row for the 4 residues starting at each position
+    windows = ((digits[:, :length-3]*12 + digits[:, 1:length-2])*12 + digits[:, 2:length-1])*12 + digits[:, 3:]
+    rows[:, :4] = windows[:, :1]
+    rows[:, 4:] = windows[:, :length-4]
+    return rows
+
+
+def lookup_disorder_batch(sequences):
+    '''
+    Vectorized fast_predict_disorder for many sequences at once.
+
+    Parameters
+    ----------
+    sequences : List or np.ndarray
+        A list of amino acid sequences of the same length, or a 2-D
+        uint8 array of their ASCII codes (see encode_sequences)
+
+    Returns
+    -------
+    np.ndarray
+        float array of shape (number of sequences, length) with the
+        lookup table disorder value of every residue
+    '''
+    encoded = encode_sequences(sequences)
+    if encoded.shape[0] == 0:
+        return np.zeros(encoded.shape, dtype=np.float64)
+    columns = _RESIDUE_CODES[encoded]
+    return disorder_table()[context_indices(encoded), columns]
+
+
+def lookup_disorder(sequence):
+    '''
+    returns the lookup table disorder value of every residue of a
+    single sequence as a float array. See lookup_disorder_batch.
+    '''
+    return lookup_disorder_batch([sequence])[0]
+
+
+'''
+Other lookup tables.
+
+LookupTable is the same kind of table for any grouping of the amino
+acids (each amino acid is given a class, e.g. the 12 letter reduced
+alphabet above, or every amino acid in its own class) and any number of
+residues before the next residue. Tables other than aa_dis_val_4_v3 are
+made from metapredict with devtools/scripts/build_lookup_table.py and
+are stored as .npz files holding:
+
+   residue_classes - the class of each amino acid in AMINO_ACIDS (a string of 20 letters)
+   classes - the class letters in the order used for the row numbers
+   context_length - the number of residues before the next residue
+   values - the disorder values in thousandths (uint16), shape (classes**context_length, 20)
+'''
+
+class LookupTable:
+    '''
+    A table of disorder values for each of the 20 amino acids following
+    every combination of context_length amino acid classes.
+
+    Parameters
+    ----------
+    residue_classes : String
+        The class letter of each amino acid in AMINO_ACIDS
+
+    classes : String
+        The class letters, in the order used for the row numbers (the
+        context is written as a number in base len(classes))
+
+    context_length : Int
+        The number of residues before the next residue
+
+    values : np.ndarray
+        float array with shape (len(classes)**context_length, 20)
+
+    name : String
+        Name of the table, used to tell tables apart
+    '''
+    def __init__(self, residue_classes, classes, context_length, values, name):
+        if len(residue_classes) != len(AMINO_ACIDS) or set(residue_classes) != set(classes) or len(set(classes)) != len(classes):
+            raise GooseInputError('Each amino acid needs a class and each class needs at least one amino acid.')
+        if context_length < 1:
+            raise GooseInputError('Lookup tables need at least 1 residue of context.')
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(classes)**context_length, len(AMINO_ACIDS)):
+            raise GooseInputError(f'A lookup table with {len(classes)} classes and a context of {context_length} needs {len(classes)**context_length} rows of {len(AMINO_ACIDS)} values.')
+        self.residue_classes = residue_classes
+        self.classes = classes
+        self.context_length = context_length
+        self.values = values
+        self.values.setflags(write=False)
+        self.name = name
+        # ASCII code -> digit of the class
+        self._class_codes = np.full(256, _INVALID, dtype=np.uint8)
+        for aa, residue_class in zip(AMINO_ACIDS, residue_classes):
+            self._class_codes[ord(aa)] = classes.index(residue_class)
+        self._translation = _ReducedTranslation({ord(aa): residue_class for aa, residue_class in zip(AMINO_ACIDS, residue_classes)})
+        self._digits = {residue_class: digit for digit, residue_class in enumerate(classes)}
+
+    @classmethod
+    def from_file(cls, path):
+        '''
+        loads a table made with devtools/scripts/build_lookup_table.py.
+        '''
+        with np.load(path) as data:
+            return cls(str(data['residue_classes']), str(data['classes']), int(data['context_length']),
+                       data['values'] / 1000, os.path.splitext(os.path.basename(path))[0])
+
+    def save(self, path):
+        '''
+        writes the table to path in the format read by from_file. Values
+        are stored as thousandths.
+        '''
+        np.savez_compressed(path, residue_classes=np.array(self.residue_classes), classes=np.array(self.classes),
+                            context_length=np.array(self.context_length),
+                            values=np.round(self.values * 1000).astype(np.uint16))
+
+    def key(self, residues):
+        '''
+        returns the last context_length residues written in the class
+        letters. Non amino acids are dropped.
+        '''
+        return residues.translate(self._translation)[-self.context_length:]
+
+    def row(self, key):
+        '''
+        returns the disorder values for the 20 amino acids following
+        a key (see LookupTable.key).
+        '''
+        if len(key) != self.context_length:
+            raise KeyError(key)
+        row_num = 0
+        try:
+            for residue_class in key:
+                row_num = row_num*len(self.classes) + self._digits[residue_class]
+        except KeyError:
+            raise KeyError(key)
+        return self.values[row_num]
+
+    def class_digits(self, encoded):
+        '''
+        returns the digit of the class of each residue in a uint8 array 
+        of ASCII codes, or 255 for anything that isn't an amino acid.
+        '''
+        return self._class_codes[encoded]
+
+    def context_indices(self, encoded):
+        '''
+        returns the row used for each residue of each sequence in a 2-D
+        uint8 array of ASCII codes. As for aa_dis_val_4_v3, the first
+        context_length residues all use the first context_length residues.
+        '''
+        digits = self._class_codes[encoded].astype(np.int64)
+        if np.any(digits == _INVALID):
+            raise GooseInputError('Sequences can only contain the 20 standard amino acids.')
+        num_sequences, length = encoded.shape
+        context_length = self.context_length
+        if length < context_length:
+            raise GooseInputError(f'Sequences must be at least {context_length} amino acids long to look up disorder values.')
+        # row for the context_length residues starting at each position
+        windows = np.zeros((num_sequences, length-context_length+1), dtype=np.int64)
+        for offset in range(0, context_length):
+            windows = windows*len(self.classes) + digits[:, offset:length-context_length+1+offset]
+        rows = np.empty((num_sequences, length), dtype=np.int64)
+        rows[:, :context_length] = windows[:, :1]
+        rows[:, context_length:] = windows[:, :length-context_length]
+        return rows
+
+    def lookup_disorder_batch(self, sequences):
+        '''
+        returns the disorder value of every residue of a list of sequences
+        of the same length (or a 2-D uint8 array of their ASCII codes)
+        as a float array of shape (number of sequences, length).
+        '''
+        encoded = encode_sequences(sequences)
+        if encoded.shape[0] == 0:
+            return np.zeros(encoded.shape, dtype=np.float64)
+        return self.values[self.context_indices(encoded), _RESIDUE_CODES[encoded]]
+
+    def lookup_disorder(self, sequence):
+        '''
+        returns the disorder value of every residue of a single sequence.
+        '''
+        return self.lookup_disorder_batch([sequence])[0]
+
+    def __repr__(self):
+        return f'<LookupTable {self.name}: {len(self.classes)} classes, context of {self.context_length}>'
+
+
+_builtin_table = None
+
+
+def builtin_lookup_table():
+    '''
+    returns aa_dis_val_4_v3 as a LookupTable.
+    '''
+    global _builtin_table
+    if _builtin_table is None:
+        residue_classes = ''.join([REDUCED_RESIDUES[aa] for aa in AMINO_ACIDS])
+        _builtin_table = LookupTable(residue_classes, ''.join(REDUCED_ALPHABET), 4, disorder_table(), 'aa_dis_val_4_v3')
+    return _builtin_table
+
+
+def load_lookup_table(table):
+    '''
+    returns a LookupTable. Takes a LookupTable (returned as is), the
+    path to a table file, or None for aa_dis_val_4_v3.
+    '''
+    if table is None:
+        return builtin_lookup_table()
+    if isinstance(table, LookupTable):
+        return table
+    return LookupTable.from_file(table)
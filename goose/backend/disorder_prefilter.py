@@ -0,0 +1,167 @@
+'''
+Cheap prefilter for disorder checks.
+
+fast_predict_disorder is a lookup table estimate of disorder that is
+orders of magnitude cheaper than metapredict. The prefilter scores a
+sequence with it and rejects sequences that score below a threshold
+without ever predicting them with metapredict. This is used by
+check_disorder, check_disorder_batch and sequence_variant_disorder
+when they are given a prefilter threshold.
+
+Because the lookup table is only a rough estimate, the prefilter will
+occasionally reject a sequence that metapredict would have accepted.
+calibrate_prefilter measures how often that happens (the false-reject
+rate) for a set of sequences and a threshold, and can suggest the
+highest threshold that keeps the false-reject rate below a target.
+'''
+
+import numpy as np
+
+from goose.backend import parameters
+from goose.goose_exceptions import GooseInputError
+from goose.backend.disorder_lookup import lookup_disorder, CONTEXT_LENGTH
+
+
+def prefilter_score(sequence):
+    '''
+    returns the score used by the prefilter, which is the mean of
+    the lookup disorder values across the sequence.
+
+    Parameters
+    ----------
+    sequence : String
+        The amino acid sequence as a string
+
+    Returns
+    -------
+    Float
+        The prefilter score for the sequence
+    '''
+    return float(np.mean(lookup_disorder(sequence)))
+
+
+def resolve_prefilter(prefilter):
+    '''
+    turns the prefilter argument used by the disorder checks into a
+    threshold. None or False turns the prefilter off (returns None),
+    True uses parameters.DISORDER_PREFILTER_THRESHOLD and a number
+    is used as the threshold.
+    '''
+    if prefilter is None or prefilter is False:
+        return None
+    if prefilter is True:
+        return parameters.DISORDER_PREFILTER_THRESHOLD
+    return prefilter
+
+
+def passes_prefilter(sequence, prefilter=True):
+    '''
+    returns False if the sequence is scored as hopelessly ordered
+    by the lookup table and True otherwise.
+
+    Parameters
+    ----------
+    sequence : String
+        The amino acid sequence as a string
+
+    prefilter : Bool or Float
+        The threshold to use (see resolve_prefilter)
+
+    Returns
+    -------
+    Bool
+        Whether the sequence should go on to be checked by metapredict.
+        Sequences too short for the lookup table always go on.
+    '''
+    threshold = resolve_prefilter(prefilter)
+    if threshold is None or len(sequence) < CONTEXT_LENGTH:
+        return True
+    return prefilter_score(sequence) >= threshold
+
+
+def calibrate_prefilter(sequences, prefilter=True, disorder_threshold=parameters.DISORDER_THRESHOLD,
+    strict=False, original_sequence=None, max_false_reject_rate=0.01):
+    '''
+    Compares the prefilter to the full disorder check for a set of
+    sequences. Each sequence is scored by the prefilter and checked
+    with check_disorder (or with sequence_variant_disorder against
+    original_sequence if it is given) without a prefilter.
+
+    Parameters
+    ----------
+    sequences : List
+        A list of sequences to calibrate with. These should be like the
+        sequences that will be screened (e.g. generated with the same
+        properties).
+
+    prefilter : Bool or Float
+        The threshold to evaluate (see resolve_prefilter)
+
+    disorder_threshold : Float
+        The disorder threshold used by the full disorder check
+
+    strict : Bool
+        Whether the full disorder check is strict
+
+    original_sequence : String
+        If given, the sequences are treated as variants of original_sequence
+        and checked with sequence_variant_disorder.
+
+    max_false_reject_rate : Float
+        The false-reject rate used to suggest a threshold
+
+    Returns
+    -------
+    Dict
+        threshold : the threshold that was evaluated
+        false_reject_rate : fraction of the sequences that pass the full check
+            that the prefilter rejects
+        rejection_rate : fraction of all sequences the prefilter rejects (these
+            never need a metapredict prediction)
+        caught_failure_rate : fraction of the sequences that fail the full check
+            that the prefilter rejects
+        num_sequences, num_passing : number of sequences and number that pass
+            the full check
+        suggested_threshold : the highest threshold with a false-reject rate
+            at or below max_false_reject_rate for these sequences
+    '''
+    threshold = resolve_prefilter(prefilter)
+    if threshold is None:
+        raise GooseInputError('A prefilter threshold is needed to calibrate the prefilter.')
+    if len(sequences) == 0:
+        raise GooseInputError('At least one sequence is needed to calibrate the prefilter.')
+
+    # imported here to avoid circular imports
+    if original_sequence is None:
+        from goose.backend.sequence_generation import check_disorder_batch
+        passes = np.array(check_disorder_batch(sequences, disorder_threshold=disorder_threshold, strict=strict))
+    else:
+        from goose.backend.predict_disorder import predict_disorder
+        from goose.backend.disorder_rules import sequence_variant_disorder_batch
+        original_disorder = predict_disorder(original_sequence)
+        passes = np.array(sequence_variant_disorder_batch(sequences, original_disorder, cutoff_val=disorder_threshold, strict=strict))
+
+    # sequences too short to score are never rejected
+    scores = np.array([prefilter_score(sequence) if len(sequence) >= CONTEXT_LENGTH else np.inf for sequence in sequences])
+    rejected = scores < threshold
+
+    num_passing = int(np.sum(passes))
+    num_failing = len(sequences) - num_passing
+    if num_passing > 0:
+        false_reject_rate = float(np.sum(rejected & passes) / num_passing)
+        # rejecting everything below the k-th lowest passing score rejects k passing sequences
+        passing_scores = np.sort(scores[passes])
+        allowed_rejects = int(np.floor(max_false_reject_rate * num_passing))
+        suggested_threshold = float(passing_scores[allowed_rejects]) if allowed_rejects < num_passing else float(passing_scores[-1])
+    else:
+        false_reject_rate = 0.0
+        suggested_threshold = None
+    if num_failing > 0:
+        caught_failure_rate = float(np.sum(rejected & ~passes) / num_failing)
+    else:
+        caught_failure_rate = 0.0
+
+    return {'threshold': threshold, 'false_reject_rate': false_reject_rate,
+            'rejection_rate': float(np.mean(rejected)), 'caught_failure_rate': caught_failure_rate,
+            'num_sequences': len(sequences), 'num_passing': num_passing,
+            'suggested_threshold': suggested_threshold}
@@ -0,0 +1,243 @@
+'''
+Vectorized versions of the rules GOOSE uses to decide whether a
+predicted disorder profile counts as disordered.
+
+evaluate_disorder_batch applies the rules from check_disorder (see
+goose.backend.sequence_generation) and variant_disorder_batch applies the
+rules from sequence_variant_disorder (see goose.backend.variant_generation
+and goose.backend.gen_minimal_variant_backend) to a 2-D array of profiles
+(one row per sequence) at once and return one bool per row. They give
+exactly the same answers as walking each profile residue by residue.
+sequence_variant_disorder_batch predicts a list of variants in one batch
+and checks them with variant_disorder_batch. It is used by both of the
+modules that have a sequence_variant_disorder.
+
+The rules in both cases:
+   - up to 5 % of the residues (rounded, at least 1) can be 'ordered'
+   - no more than consec_allowed ordered residues in a row, where
+     consec_allowed is the sequence length / 25 (rounded) but between 1 and 10
+   - if strict is True, no residues can be ordered
+
+For check_disorder a residue is ordered if it is below the disorder
+threshold. For variants a residue is ordered if it is below the disorder of
+the same residue in the original sequence, where the original disorder is
+clipped to the cutoff value (so the variant only has to be as disordered as
+the original where the original was below the cutoff).
+'''
+
+import numpy as np
+
+from goose.backend import parameters
+from goose.backend.disorder_prefilter import passes_prefilter
+from goose.backend.predict_disorder import predict_disorder_batch
+
+
+def order_allowances(sequence_length):
+    '''
+    returns the number of ordered residues allowed in a sequence
+    and the number of those allowed to be consecutive.
+
+    Parameters
+    ----------
+    sequence_length : Int
+        The length of the sequence
+
+    Returns
+    -------
+    Tuple
+        (allowed_order_residues, consec_allowed)
+    '''
+    # allow up to 5 % of residues to be 'ordered' provided they aren't consecutive
+    allowed_order_residues = round(0.05*sequence_length)
+    if allowed_order_residues < 1:
+        allowed_order_residues = 1
+
+    # allow up to the length of the sequence over 25 but not greater than 10
+    consec_allowed = round(sequence_length/25)
+    if consec_allowed < 1:
+        consec_allowed = 1
+    if consec_allowed > 10:
+        consec_allowed = 10
+    return allowed_order_residues, consec_allowed
+
+
+def longest_order_streaks(ordered):
+    '''
+    returns the length of the longest run of True values in
+    each row of a 2-D bool array.
+    '''
+    ordered = np.asarray(ordered, dtype=bool)
+    if ordered.shape[1] == 0:
+        return np.zeros(ordered.shape[0], dtype=np.int64)
+    running_total = np.cumsum(ordered, axis=1)
+    # the running total at the last residue that wasn't ordered
+    last_reset = np.maximum.accumulate(np.where(ordered, 0, running_total), axis=1)
+    return np.max(running_total - last_reset, axis=1)
+
+
+def _ordered_acceptance(ordered, sequence_length, strict):
+    '''
+    applies the budget / streak rules to a 2-D bool array
+    of ordered residues.
+    '''
+    num_ordered = np.sum(ordered, axis=1)
+    if strict == True:
+        return num_ordered == 0
+    allowed_order_residues, consec_allowed = order_allowances(sequence_length)
+    return (num_ordered <= allowed_order_residues) & (longest_order_streaks(ordered) <= consec_allowed)
+
+
+def _as_profile_array(profiles):
+    '''
+    returns profiles as a 2-D float64 array and the dtype the profiles 
+    came in (float32 for predictions from goose.backend.predict_disorder).
+    '''
+    profiles = np.asarray(profiles)
+    dtype = profiles.dtype if profiles.dtype.kind == 'f' else np.dtype(np.float64)
+    return np.atleast_2d(profiles.astype(np.float64)), dtype
+
+
+def _scalar_threshold(threshold, dtype):
+    '''
+    returns threshold as it is compared to a single profile value of dtype
+    (what the residue by residue loops did). Whether a float32 value is
+    compared to a python float in float32 or float64 depends on the NumPy
+    version (NEP 50), so the threshold is rounded to the type NumPy uses.
+    Comparing the float64 profiles to that gives the same answers.
+    '''
+    compared_type = (dtype.type(0) + threshold).dtype.type
+    return float(compared_type(threshold))
+
+
+def evaluate_disorder_batch(profiles, sequence_length, disorder_threshold, strict=False):
+    '''
+    applies the rules used by check_disorder to many disorder profiles.
+
+    Parameters
+    ----------
+    profiles : np.ndarray
+        2-D array of predicted disorder values, one row per sequence. As for
+        evaluate_disorder, these are the values for the region checked by
+        check_disorder (the terminal residues are removed for sequences
+        over 20 amino acids).
+
+    sequence_length : Int
+        The length of the sequences (not the profiles). All rows must be
+        for sequences of this length.
+
+    disorder_threshold : Float
+        The disorder threshold value.
+
+    strict : Bool
+        Whether to allow for any residues below the disorder_threshold.
+
+    Returns
+    -------
+    np.ndarray
+        bool array with True for each profile that counts as disordered
+    '''
+    profiles, dtype = _as_profile_array(profiles)
+    disorder_threshold = _scalar_threshold(disorder_threshold, dtype)
+    min_disorder = np.min(profiles, axis=1)
+    ordered = profiles < disorder_threshold
+    accepted = _ordered_acceptance(ordered, sequence_length, strict)
+
+    # everything over the threshold always passes and a very low
+    # minimum always fails
+    accepted[min_disorder < 0.25] = False
+    accepted[min_disorder >= disorder_threshold] = True
+    return accepted
+
+
+def variant_disorder_batch(variant_profiles, original_profiles, cutoff_val, strict=False):
+    '''
+    applies the rules used by sequence_variant_disorder to many
+    variant disorder profiles.
+
+    Parameters
+    ----------
+    variant_profiles : np.ndarray
+        2-D array of the predicted disorder of the variants, one row per
+        variant. All variants must be the same length.
+
+    original_profiles : np.ndarray
+        The disorder of the original sequence. Either a single profile
+        that is used for every variant or a 2-D array with one row per
+        variant.
+
+    cutoff_val : Float
+        The cutoff value for disorder.
+
+    strict : Bool
+        If True, no residue of a variant can be less disordered than
+        the (clipped) original.
+
+    Returns
+    -------
+    np.ndarray
+        bool array with True for each variant that counts as disordered
+    '''
+    variant_profiles, variant_dtype = _as_profile_array(variant_profiles)
+    sequence_length = variant_profiles.shape[1]
+    original_profiles, original_dtype = _as_profile_array(original_profiles)
+    original_profiles = original_profiles[:, :sequence_length]
+
+    # the variant only needs to be as disordered as the original up to the cutoff
+    clipped = original_profiles > _scalar_threshold(cutoff_val, original_dtype)
+    adjusted_disorder_values = np.where(clipped, _scalar_threshold(cutoff_val, variant_dtype), original_profiles)
+    ordered = variant_profiles < adjusted_disorder_values
+    return _ordered_acceptance(ordered, sequence_length, strict)
+
+
+def sequence_variant_disorder_batch(sequences, original_disorder_list, cutoff_val=parameters.DISORDER_THRESHOLD, strict=False, backend=None, prefilter=None):
+    '''
+    checks whether each of many sequence variants is disordered. 
+    Applies exactly the same rules as sequence_variant_disorder but 
+    predicts the variants in a single batch and checks all variants 
+    of the same length at once with variant_disorder_batch.
+
+    Parameters
+    ----------
+    sequences : List
+        The variant sequences that are being checked for disorder
+
+    original_disorder_list : List
+        The disorder values of the sequence the variants were made from
+
+    cutoff_val : Float
+        The cutoff value for disorder.
+
+    strict : Bool
+        If True, no residue of a variant can be less disordered than
+        the (clipped) original.
+
+    backend : None, String, or DisorderBackend
+        The disorder predictor to use. See sequence_variant_disorder.
+
+    prefilter : None, Bool, or Float
+        If set, variants that fail the lookup table prefilter are
+        rejected without being predicted. See sequence_variant_disorder.
+
+    Returns
+    -------
+    List
+        A list of bools (one per variant) where True means the 
+        variant is disordered
+    '''
+    results = [False]*len(sequences)
+
+    # only predict the variants that get through the prefilter
+    to_check = [seq_num for seq_num in range(0, len(sequences)) if passes_prefilter(sequences[seq_num], prefilter)]
+    if to_check == []:
+        return results
+    predictions = predict_disorder_batch([sequences[seq_num] for seq_num in to_check], backend=backend)
+
+    # variants of the same length are checked together
+    by_length = {}
+    for prediction_num in range(0, len(to_check)):
+        by_length.setdefault(len(predictions[prediction_num]), []).append(prediction_num)
+    for prediction_nums in by_length.values():
+        accepted = variant_disorder_batch([predictions[prediction_num] for prediction_num in prediction_nums], original_disorder_list, cutoff_val, strict=strict)
+        for prediction_num, is_disordered in zip(prediction_nums, accepted):
+            results[to_check[prediction_num]] = bool(is_disordered)
+    return results
@@ -0,0 +1,189 @@
+'''
+Optional persistent on-disk store for predicted disorder profiles.
+
+Profiles are kept in a local SQLite file keyed on a digest of the sequence
+and the version of the predictor used to make them, so a store can be
+reused across runs (and shared by several worker processes) without
+ever returning a profile made by a different predictor. The number of
+profiles in the store is bounded; once it is full the least recently
+used profiles are removed.
+
+The store is used by goose.backend.predict_disorder once it has been
+turned on with enable_disorder_store (or by setting the
+GOOSE_DISORDER_STORE environment variable to the path of the file).
+'''
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+
+from goose.goose_exceptions import GooseInputError
+
+
+def sequence_digest(sequence):
+    '''
+    returns the digest used to identify a sequence in the store.
+    '''
+    return hashlib.sha1(sequence.encode('utf-8')).hexdigest()
+
+
+class DisorderStore:
+    '''
+    SQLite backed store of disorder profiles.
+
+    Each thread (and each process) gets its own connection to the
+    database so the store can be used from threaded or forked workers.
+    SQLite handles the locking between processes; if the database stays
+    locked for longer than timeout the read or write is skipped rather
+    than failing the calculation that needed the profile.
+
+    Parameters
+    ----------
+    path : String
+        Path to the SQLite file. Made if it doesn't exist.
+
+    max_entries : Int
+        Maximum number of profiles to keep in the store.
+
+    timeout : Float
+        How long (in seconds) to wait on a locked database.
+    '''
+    def __init__(self, path, max_entries=1000000, timeout=30.0):
+        if type(max_entries) != int or max_entries < 1:
+            raise GooseInputError('max_entries for the disorder store must be an integer greater than 0.')
+        self.path = os.path.abspath(path)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.__local = threading.local()
+        # make the table up front so that problems with the path show up here
+        self.__connection()
+
+
+    def __connection(self):
+        '''
+        returns the connection for the current thread / process.
+        '''
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.OperationalError:
+                # WAL isn't available on every file system, the default
+                # journal still works with concurrent processes.
+                pass
+            connection.execute('''CREATE TABLE IF NOT EXISTS disorder (
+                                   digest TEXT NOT NULL,
+                                   version TEXT NOT NULL,
+                                   length INTEGER NOT NULL,
+                                   profile BLOB NOT NULL,
+                                   last_used REAL NOT NULL,
+                                   PRIMARY KEY (digest, version))''')
+            connection.execute('CREATE INDEX IF NOT EXISTS disorder_last_used ON disorder (last_used)')
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+
+    def get_many(self, sequences, predictor_version):
+        '''
+        returns a dict of sequence : profile for every sequence
+        in sequences that is in the store. Only profiles made by 
+        predictor_version are returned.
+        '''
+        digests = {}
+        for sequence in sequences:
+            digests[sequence_digest(sequence)] = sequence
+
+        found = {}
+        if digests == {}:
+            return found
+
+        digest_list = list(digests.keys())
+        try:
+            connection = self.__connection()
+            # stay well under the SQLite limit on the number of parameters
+            for start in range(0, len(digest_list), 500):
+                chunk = digest_list[start:start+500]
+                placeholders = ','.join(['?']*len(chunk))
+                rows = connection.execute(f'SELECT digest, length, profile FROM disorder WHERE version=? AND digest IN ({placeholders})',
+                                          [predictor_version] + chunk).fetchall()
+                for digest, length, profile in rows:
+                    sequence = digests[digest]
+                    # guard against digest collisions
+                    if length == len(sequence):
+                        found[sequence] = np.frombuffer(profile, dtype=np.float32)
+            if found != {}:
+                used = [(time.time(), sequence_digest(sequence), predictor_version) for sequence in found]
+                connection.executemany('UPDATE disorder SET last_used=? WHERE digest=? AND version=?', used)
+        except sqlite3.OperationalError:
+            pass
+        return found
+
+
+    def get(self, sequence, predictor_version):
+        '''
+        returns the profile for sequence made by predictor_version
+        or None if it isn't in the store.
+        '''
+        return self.get_many([sequence], predictor_version).get(sequence)
+
+
+    def put_many(self, profiles, predictor_version):
+        '''
+        adds a dict of sequence : profile made by predictor_version to 
+        the store and removes the least recently used profiles if the 
+        store is over max_entries.
+        '''
+        if len(profiles) == 0:
+            return
+        now = time.time()
+        rows = [(sequence_digest(sequence), predictor_version, len(sequence),
+                 np.asarray(profile, dtype=np.float32).tobytes(), now) for sequence, profile in profiles.items()]
+        try:
+            connection = self.__connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany('INSERT OR REPLACE INTO disorder (digest, version, length, profile, last_used) VALUES (?, ?, ?, ?, ?)', rows)
+                num_entries = connection.execute('SELECT COUNT(*) FROM disorder').fetchone()[0]
+                if num_entries > self.max_entries:
+                    connection.execute('DELETE FROM disorder WHERE rowid IN (SELECT rowid FROM disorder ORDER BY last_used ASC LIMIT ?)',
+                                       (num_entries - self.max_entries,))
+                connection.execute('COMMIT')
+            except:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.OperationalError:
+            pass
+
+
+    def put(self, sequence, profile, predictor_version):
+        '''
+        adds a single profile to the store.
+        '''
+        self.put_many({sequence: profile}, predictor_version)
+
+
+    def __len__(self):
+        return self.__connection().execute('SELECT COUNT(*) FROM disorder').fetchone()[0]
+
+
+    def clear(self):
+        '''
+        removes every profile from the store.
+        '''
+        self.__connection().execute('DELETE FROM disorder')
+
+
+    def close(self):
+        '''
+        closes the connection for the current thread.
+        '''
+        connection = getattr(self.__local, 'connection', None)
+        if connection is not None and self.__local.pid == os.getpid():
+            connection.close()
+        self.__local.connection = None
@@ -7,13 +7,17 @@ isn't ideal...
 
 
 import random
-import metapredict as meta
+import numpy as np
+from goose.backend.disorder_prefilter import passes_prefilter
+from goose.backend.disorder_rules import variant_disorder_batch, sequence_variant_disorder_batch
+from goose.backend.predict_disorder import predict_disorder, predict_disorder_batch, predict_disorder_incremental_batch
 
 from goose.goose_exceptions import GooseInputError, GooseFail
 from goose.backend import parameters
 from goose.backend.protein import Protein
 from goose.backend.sequence_generation_backend import get_optimal_residue, random_amino_acid
-from goose.backend.lists import aa_dis_val_4_v3
+from goose.backend.disorder_lookup import reduced_key, disorder_table, context_indices, encode_sequences
+from goose.backend.optimizer_state import PropertyState
 
 
 #weighted lists from original GOOSE
@@ -37,7 +41,7 @@ charged_list = ['D', 'E', 'D', 'E', 'D', 'E', 'D', 'E', 'K', 'R', 'K', 'R', 'K',
 amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
 
 
-def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff=parameters.DISORDER_THRESHOLD, strict=False):
+def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff=parameters.DISORDER_THRESHOLD, strict=False, backend=None, prefilter=None):
     """
     Function for determining if a sequence variant is disordered. The
     purpose of this over the typical check_disorder function for generated
@@ -68,6 +72,16 @@ def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff=p
         if set to true, will not count a sequence as disordered even if a single amino
         acid falls below the cutoff value.
 
+    backend : None, string, or DisorderBackend
+        The disorder predictor to use for the variant. None uses the
+        default predictor. Should be the same predictor that was used
+        for original_disorder_list.
+
+    prefilter : None, bool, or float
+        If set, the variant is rejected without predicting its disorder
+        if its lookup table disorder score is below the prefilter threshold.
+        See goose.backend.disorder_prefilter. Default is None (no prefilter).
+
     Returns
     ---------
 
@@ -81,75 +95,17 @@ def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff=p
     # just... I know.
     cutoff_val = cutoff
 
-    # first get the list of disordered residues for the current sequence
-    variant_disorder_list = meta.predict_disorder(current_sequence)
-
-    # first make a 'modified' disorder value list so that
-    # residues can go below cutoff.
-    adjusted_disorder_values = []
-
-    # for the disorder values in the disorder list
-    for disorder_vals in range(0, len(variant_disorder_list)):
-
-        # get the original disorder value at the current position
-        input_disorder = original_disorder_list[disorder_vals]
-        
-        # if the input disorder value is greater than the specified cutoff value
-        if input_disorder > cutoff_val:
-            # reduce the necessary input disorder value to the cutoff value
-            input_disorder = cutoff_val
-
-        # otherwise, the input disorder value is simply equal to the disorder
-        # value for the original sequence residue at the current position
-        else:
-            input_disorder = input_disorder
-
-        adjusted_disorder_values.append(input_disorder)
-
-    # keep track of consecutively ordered residues and total ordered
-    cur_order_streak = 0
-    total_ordered_residues = 0
-
-    # allow up to 5 % of residues to be 'ordered' provided they aren't consecutive
-    allowed_order_residues = round(0.05*len(current_sequence))
-    if allowed_order_residues < 1:
-        allowed_order_residues = 1
-
-    # calculate number of conseuctively allowed residues
-    # going to allow up to the length of the sequence over 25 but 
-    # not greater than 10
-    consec_allowed = round(len(current_sequence)/25)
-    if consec_allowed < 1:
-        consec_allowed = 1
-    if consec_allowed > 10:
-        consec_allowed = 10
-
-    for disorder_val in range(0, len(adjusted_disorder_values)):
-        # get current values for the original and the variant
-        variant_disorder = variant_disorder_list[disorder_val]
-        original_disorder = adjusted_disorder_values[disorder_val]
-
-        # see if strict set to true
-        if strict == True:
-            if variant_disorder < original_disorder:
-                return False
-        else:
-            if variant_disorder < original_disorder:
-                cur_order_streak += 1
-                total_ordered_residues += 1
-            else:
-                cur_order_streak = 0
-            # check to see if order streak is too high
-            # or total num ordered residues too high
-            if cur_order_streak > consec_allowed:
-                return False
-            if total_ordered_residues > allowed_order_residues:
-                return False
+    # reject hopeless variants before predicting disorder
+    if passes_prefilter(current_sequence, prefilter) == False:
+        return False
 
-    # if all residues in the sequence variant are greater than either
-    # the original value or at least the cutoff value, return True
-    return True
+    # first get the list of disordered residues for the current sequence
+    variant_disorder_list = predict_disorder(current_sequence, backend=backend)
 
+    # residues can go below the cutoff as long as they are at least as 
+    # disordered as the original. The rules are applied by 
+    # variant_disorder_batch (see goose.backend.disorder_rules)
+    return bool(variant_disorder_batch([variant_disorder_list], original_disorder_list, cutoff_val, strict=strict)[0])
 
 
 
@@ -222,45 +178,12 @@ def optimal_residue_key(four_amino_acids):
 
     """
 
-    # make an empty string to hold the 4 amino acids
-    key = ""
-
-    # for the amino acids in the input amino acids, change each one
-    # to the corresponding amino acid used for the dis_val_dict
-    for i in four_amino_acids:
-        if i == "F" or i == "W" or i == "Y":
-            key += "W"
-        elif i == "C":
-            key += "C"
-        elif i == "L" or i == "V" or i == "I":
-            key += "L"
-        elif i == "M":
-            key += "M"
-        elif i == "A":
-            key += "A"
-        elif i == "H":
-            key += "H"
-        elif i == "K" or i == "R":
-            key += "K"
-        elif i == "Q" or i == "N":
-            key += "Q"
-        elif i == "D" or i == "E":
-            key += "D"
-        elif i == "G" or i == "S":
-            key += "G"
-        elif i == "T":
-            key += "T"
-        elif i == "P":
-            key += "P"
-        else:
-            continue
-    
-    # return the final 4 amino acids that are the key to the 
-    # dis_val_dict
-    return key
+    # change each amino acid to the corresponding amino acid used 
+    # for the dis_val_dict (see goose.backend.disorder_lookup)
+    return reduced_key(four_amino_acids)
 
 
-def all_scores_at_position(sequence, position, try_residues=[]):
+def all_scores_at_position(sequence, position, try_residues=[], window=None):
 
     """
     
@@ -279,6 +202,11 @@ def all_scores_at_position(sequence, position, try_residues=[]):
     try_residues : List
         A list of residues to try getting disorder scores fora
 
+    window : Int
+        If set, each substitution is scored by re-predicting only
+        window residues on either side of the position. See
+        all_scores_at_positions.
+
 
     Returns
     ---------
@@ -300,46 +228,88 @@ def all_scores_at_position(sequence, position, try_residues=[]):
     else:
         residues_to_test = try_residues
 
-    # make list to hold lists
-    final_lists = []
+    # score every candidate in one batched prediction
+    value_list = list(all_scores_at_positions(sequence, [position], try_residues=residues_to_test, window=window)[1][0])
 
-    # make empty list to hold potential amino_acids
-    candidate_amino_acids = []
+    # return list of candidate amino acids and their disorder values
+    return [residues_to_test, value_list]
 
-    # make list to hold values
-    value_list = []
 
-    # set best val to lowest possible value
-    best_val = 0
+def _predict_candidates(sequence, candidate_sequences, window):
+    """
+    predicts the disorder of candidate sequences that each differ from
+    sequence at a few positions, either in full or by windowed rescoring.
+    """
+    if window == None:
+        return predict_disorder_batch(candidate_sequences)
+    return predict_disorder_incremental_batch(candidate_sequences, sequence, predict_disorder(sequence), window=window)
 
-    # keep track of best amino acid just in case
-    best_amino_acid = ""
 
-    # get candidate amino acids
-    for candidate in residues_to_test:
-        # make the input sequence 
-        # this depends on where the position of the AA of interest is
-        if position == len(sequence)-1:
-            input_sequence = sequence[0:position] + candidate
-        elif position == 0:
-            input_sequence = candidate + sequence[1:]
-        else:
-            input_sequence = sequence[0:position] + candidate + sequence[position+1:]
+def all_scores_at_positions(sequence, positions, try_residues=[], window=None):
 
-        # calculate disorder values
-        # use sum of disorder for sequence to make sure disorder
-        # is globally maximized
-        disorder_val = sum(meta.predict_disorder(input_sequence))
+    """
+    
+    Function to get all disorder scores for a sequence at
+    several positions at once. Every single-residue substitution
+    at every position is predicted in a single batched prediction.
+
+    Parameters
+    -------------
+
+    sequence : String
+        The amino acid sequence as a string.
+
+    positions : List
+        The positions of the amino acids to examine disorder scores for.
+
+    try_residues : List
+        A list of residues to try getting disorder scores for. 
+        Default is all amino acids.
+
+    window : Int
+        If set, only window residues on either side of each position
+        are re-predicted and spliced into the disorder profile of 
+        the input sequence (see predict_disorder_incremental_batch).
+        Default is None, which predicts every sequence in full.
+
+
+    Returns
+    ---------
+        
+    List
+        A list that holds the amino acids that were tested as well as 
+        a numpy array of shape (number of positions, number of residues)
+        where each value is the summed disorder of the sequence with 
+        that residue at that position.
 
-        # append values to value_list
-        value_list.append(disorder_val)
+    """ 
 
-    # append lists to final list
-    final_lists.append(residues_to_test)
-    final_lists.append(value_list)
+    # amino acids to go through
+    amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+    
+    # determine if to try all amino acids or just specific ones
+    if try_residues == []:
+        residues_to_test = amino_acids
+    else:
+        residues_to_test = list(try_residues)
+
+    # make every single substitution sequence
+    input_sequences = []
+    for position in positions:
+        for candidate in residues_to_test:
+            input_sequences.append(sequence[0:position] + candidate + sequence[position+1:])
+
+    # calculate disorder values
+    # use sum of disorder for sequence to make sure disorder
+    # is globally maximized
+    scores = np.zeros((len(positions), len(residues_to_test)))
+    if input_sequences != []:
+        profiles = _predict_candidates(sequence, input_sequences, window)
+        sums = [np.sum(profile, dtype=np.float64) for profile in profiles]
+        scores[:, :] = np.array(sums).reshape(len(positions), len(residues_to_test))
 
     # return list of candidate amino acids and their disorder values
-    return final_lists
+    return [residues_to_test, scores]
 
 
 def increase_charge_asymmetry(sequence, cutoff=0.65, attempts=20, exclude = [], check_disorder=True):
@@ -382,7 +352,7 @@ def increase_charge_asymmetry(sequence, cutoff=0.65, attempts=20, exclude = [],
 
     # get disorder of the sequence
     if check_disorder == True:
-        starting_disorder = meta.predict_disorder(sequence)
+        starting_disorder = predict_disorder(sequence)
 
 
     # identify positions of negative and positive residues in a sequence
@@ -664,7 +634,7 @@ def decrease_charge_asymmetry(sequence, cutoff=0.65, attempts=100, check_disorde
 
     # get disorder of the sequence
     if check_disorder == True:
-        starting_disorder = meta.predict_disorder(sequence)
+        starting_disorder = predict_disorder(sequence)
 
     # set arbitrary lowest and highest ncpr areas
     lowest_NCPR = 100
@@ -770,7 +740,7 @@ def decrease_charge_asymmetry(sequence, cutoff=0.65, attempts=100, check_disorde
 
 
 
-def slow_optimize_hydro(input_sequence, objective_hydro, use_charged=True, additional_exclusion = []):
+def slow_optimize_hydro(input_sequence, objective_hydro, use_charged=True, additional_exclusion = [], window=None, state=None):
     """
     
     Function to take in a sequence that does not have the
@@ -792,6 +762,16 @@ def slow_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
     additional_exclusion : List
         List of additional residues to exclude
 
+    window : Int
+        If set, candidate substitutions are scored by re-predicting only 
+        window residues on either side of the substitution. Default is None,
+        which predicts every candidate in full.
+
+    state : PropertyState
+        If set, the hydropathy of input_sequence is read from state
+        (see goose.backend.optimizer_state) instead of being added up, 
+        and the change made to the sequence is also made to state.
+
 
     Returns
     ---------
@@ -831,9 +811,12 @@ def slow_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
     }
 
     # calculate current hydropathy
-    total_hydropathy = 0
-    for residue in input_sequence:
-        total_hydropathy += AA_hydro[residue]
+    if state is None:
+        total_hydropathy = 0
+        for residue in input_sequence:
+            total_hydropathy += AA_hydro[residue]
+    else:
+        total_hydropathy = state.hydropathy_tenths / 10
     input_mean_hydropathy = total_hydropathy / len(input_sequence)
     
     # figure out if current hydro is too high or too low and keep track
@@ -943,40 +926,38 @@ def slow_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
     # keep track of best sequence
     best_sequence = ""
 
-    # get candidate amino acids
+    # make every candidate sequence
+    tested_input_sequences = []
     for potential_change in range (0, len(final_candidate_coords)):
         # get the current residue
         candidate = final_candidate_residues[potential_change]
         # set the current position
         position = final_candidate_coords[potential_change]
-
-        # make the input sequence 
-        # this depends on where the position of the AA of interest is
-        if position == len(input_sequence)-1:
-            tested_input_sequence = input_sequence[0:position] + candidate
-        elif position == 0:
-            tested_input_sequence = candidate + input_sequence[1:]
-        else:
-            tested_input_sequence = input_sequence[0:position] + candidate + input_sequence[position+1:]
-
-        # calculate disorder values across whole sequence to account for how residue changes
-        # other residues in the vicinity.
-        disorder_val = sum(meta.predict_disorder(tested_input_sequence))
-
-        if disorder_val > best_val:
-            best_val = disorder_val
-            best_sequence = tested_input_sequence
+        tested_input_sequences.append(input_sequence[0:position] + candidate + input_sequence[position+1:])
+
+    # calculate disorder values across whole sequence to account for how residue changes
+    # other residues in the vicinity. All candidates are predicted in one batch.
+    if tested_input_sequences != []:
+        candidate_disorder = _predict_candidates(input_sequence, tested_input_sequences, window)
+        for potential_change in range(0, len(tested_input_sequences)):
+            disorder_val = np.sum(candidate_disorder[potential_change], dtype=np.float64)
+            if disorder_val > best_val:
+                best_val = disorder_val
+                best_sequence = tested_input_sequences[potential_change]
+                best_change = potential_change
 
     # if there is not a best sequence just return the input sequence
     if best_sequence == "":
         best_sequence = input_sequence
+    elif state is not None:
+        state.substitute(final_candidate_coords[best_change], final_candidate_residues[best_change])
 
     # return the sequence
     return best_sequence
 
 
 
-def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, additional_exclusion = []):
+def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, additional_exclusion = [], state=None):
     """
     
     Function to take in a sequence that does not have the
@@ -1003,6 +984,11 @@ def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
     additional_exclusion : List
         List of additional residues to exclude
 
+    state : PropertyState
+        If set, the hydropathy of input_sequence is read from state
+        (see goose.backend.optimizer_state) instead of being added up, 
+        and the change made to the sequence is also made to state.
+
 
     Returns
     ---------
@@ -1039,9 +1025,12 @@ def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
     }
 
     # calculate current hydropathy
-    total_hydropathy = 0
-    for residue in input_sequence:
-        total_hydropathy += AA_hydro[residue]
+    if state is None:
+        total_hydropathy = 0
+        for residue in input_sequence:
+            total_hydropathy += AA_hydro[residue]
+    else:
+        total_hydropathy = state.hydropathy_tenths / 10
         
     # figure out the input mean hydropathy
     input_mean_hydropathy = total_hydropathy / len(input_sequence)
@@ -1181,13 +1170,13 @@ def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
         # get the current index of the amino acid
         cur_index = amino_acids.index(candidate)
 
-        # iterate over the length of the tested input sequence
-        for i in range(0, len(tested_input_sequence)-4):
-            cur_seq = tested_input_sequence[i:i+4]
-            four_amino_acids_key = optimal_residue_key(cur_seq)
-            potential_AA_vals = aa_dis_val_4_v3[four_amino_acids_key]
-            cur_dis_val = potential_AA_vals[cur_index]
-            total_disorder += cur_dis_val
+        # add up the value for the candidate following every 4 amino acids
+        # of the tested input sequence. The rows of the lookup table for the 
+        # 4 amino acids before residue 4 onwards are the ones needed. 
+        # cumsum adds them in order like the loop over the sequence did.
+        if len(tested_input_sequence) > 4:
+            context_rows = context_indices(encode_sequences(tested_input_sequence))[0, 4:]
+            total_disorder = float(np.cumsum(disorder_table()[context_rows, cur_index])[-1])
 
         # if the total disorder is greater than the best
         if total_disorder > best_val:
@@ -1195,10 +1184,13 @@ def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
             best_val = total_disorder
             # overwrite the best seuqence
             best_sequence = tested_input_sequence
+            best_change = potential_change
 
     # if no best sequence just set best_sequence to input_sequence
     if best_sequence == "":
         best_sequence = input_sequence
+    elif state is not None:
+        state.substitute(final_candidate_coords[best_change], final_candidate_residues[best_change])
 
     # return the sequence
     return best_sequence
@@ -1206,7 +1198,7 @@ def fast_optimize_hydro(input_sequence, objective_hydro, use_charged=True, addit
 
 
 
-def optimize_disorder(input_sequence, exclude = [], cutoff_val=0.7, hold_start_codon=False):
+def optimize_disorder(input_sequence, exclude = [], cutoff_val=0.7, hold_start_codon=False, window=None):
     """
     
     Function to optimize the disorder of an input sequence.
@@ -1232,6 +1224,11 @@ def optimize_disorder(input_sequence, exclude = [], cutoff_val=0.7, hold_start_c
     hold_start_codon : Bool
         Whether or not there is a start codon that needs to be kept in place
 
+    window : Int
+        If set, candidate residues are scored by re-predicting only window 
+        residues on either side of the target position. See 
+        all_scores_at_positions.
+
 
     Returns
     ---------
@@ -1251,7 +1248,7 @@ def optimize_disorder(input_sequence, exclude = [], cutoff_val=0.7, hold_start_c
             test_these_residues.append(aa)
 
     # identify regions that need to be altered
-    input_disorder = meta.predict_disorder(input_sequence)
+    input_disorder = predict_disorder(input_sequence)
 
     # make list of regions to alter
     ordered_regions = []
@@ -1286,10 +1283,10 @@ def optimize_disorder(input_sequence, exclude = [], cutoff_val=0.7, hold_start_c
         for target in target_regions:
             if input_sequence[target] in test_these_residues:
                 test_these_residues.remove(input_sequence[target])
-                values = all_scores_at_position(input_sequence, target, try_residues=test_these_residues)
+                values = all_scores_at_position(input_sequence, target, try_residues=test_these_residues, window=window)
                 test_these_residues.append(input_sequence[target])
             else:
-                values = all_scores_at_position(input_sequence, target, try_residues=test_these_residues)
+                values = all_scores_at_position(input_sequence, target, try_residues=test_these_residues, window=window)
             target_values.append(values)
 
 
@@ -1415,6 +1412,23 @@ def optimize_charge_asymmetry(sequence, objective_charge_asymmetry, cutoff, iter
 
 
 
+def _first_neutral_position(state, hydropathies, highest):
+    '''
+    returns the first position of the neutral residue with the highest 
+    (or lowest) hydropathy in a PropertyState, or 0 if there isn't one.
+    '''
+    first_positions = []
+    for amino_acid, positions in state.positions.items():
+        if amino_acid not in charged_list and positions != []:
+            first_positions.append((hydropathies[amino_acid], positions[0]))
+    if first_positions == []:
+        return 0
+    if highest == True:
+        return max(first_positions, key=lambda value: (value[0], -value[1]))[1]
+    return min(first_positions)[1]
+
+
+
 def gen_minimal_sequence_variant(input_sequence, mean_hydro = '', fraction = '', net_charge = '', charge_asymmetry='', cutoff=parameters.DISORDER_THRESHOLD, strict=False):
 
     '''
@@ -1447,7 +1461,7 @@ def gen_minimal_sequence_variant(input_sequence, mean_hydro = '', fraction = '',
         net_charge = Protein.calc_NCPR(sequence)
 
     # keep track of original disorder
-    original_disorder = meta.predict_disorder(input_sequence)
+    original_disorder = predict_disorder(input_sequence)
 
     # keep track of length
     length = len(input_sequence)
@@ -1545,80 +1559,31 @@ def gen_minimal_sequence_variant(input_sequence, mean_hydro = '', fraction = '',
     # dict of AA hydro values
     AA_hydro = {"A": 6.3, "R": 0.0, "N": 1.0, "D": 1.0, "C": 7.0, "Q": 1.0, "E": 1.0, "G": 4.1, "H": 1.3, "I": 9.0, "L": 8.3, "K": 0.6, "M": 6.4, "F": 7.3, "P": 2.9, "S": 3.7, "T": 3.8, "W": 3.6, "Y": 3.2, "V": 8.7}
     
+    # the hydropathy is kept up to date as charged residues are added
+    state = PropertyState(sequence)
+
     # first for negative residues
     if needed_negative > input_negative_residues:
         difference = int(needed_negative-input_negative_residues)
         for i in range(0, difference):
-            current_sequence_hydropathy = Protein.calc_mean_hydro(sequence)
-
-            if current_sequence_hydropathy > mean_hydro:               
-                best_position = 0
-                best_hydropathy = 0           
-                for i in range(0, len(sequence)):
-                    cur_AA = sequence[i]
-                    if cur_AA not in charged_list:
-                        if AA_hydro[cur_AA] > best_hydropathy:
-                            best_position = i
-                            best_hydropathy = AA_hydro[cur_AA]
-            else:
-                best_position = 0
-                best_hydropathy = 100   
-                for i in range(0, len(sequence)):
-                    cur_AA = sequence[i]
-                    if cur_AA not in charged_list:
-                        if AA_hydro[cur_AA] < best_hydropathy:
-                            best_position = i
-                            best_hydropathy = AA_hydro[cur_AA]
-
-            # now delete the residue and add in a D/E
-            if best_position == 0:
-                new_sequence = random_amino_acid(D_E) + sequence[1:]
-            elif best_position == len(sequence):
-                new_sequence = sequence[0:len(sequence)] + random_amino_acid(D_E)
-            else:
-                new_sequence = sequence[0:best_position] + random_amino_acid(D_E) + sequence[best_position+1:]
-            # now overwrite sequence with new_sequence
-            sequence = new_sequence
+            # replace the most (or least) hydrophobic neutral residue with a D/E
+            best_position = _first_neutral_position(state, AA_hydro, highest=state.mean_hydropathy > mean_hydro)
+            state.substitute(best_position, random_amino_acid(D_E))
 
     # now for positive residues
     if needed_positive > input_positive_residues:
         difference = int(needed_positive-input_positive_residues)
         for i in range(0, difference):
-            current_sequence_hydropathy = Protein.calc_mean_hydro(sequence)
-            
-            if current_sequence_hydropathy > mean_hydro:               
-                best_position = 0
-                best_hydropathy = 0
-                for i in range(0, len(sequence)):
-                    cur_AA = sequence[i]
-                    if cur_AA not in charged_list:
-                        if AA_hydro[cur_AA] > best_hydropathy:
-                            best_position = i
-                            best_hydropathy = AA_hydro[cur_AA]
-            else:
-                best_position = 0
-                best_hydropathy = 100                
-                for i in range(0, len(sequence)):
-                    cur_AA = sequence[i]
-                    if cur_AA not in charged_list:
-                        if AA_hydro[cur_AA] < best_hydropathy:
-                            best_position = i
-                            best_hydropathy = AA_hydro[cur_AA]
-
-            # now delete the residue and add in a D/E
-            if best_position == 0:
-                new_sequence = random_amino_acid(K_R) + sequence[1:]
-            elif best_position == len(sequence):
-                new_sequence = sequence[0:len(sequence)] + random_amino_acid(K_R)
-            else:
-                new_sequence = sequence[0:best_position] + random_amino_acid(K_R) + sequence[best_position+1:]
-            # now overwrite sequence with new_sequence
-            sequence = new_sequence
+            # replace the most (or least) hydrophobic neutral residue with a K/R
+            best_position = _first_neutral_position(state, AA_hydro, highest=state.mean_hydropathy > mean_hydro)
+            state.substitute(best_position, random_amino_acid(K_R))
+
+    sequence = state.sequence
             
     #      altering hydropathy as needed
     #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#    
 
-    error = abs(Protein.calc_mean_hydro(sequence)-mean_hydro)
+    error = abs(state.mean_hydropathy-mean_hydro)
 
     if error > parameters.HYDRO_ERROR:        
         attempted_optimization = 0
@@ -1626,7 +1591,7 @@ def gen_minimal_sequence_variant(input_sequence, mean_hydro = '', fraction = '',
         # start initial optimizations
         prev_seqs = []
         while attempted_optimization < number_iterations:
-            optimized_sequence = fast_optimize_hydro(sequence, mean_hydro, use_charged=False, additional_exclusion='P')
+            optimized_sequence = fast_optimize_hydro(sequence, mean_hydro, use_charged=False, additional_exclusion='P', state=state)
             sequence = optimized_sequence
             # see if this is getting repetetive
             if sequence in prev_seqs:
@@ -1635,20 +1600,20 @@ def gen_minimal_sequence_variant(input_sequence, mean_hydro = '', fraction = '',
             prev_seqs.append(sequence)            
             attempted_optimization = attempted_optimization + 1
 
-            if abs(Protein.calc_mean_hydro(sequence)-mean_hydro) < parameters.HYDRO_ERROR:
+            if abs(state.mean_hydropathy-mean_hydro) < parameters.HYDRO_ERROR:
                 attempted_optimization += number_iterations * 2
 
     #  Bringing out the slow optimizer if needed
     #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#    
 
-    error = abs(Protein.calc_mean_hydro(sequence)-mean_hydro)
+    error = abs(state.mean_hydropathy-mean_hydro)
 
     if error > parameters.HYDRO_ERROR:          
         attempted_optimizations = 0
         number_iterations = len(sequence)
         # start initial optimizations
         while attempted_optimization < number_iterations:
-            optimized_sequence = slow_optimize_hydro(sequence, mean_hydro, use_charged=False, additional_exclusion='P')
+            optimized_sequence = slow_optimize_hydro(sequence, mean_hydro, use_charged=False, additional_exclusion='P', state=state)
             sequence = optimized_sequence
             # see if this is getting repetetive
             if sequence in prev_seqs:
@@ -1657,14 +1622,14 @@ def gen_minimal_sequence_variant(input_sequence, mean_hydro = '', fraction = '',
             prev_seqs.append(sequence)            
             attempted_optimization = attempted_optimization + 1
 
-            if abs(Protein.calc_mean_hydro(sequence)-mean_hydro) < parameters.HYDRO_ERROR:
+            if abs(state.mean_hydropathy-mean_hydro) < parameters.HYDRO_ERROR:
                 attempted_optimization += number_iterations * 2
 
 
     if sequence_variant_disorder(sequence, original_disorder, cutoff=cutoff, strict=strict) == False:
 
         # get sequence disorder
-        sequence_disorder = meta.predict_disorder(sequence)
+        sequence_disorder = predict_disorder(sequence)
         # figure out how many residues have disorder value above the cutoff
         number_ordered_residues = 0
         for dis_val in sequence_disorder:
@@ -0,0 +1,206 @@
+'''
+Builds amino acid compositions with a specific mean hydropathy.
+
+Rather than drawing whole sequences from a weighted list until one
+happens to have the right mean hydropathy, sample_hydropathy_counts draws
+the number of each amino acid from the list's probabilities (so the
+composition starts out the same as a sequence drawn from the list) and
+then changes residues one at a time until the total hydropathy is within
+the allowed error. All hydropathy values are multiples of 0.1, so the
+totals are worked out exactly in integer tenths. Every change lowers the
+distance to the objective, so this always finishes, and it fails
+(returns None) only when no single change can get any closer.
+'''
+
+import threading
+
+import numpy as np
+
+from goose.backend import lists
+from goose.backend import parameters
+from goose.backend.amino_acids import AminoAcid
+from goose.backend.disorder_lookup import AMINO_ACIDS
+from goose.backend.residue_sampler import list_sampler
+
+
+# hydropathy of each amino acid in tenths (in the order of AMINO_ACIDS)
+HYDROPATHY_TENTHS = np.array([round(AminoAcid.hydro(aa)*10) for aa in AMINO_ACIDS], dtype=np.int64)
+
+# change in total hydropathy (in tenths) from changing amino acid i into amino acid j
+_CHANGE_TENTHS = HYDROPATHY_TENTHS[None, :] - HYDROPATHY_TENTHS[:, None]
+
+
+def sample_hydropathy_counts(length, mean_hydro, probabilities, allowed_error, rng):
+    '''
+    returns the number of each amino acid for a sequence of the specified
+    length with a mean hydropathy within allowed_error of mean_hydro.
+
+    Parameters
+    ----------
+    length : Int
+        The length of the sequence
+
+    mean_hydro : Float
+        The objective mean hydropathy
+
+    probabilities : np.ndarray
+        The probability of each amino acid (in the order of
+        disorder_lookup.AMINO_ACIDS). Amino acids with a probability
+        of 0 are never used.
+
+    allowed_error : Float
+        The allowed error between the mean hydropathy and mean_hydro
+
+    rng : np.random.Generator
+        The random generator to use
+
+    Returns
+    -------
+    np.ndarray or None
+        The number of each amino acid, or None if the mean hydropathy
+        couldn't be brought within the allowed error
+    '''
+    counts = rng.multinomial(length, probabilities)
+    allowed = probabilities > 0
+
+    # the objective and allowed error for the total in tenths. A little
+    # is taken off the allowed error so rounding can't push it over.
+    objective_total = mean_hydro*length*10
+    allowed_total_error = allowed_error*length*10 - 1e-6
+
+    total = int(np.dot(counts, HYDROPATHY_TENTHS))
+    while abs(total - objective_total) > allowed_total_error:
+        distance = total - objective_total
+        # changes that get closer to the objective, from an amino acid in the
+        # sequence to one that is allowed. Weighted by how many of the amino acid
+        # there are and the probability of the new amino acid (so the composition
+        # stays as close to the weighted list as it can) and by how much closer
+        # they get (so it doesn't take many tiny changes).
+        improvement = abs(distance) - np.abs(distance + _CHANGE_TENTHS)
+        weights = np.where(improvement > 0, np.outer(counts, probabilities)*improvement, 0.0)
+        weights[:, ~allowed] = 0
+        weight_total = weights.sum()
+        if weight_total == 0:
+            return None
+        change = rng.choice(weights.size, p=(weights / weight_total).ravel())
+        from_aa, to_aa = divmod(int(change), len(AMINO_ACIDS))
+        counts[from_aa] -= 1
+        counts[to_aa] += 1
+        total += int(_CHANGE_TENTHS[from_aa, to_aa])
+    return counts
+
+
+'''
+Residue probabilities for any mean hydropathy.
+
+The weighted lists in HydroDict and NeutralHydroDict are for mean
+hydropathy values in steps of 0.1. hydropathy_distribution interpolates
+between the amino acid probabilities of the lists either side of any
+objective value and then tilts the probabilities (multiplying each by
+exp(tilt * hydropathy) and renormalising) so that the expected mean
+hydropathy is exactly the objective. Sequences drawn from it are centred
+on the objective rather than on the nearest list.
+'''
+
+# hydropathy of each amino acid
+HYDROPATHY = HYDROPATHY_TENTHS / 10
+
+# the list dicts that can be used and (hydropathy values, probabilities) for each
+_DISTRIBUTION_DICTS = {False: 'HydroDict', True: 'NeutralHydroDict'}
+_bin_tables = {}
+_bin_tables_lock = threading.Lock()
+
+
+def _bin_table(dict_name):
+    '''
+    returns (hydropathy values, probabilities) for the lists in one of
+    the list dicts, sorted by hydropathy. The hydropathy of each list is
+    the value in its name (e.g. Hydro_dis_2_5 is 2.5).
+    '''
+    table = _bin_tables.get(dict_name)
+    if table is None:
+        with _bin_tables_lock:
+            list_names = sorted(set(lists.load_data_array(f'{dict_name}__lists').tolist()))
+            values = [float('.'.join(list_name.split('_')[-2:])) for list_name in list_names]
+            order = np.argsort(values)
+            probabilities = []
+            for list_num in order:
+                weights = list_sampler(list_names[list_num]).weights
+                probabilities.append(weights / weights.sum())
+            table = (np.array(values)[order], np.array(probabilities))
+            _bin_tables[dict_name] = table
+    return table
+
+
+def tilt_probabilities(probabilities, mean_hydro):
+    '''
+    returns probabilities multiplied by exp(tilt * hydropathy) and
+    renormalised, with the tilt chosen so that the expected mean hydropathy
+    is mean_hydro. Objectives outside of what the amino acids with a
+    probability above 0 can reach give the closest that can be reached.
+    '''
+    allowed = probabilities > 0
+    log_probabilities = np.log(np.where(allowed, probabilities, 1.0))
+
+    def tilted(tilt):
+        log_weights = np.where(allowed, log_probabilities + tilt*HYDROPATHY, -np.inf)
+        weights = np.exp(log_weights - log_weights.max())
+        return weights / weights.sum()
+
+    # the expected hydropathy goes up with the tilt, so find the tilt by bisection
+    low, high = -parameters.HYDROPATHY_MAX_TILT, parameters.HYDROPATHY_MAX_TILT
+    for iteration in range(0, 60):
+        middle = (low + high) / 2
+        if np.dot(tilted(middle), HYDROPATHY) < mean_hydro:
+            low = middle
+        else:
+            high = middle
+        if high - low < 1e-9:
+            break
+    return tilted((low + high) / 2)
+
+
+def hydropathy_distribution(mean_hydro, just_neutral=False, exclude_residues=None):
+    '''
+    returns the probability of each amino acid (in the order of
+    disorder_lookup.AMINO_ACIDS) for generating sequences with a mean
+    hydropathy of mean_hydro.
+
+    Parameters
+    ----------
+    mean_hydro : Float
+        The objective mean hydropathy
+
+    just_neutral : Bool
+        Whether to use the lists without charged residues (NeutralHydroDict)
+        rather than HydroDict
+
+    exclude_residues : List
+        Residues that can't be used
+
+    Returns
+    -------
+    np.ndarray or None
+        The probabilities, or None if every residue in the
+        lists was excluded
+    '''
+    values, probabilities = _bin_table(_DISTRIBUTION_DICTS[just_neutral == True])
+
+    # interpolate between the lists either side of mean_hydro
+    # (anything past the first or last list uses that list)
+    upper = int(np.searchsorted(values, mean_hydro))
+    if upper == 0:
+        interpolated = probabilities[0]
+    elif upper == len(values):
+        interpolated = probabilities[-1]
+    else:
+        fraction = (mean_hydro - values[upper-1]) / (values[upper] - values[upper-1])
+        interpolated = (1-fraction)*probabilities[upper-1] + fraction*probabilities[upper]
+
+    if exclude_residues:
+        interpolated = np.where([aa in exclude_residues for aa in AMINO_ACIDS], 0.0, interpolated)
+        if interpolated.sum() == 0:
+            return None
+        interpolated = interpolated / interpolated.sum()
+
+    return tilt_probabilities(interpolated, mean_hydro)
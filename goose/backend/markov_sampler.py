@@ -0,0 +1,237 @@
+'''
+Batch version of growing sequences one residue at a time with
+get_optimal_residue.
+
+When GOOSE grows a sequence with get_optimal_residue, the next residue is
+a random choice from the candidates for the (reduced) 4 residues before
+it, so growing a sequence is a Markov chain whose states are the 12**4
+reduced 4 residue contexts of the aa_dis_val_4_v3 table (or the contexts 
+of the table set with set_optimal_residue_table). Here the candidates for
+every context (for a given table, cutoff and set of excluded residues) 
+are compiled into a transition table once, and many chains are then 
+grown together, one position at a time for all of them, with numpy.
+
+sample_chains can also fill in only some positions of sequences where the
+other positions are fixed (the '0' positions of create_seq_by_fracs).
+'''
+
+import threading
+
+import numpy as np
+
+from goose.backend import parameters
+from goose.backend.disorder_lookup import decode_sequences, encode_sequences, load_lookup_table, AMINO_ACIDS
+from goose.backend.residue_sampler import list_sampler, numpy_rng
+from goose.goose_exceptions import GooseError, GooseInputError
+
+
+# ASCII codes of the amino acids in the order of the table columns
+_AMINO_ACID_CODES = np.frombuffer(''.join(AMINO_ACIDS).encode('ascii'), dtype=np.uint8)
+
+# class digit of anything that isn't an amino acid (see LookupTable.class_digits)
+_INVALID = 255
+
+# marks positions to be filled in by sample_chains
+FREE_POSITION = ord('0')
+
+# transition tables made so far, keyed by (lookup table, cutoff, exclusion bit mask)
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def _effective_cutoff(cutoff_disorder):
+    '''
+    the cutoff get_optimal_residue uses for a cutoff_disorder argument.
+    '''
+    if cutoff_disorder == None:
+        cutoff_disorder = parameters.OPTIMAL_RESIDUE_CUTOFF
+    if cutoff_disorder > 0.95:
+        cutoff_disorder = 0.95
+    return cutoff_disorder
+
+
+def _build_transition_table(lookup_table, cutoff_disorder, excluded):
+    '''
+    returns (candidates, counts) where candidates[row, :counts[row]] are
+    the table columns get_optimal_residue picks from for context row.
+    '''
+    table = lookup_table.values
+    passing = (table > cutoff_disorder) & ~excluded
+    counts = passing.sum(axis=1)
+    # candidates in table column order, first counts[row] columns of each row
+    candidates = np.argsort(~passing, axis=1, kind='stable').astype(np.uint8)
+
+    # rows with nothing over the cutoff use the best residue that isn't
+    # excluded, where tied values always resolve to the first residue with
+    # that value (get_optimal_residue uses list.index on the values)
+    fallback_rows = np.flatnonzero(counts == 0)
+    if len(fallback_rows) > 0:
+        values = table[fallback_rows]
+        ties = values[:, :, None] == values[:, None, :]
+        first_with_value = ~np.any(np.tril(ties, -1), axis=2)
+        reachable = first_with_value & ~excluded
+        best = np.argmax(np.where(reachable, values, -np.inf), axis=1)
+        candidates[fallback_rows, 0] = best
+        # nothing reachable (get_optimal_residue fails here) leaves a count of 0
+        counts[fallback_rows] = np.any(reachable, axis=1)
+
+    candidates.setflags(write=False)
+    counts.setflags(write=False)
+    return candidates, counts
+
+
+def transition_table(exclude_residues=[], cutoff_disorder=None, table=None):
+    '''
+    returns the transition table for growing sequences with get_optimal_residue.
+
+    Parameters
+    ----------
+    exclude_residues : List
+        Residues that can't be chosen
+
+    cutoff_disorder : Float
+        The cutoff passed to get_optimal_residue (None for its default)
+
+    table : None, LookupTable, or String
+        The lookup table the candidates come from (see
+        disorder_lookup.load_lookup_table). None uses aa_dis_val_4_v3.
+
+    Returns
+    -------
+    Tuple
+        (candidates, counts). For each context row of the table (see
+        disorder_lookup) candidates[row, :counts[row]] are the columns of
+        the amino acids (in the order of disorder_lookup.AMINO_ACIDS) that
+        can follow that context. A count of 0 means no amino acid can.
+    '''
+    if len(exclude_residues) >= 20:
+        raise GooseInputError("You cannot exclude all amino acids.")
+    table = load_lookup_table(table)
+    if table.context_length != 4:
+        raise GooseInputError(f'get_optimal_residue needs a lookup table with a context of 4 residues, {table.name} has a context of {table.context_length}.')
+    cutoff_disorder = _effective_cutoff(cutoff_disorder)
+    excluded = np.array([aa in exclude_residues for aa in AMINO_ACIDS])
+    exclusion_mask = 0
+    for aa_num in np.flatnonzero(excluded).tolist():
+        exclusion_mask |= 1 << aa_num
+    table_key = (table, cutoff_disorder, exclusion_mask)
+    transitions = _tables.get(table_key)
+    if transitions is None:
+        transitions = _build_transition_table(table, cutoff_disorder, excluded)
+        with _tables_lock:
+            if len(_tables) >= parameters.TRANSITION_TABLE_CACHE_SIZE:
+                del _tables[next(iter(_tables))]
+            _tables[table_key] = transitions
+    return transitions
+
+
+def clear_transition_tables():
+    '''
+    removes the transition tables made so far.
+    '''
+    with _tables_lock:
+        _tables.clear()
+
+
+def sample_chains(num_sequences, length, exclude_residues=[], cutoff_disorder=None, fixed=None, starters=None, as_strings=False, rng=None, table=None):
+    '''
+    grows num_sequences sequences together the same way create_seq_by_props
+    grows a sequence of a given length (and create_seq_by_fracs fills in
+    the positions it doesn't have residues for).
+
+    Parameters
+    ----------
+    num_sequences : Int
+        The number of sequences to make
+
+    length : Int
+        The length of the sequences
+
+    exclude_residues : List
+        Residues that can't be chosen
+
+    cutoff_disorder : Float
+        The cutoff passed to get_optimal_residue (None for its default)
+
+    fixed : List or np.ndarray
+        Optional. Sequences (strings or a uint8 array of ASCII codes) with the
+        residues that are already set and '0' at the positions to fill in.
+        Either one for every sequence or a single one used for all of them. As
+        in create_seq_by_fracs, while fewer than 4 residues have been placed
+        the residues that are filled in use the starter and the residues filled
+        in so far for their context, and after that the 4 residues before them.
+
+    starters : List or np.ndarray
+        Optional. The 4 residue starter for each sequence. By default these
+        are drawn from lists.disordered_list.
+
+    as_strings : Bool
+        Whether to return a list of strings rather than a uint8 array
+
+    rng : np.random.Generator
+        The random generator to use. By default a new one seeded
+        from python's random module is used.
+
+    table : None, LookupTable, or String
+        The lookup table get_optimal_residue uses (see transition_table).
+        None uses aa_dis_val_4_v3.
+
+    Returns
+    -------
+    np.ndarray or List
+        uint8 array of ASCII codes with shape (num_sequences, length)
+        or the sequences as a list of strings
+    '''
+    table = load_lookup_table(table)
+    candidates, counts = transition_table(exclude_residues, cutoff_disorder, table=table)
+    num_classes = len(table.classes)
+    num_contexts = num_classes**4
+    if rng is None:
+        rng = numpy_rng()
+
+    if starters is None:
+        starters = list_sampler('disordered_list').sample_codes(num_sequences, 4, rng=rng)
+    starters = encode_sequences(starters)
+    if starters.shape != (num_sequences, 4):
+        raise GooseInputError('sample_chains needs a 4 residue starter for each sequence.')
+
+    if fixed is not None:
+        fixed = encode_sequences(fixed)
+        if fixed.shape[1] != length or fixed.shape[0] not in [1, num_sequences]:
+            raise GooseInputError('sample_chains needs fixed sequences of the right length for each sequence.')
+        if np.any((table.class_digits(fixed) == _INVALID) & (fixed != FREE_POSITION)):
+            raise GooseInputError("Fixed sequences can only contain the 20 standard amino acids and '0'.")
+        fixed = np.broadcast_to(fixed, (num_sequences, length))
+
+    # context row of the starter (plus residues filled in at the start)
+    # and of the last 4 residues of each sequence
+    starter_digits = table.class_digits(starters).astype(np.int64)
+    if np.any(starter_digits == _INVALID):
+        raise GooseInputError('Starters can only contain the 20 standard amino acids.')
+    starter_rows = ((starter_digits[:, 0]*num_classes + starter_digits[:, 1])*num_classes + starter_digits[:, 2])*num_classes + starter_digits[:, 3]
+    sequence_rows = starter_rows.copy()
+
+    sequences = np.empty((num_sequences, length), dtype=np.uint8)
+    for position in range(0, length):
+        rows = starter_rows if position < 4 else sequence_rows
+        row_counts = counts[rows]
+        if np.any(row_counts == 0):
+            raise GooseError('Unable to choose a residue for every sequence with the excluded residues.')
+        choices = (rng.random(num_sequences) * row_counts).astype(np.int64)
+        residues = _AMINO_ACID_CODES[candidates[rows, choices]]
+        if fixed is not None:
+            free = fixed[:, position] == FREE_POSITION
+            residues = np.where(free, residues, fixed[:, position])
+        else:
+            free = None
+        sequences[:, position] = residues
+
+        digits = table.class_digits(residues).astype(np.int64)
+        if position < 4:
+            new_starter_rows = (starter_rows*num_classes + digits) % num_contexts
+            starter_rows = new_starter_rows if free is None else np.where(free, new_starter_rows, starter_rows)
+        sequence_rows = (sequence_rows*num_classes + digits) % num_contexts
+
+    if as_strings == True:
+        return decode_sequences(sequences)
+    return sequences
@@ -0,0 +1,301 @@
+'''
+State for optimizers that swap residues using the lookup table disorder
+values (see fast_predict_disorder and goose.backend.disorder_lookup).
+
+The lookup value of a residue only depends on the residue and the 4
+residues before it (or the first 4 residues for the first 4 residues of
+the sequence), so swapping 2 residues only changes the values of at most
+10 positions. LookupDisorderState holds the per residue values of a
+sequence and updates just those positions after a swap, can give the value
+a position would have after a swap without making the swap, keeps the
+positions of each amino acid, and keeps the values in a heap so that the
+worst residue can be found without going through the whole sequence.
+
+PropertyState holds running totals for the hydropathy and charge of a 
+sequence that is being changed by substituting or swapping residues, so 
+the mean hydropathy, FCR, NCPR, sigma and delta can be read after every 
+change without going through the whole sequence again. Hydropathy is 
+added up in integer tenths, and the number of charged residues and the 
+net charge of each blob (see Protein.delta_pre) are kept so a change only 
+updates the blobs that cover the changed position.
+'''
+
+import bisect
+import heapq
+
+from goose.backend.disorder_lookup import disorder_table, lookup_disorder, REDUCED_RESIDUES, REDUCED_ALPHABET, AMINO_ACIDS
+from goose.backend.amino_acids import AminoAcid
+from goose.backend.protein import Protein, encode_protein, _blob_sigma_table
+
+
+# amino acid -> base 12 digit of its reduced residue
+_REDUCED_DIGITS = {aa: REDUCED_ALPHABET.index(reduced) for aa, reduced in REDUCED_RESIDUES.items()}
+
+# amino acid -> column of the table
+_COLUMNS = {aa: aa_num for aa_num, aa in enumerate(AMINO_ACIDS)}
+
+# amino acid -> hydropathy in tenths and charge
+_HYDRO_TENTHS = {aa: round(AminoAcid.hydro(aa)*10) for aa in AminoAcid.standard_amino_acids}
+_CHARGES = {aa: AminoAcid.charge_value(aa) for aa in AminoAcid.standard_amino_acids}
+
+# blob lengths averaged by Protein.calc_delta
+_BLOB_LENGTHS = (5, 6)
+
+
+class LookupDisorderState:
+    '''
+    The lookup table disorder values of a sequence that is being
+    changed by swapping residues.
+
+    Parameters
+    ----------
+    sequence : String
+        The amino acid sequence (at least 4 amino acids)
+    '''
+    def __init__(self, sequence):
+        # raises GooseInputError for anything the lookup can't handle
+        self.scores = lookup_disorder(sequence).tolist()
+        self.residues = list(sequence)
+        self._table = disorder_table()
+        self._digits = [_REDUCED_DIGITS[aa] for aa in sequence]
+        self._columns = [_COLUMNS[aa] for aa in sequence]
+
+        # sorted positions of each amino acid in the sequence
+        self.positions = {}
+        for position, aa in enumerate(sequence):
+            self.positions.setdefault(aa, []).append(position)
+
+        # heap of (value, position). Entries are left in the heap when a
+        # value changes and skipped when they no longer match
+        self._heap = [(score, position) for position, score in enumerate(self.scores)]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self.residues)
+
+    @property
+    def sequence(self):
+        return ''.join(self.residues)
+
+    def worst_position(self):
+        '''
+        returns the position with the lowest value. Ties go to the first
+        position, the same as scores.index(min(scores)).
+        '''
+        heap = self._heap
+        while heap[0][0] != self.scores[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def _context_row(self, position, digits):
+        start = position-4 if position >= 4 else 0
+        return ((digits[start]*12 + digits[start+1])*12 + digits[start+2])*12 + digits[start+3]
+
+    def score_after_swap(self, position, i, j):
+        '''
+        returns the value position would have if the residues
+        at i and j were swapped, without swapping them.
+        '''
+        digits = self._digits
+        start = position-4 if position >= 4 else 0
+        context = []
+        for context_position in range(start, start+4):
+            if context_position == i:
+                context_position = j
+            elif context_position == j:
+                context_position = i
+            context.append(digits[context_position])
+        row = ((context[0]*12 + context[1])*12 + context[2])*12 + context[3]
+        if position == i:
+            position = j
+        elif position == j:
+            position = i
+        return self._table.item(row, self._columns[position])
+
+    def swap(self, i, j):
+        '''
+        swaps the residues at positions i and j and updates
+        the values of the positions that changed.
+        '''
+        if i == j:
+            return
+        residues = self.residues
+        aa_i = residues[i]
+        aa_j = residues[j]
+        residues[i], residues[j] = aa_j, aa_i
+        self._digits[i], self._digits[j] = self._digits[j], self._digits[i]
+        self._columns[i], self._columns[j] = self._columns[j], self._columns[i]
+        if aa_i != aa_j:
+            self._move_position(aa_i, i, j)
+            self._move_position(aa_j, j, i)
+
+        # the swapped positions and the 4 after each of them change, and if
+        # either is in the first 4 the first 4 (and the 5th) positions change
+        length = len(residues)
+        changed = set(range(i, min(i+5, length))) | set(range(j, min(j+5, length)))
+        if i < 4 or j < 4:
+            changed.update(range(0, min(5, length)))
+        for position in changed:
+            score = self._table.item(self._context_row(position, self._digits), self._columns[position])
+            if score != self.scores[position]:
+                self.scores[position] = score
+                heapq.heappush(self._heap, (score, position))
+
+        # keep the heap from filling up with old entries
+        if len(self._heap) > 4*length:
+            self._heap = [(score, position) for position, score in enumerate(self.scores)]
+            heapq.heapify(self._heap)
+
+    def _move_position(self, aa, old_position, new_position):
+        positions = self.positions[aa]
+        positions.remove(old_position)
+        bisect.insort(positions, new_position)
+
+
+
+class PropertyState:
+    '''
+    Running totals for the properties of a sequence that is being
+    changed by substituting or swapping residues. Substitutions and swaps
+    take O(1) for the hydropathy and charge totals, O(blob length) for
+    delta and, because the sorted positions are kept in lists,
+    O(occurrences of the amino acid) for positions.
+
+    mean_hydropathy is worked out exactly from the total in tenths, so
+    it can differ from Protein.calc_mean_hydro (which adds up floats) in
+    the last decimal. FCR, NCPR and sigma are the same as the Protein
+    functions, and delta is the same as Protein.calc_delta up to the
+    order the blobs are added in.
+
+    Parameters
+    ----------
+    sequence : String
+        The amino acid sequence
+    '''
+    def __init__(self, sequence):
+        # raises an Exception for anything that isn't an amino acid
+        encode_protein(sequence)
+        self.residues = list(sequence)
+        self.hydropathy_tenths = sum([_HYDRO_TENTHS[aa] for aa in sequence])
+        self._charges = [_CHARGES[aa] for aa in sequence]
+        self.num_charged = len(sequence) - self._charges.count(0)
+        self.net_charge = sum(self._charges)
+
+        # sorted positions of each amino acid in the sequence
+        self.positions = {}
+        for position, aa in enumerate(sequence):
+            self.positions.setdefault(aa, []).append(position)
+
+        # for each blob length, the position in the blob sigma table
+        # (see protein._blob_sigma_table) of every blob and the number
+        # of blobs at each position in the table
+        self._blob_keys = {}
+        self._blob_counts = {}
+        for bloblen in _BLOB_LENGTHS:
+            keys = []
+            for start in range(0, len(sequence) - bloblen + 1):
+                blob = self._charges[start:start+bloblen]
+                keys.append((bloblen - blob.count(0))*(2*bloblen+1) + sum(blob) + bloblen)
+            counts = [0]*((bloblen+1)*(2*bloblen+1))
+            for key in keys:
+                counts[key] += 1
+            self._blob_keys[bloblen] = keys
+            self._blob_counts[bloblen] = counts
+
+    def __len__(self):
+        return len(self.residues)
+
+    @property
+    def sequence(self):
+        return ''.join(self.residues)
+
+    @property
+    def mean_hydropathy(self):
+        return round(self.hydropathy_tenths / (10*len(self.residues)), 6)
+
+    @property
+    def FCR(self):
+        return round(self.num_charged / len(self.residues), 6)
+
+    @property
+    def NCPR(self):
+        return round(self.net_charge / len(self.residues), 6)
+
+    @property
+    def sigma(self):
+        return Protein._sigma_from_values(self.FCR, self.NCPR)
+
+    @property
+    def delta(self):
+        if len(self.residues) < 5:
+            return 0
+        return round(((self._delta_pre(5) + self._delta_pre(6)) /2), 6)
+
+    def _delta_pre(self, bloblen):
+        nblobs = len(self._blob_keys[bloblen])
+        if nblobs == 0:
+            return 0
+        sigma = self.sigma
+        delta = 0
+        for blob_sigma, count in zip(_blob_sigma_table(bloblen).ravel().tolist(), self._blob_counts[bloblen]):
+            if count != 0:
+                delta += count * (((sigma - blob_sigma) ** 2) / nblobs)
+        return delta
+
+    def count(self, aa):
+        '''
+        returns the number of times aa is in the sequence.
+        '''
+        return len(self.positions.get(aa, []))
+
+    def hydropathy_after_substitution(self, position, aa):
+        '''
+        returns the mean hydropathy the sequence would have if the
+        residue at position was aa, without changing it.
+        '''
+        tenths = self.hydropathy_tenths - _HYDRO_TENTHS[self.residues[position]] + _HYDRO_TENTHS[aa]
+        return round(tenths / (10*len(self.residues)), 6)
+
+    def substitute(self, position, aa):
+        '''
+        changes the residue at position to aa and updates the totals.
+        '''
+        old_aa = self.residues[position]
+        if aa == old_aa:
+            return
+        if aa not in _HYDRO_TENTHS:
+            raise Exception ("Invalid amino acid detected. Make sure value is a canonical amino acid.")
+        self.residues[position] = aa
+        self.hydropathy_tenths += _HYDRO_TENTHS[aa] - _HYDRO_TENTHS[old_aa]
+        positions = self.positions[old_aa]
+        positions.remove(position)
+        bisect.insort(self.positions.setdefault(aa, []), position)
+
+        old_charge = self._charges[position]
+        new_charge = _CHARGES[aa]
+        if new_charge == old_charge:
+            return
+        self._charges[position] = new_charge
+        charged_change = abs(new_charge) - abs(old_charge)
+        self.num_charged += charged_change
+        self.net_charge += new_charge - old_charge
+
+        # update every blob that has the position in it
+        for bloblen in _BLOB_LENGTHS:
+            keys = self._blob_keys[bloblen]
+            counts = self._blob_counts[bloblen]
+            key_change = charged_change*(2*bloblen+1) + new_charge - old_charge
+            for start in range(max(0, position-bloblen+1), min(position+1, len(keys))):
+                counts[keys[start]] -= 1
+                keys[start] += key_change
+                counts[keys[start]] += 1
+
+    def swap(self, i, j):
+        '''
+        swaps the residues at positions i and j and updates the totals.
+        '''
+        aa_i = self.residues[i]
+        aa_j = self.residues[j]
+        if aa_i != aa_j:
+            self.substitute(i, aa_j)
+            self.substitute(j, aa_i)
@@ -30,6 +30,74 @@ MAXIMUM_KAPPA_ERROR=0.02
 MAXIMUM_DISORDER = 1.0
 MINIMUM_DISORDER = 0
 
+# number of candidate sequences scored together in a single
+# batched disorder prediction when generating sequences in batches
+DISORDER_BATCH_SIZE = 16
+
+# maximum number of disorder profiles held in the process-wide 
+# disorder cache (0 turns the cache off) and how profiles are evicted
+# once it is full ('lru' or 'fifo')
+DISORDER_CACHE_SIZE = 10000
+DISORDER_CACHE_EVICTION = 'lru'
+
+# maximum number of disorder profiles kept in the optional
+# persistent disorder store
+DISORDER_STORE_MAX_ENTRIES = 1000000
+
+# number of residues on each side of a mutation that are re-predicted
+# when disorder is rescored incrementally during optimization
+DISORDER_RESCORE_WINDOW = 25
+
+# threshold on the mean lookup-table disorder (see disorder_prefilter.py)
+# below which a sequence is rejected without predicting it with metapredict.
+# Only used when the prefilter is turned on. Calibrated on generated 100 
+# residue sequences with hydropathy 3 - 6.1, where it rejected ~30% of the
+# sequences that failed check_disorder with a false-reject rate of ~0.4%.
+DISORDER_PREFILTER_THRESHOLD = 0.7
+
+# number of residues before a candidate residue used to predict
+# its disorder when growing sequences with predicted residues
+NEXT_RESIDUE_CONTEXT = 20
+
+# number of residues at the end of each prediction averaged to score a 
+# candidate residue. The last residue of a sequence is predicted to be 
+# disordered for almost every residue, averaging over the last 5 also 
+# accounts for the effect of the candidate on the residues before it.
+NEXT_RESIDUE_SCORE_WINDOW = 5
+
+# maximum number of sequences in a batch and maximum time (in seconds)
+# a prediction waits for other threads when the disorder coalescer is on
+DISORDER_COALESCER_BATCH_SIZE = 64
+DISORDER_COALESCER_MAX_WAIT = 0.005
+
+# number of sequences hydro_seq draws at once when looking
+# for a sequence with the right hydropathy
+HYDRO_SEQ_BATCH_SIZE = 32
+
+# number of optimize_sequence iterations used to order the residues
+# of a sequence built to have a specific hydropathy
+HYDRO_SEQ_ORDER_ITERATIONS = 10
+
+# largest tilt (per unit of hydropathy) applied to the residue probabilities
+# to move the expected mean hydropathy of a distribution to its objective
+HYDROPATHY_MAX_TILT = 20.0
+
+# number of sequences of the same length whose delta and SCD are 
+# worked out together by protein.calc_properties_batch
+PROPERTY_BATCH_CHUNK_SIZE = 4096
+
+# maximum number of (4 residue key, cutoff, excluded residues) combinations
+# whose candidate residues get_optimal_residue keeps
+OPTIMAL_RESIDUE_CACHE_SIZE = 100000
+
+# default cutoff for get_optimal_residue. This is the average value in the
+# aa_dis_val_4_v3 dict (0.6397844593942738) + 1 standard deviation (0.07225962272855471)
+OPTIMAL_RESIDUE_CUTOFF = 0.7120440821228284
+
+# number of transition tables (one for each cutoff and set of excluded
+# residues) kept for growing many sequences at once
+TRANSITION_TABLE_CACHE_SIZE = 32
+
 # maximums for fractions of amino acids
 MAX_FRACTION_A = 0.9
 MAX_FRACTION_R = 1.0
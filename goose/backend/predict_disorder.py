@@ -1,33 +1,594 @@
 '''
-Not currently being used in GOOSE. Could implement
-as a very inefficent but effective means of 
-optimizing disorder, but hasn't been necessary
-yet. Saving in case there are difficult edge
-cases my more computationally efficient (though
-hacky) functions can't handle.
+Disorder prediction used throughout the GOOSE backend.
+
+predict_disorder and predict_disorder_batch are the functions all backend
+code uses to get disorder profiles. Profiles are held in a process-wide
+DisorderCache (see goose.backend.disorder_cache) keyed on the exact
+sequence (and the predictor), so a sequence is only predicted once no 
+matter how many times it is checked or optimized. The size and eviction policy
+of the cache can be changed with set_disorder_cache and the hit/miss
+statistics are available from disorder_cache_info.
+
+Profiles can also be kept across runs in a persistent DisorderStore
+(see goose.backend.disorder_store). The store is off by default and is
+turned on with enable_disorder_store or by setting the 
+GOOSE_DISORDER_STORE environment variable to the path of the store file.
+When on, it is checked for any sequence that is not in the cache before
+the predictor is used.
+
+Predictions are made by a DisorderBackend (see 
+goose.backend.disorder_backends). metapredict is used by default. A 
+different backend can be set for everything with set_disorder_backend
+or passed to a single call with backend=.
+
+For optimizers that make one substitution or swap at a time, 
+predict_disorder_incremental (and predict_disorder_incremental_batch) 
+re-predict only a window around the changed positions and splice the
+result into the profile of the sequence before the change. 
+validate_windowed_rescoring measures how far these spliced profiles
+are from a full prediction.
+
+score_next_residues predicts the disorder of every possible next 
+residue of a sequence in one batch. It is used by 
+get_predicted_optimal_residue for growing sequences one residue at a
+time when create_seq_by_props is asked for predicted residues instead
+of the lookup table used by default. 
+predict and calculate_disorder_for_AA are kept for backwards 
+compatibility and use score_next_residues.
+
+When GOOSE is used from many threads at once, the predictions made by
+all of the threads can be combined into shared batches by turning on 
+the DisorderCoalescer (see goose.backend.disorder_coalescer) with 
+enable_disorder_coalescer. It is off by default.
 '''
 
 
 
 #import stuff
-import threading
-from threading import Thread
-import metapredict as meta
-
-# Class to allow for return values with threading
-class ThreadWithReturnValue(Thread):
-    def __init__(self, group=None, target=None, name=None,
-                 args=(), kwargs={}, Verbose=None):
-        Thread.__init__(self, group, target, name, args, kwargs)
-        self._return = None
-    def run(self):
-        #print(type(self._target))
-        if self._target is not None:
-            self._return = self._target(*self._args,
-                                                **self._kwargs)
-    def join(self, *args):
-        Thread.join(self, *args)
-        return self._return
+import os
+import random
+import numpy as np
+
+from goose.backend import parameters
+from goose.goose_exceptions import GooseInputError
+from goose.backend.disorder_cache import DisorderCache
+from goose.backend.disorder_store import DisorderStore
+from goose.backend.disorder_coalescer import DisorderCoalescer
+from goose.backend.disorder_backends import get_disorder_backend, set_disorder_backend, DisorderBackend
+
+
+# process-wide cache of disorder profiles
+_DISORDER_CACHE = DisorderCache(maxsize=parameters.DISORDER_CACHE_SIZE, eviction=parameters.DISORDER_CACHE_EVICTION)
+
+# optional persistent store of disorder profiles
+_DISORDER_STORE = None
+
+# optional coalescer that batches predictions across threads
+_DISORDER_COALESCER = None
+
+
+
+def _as_profile(disorder):
+   '''
+   converts a prediction to a read-only float array so that a 
+   cached profile can't be changed by whoever asked for it.
+   '''
+   profile = np.array(disorder, dtype=np.float32)
+   profile.setflags(write=False)
+   return profile
+
+
+def _run_backend(backend, sequences):
+   '''
+   predicts sequences with backend. Goes through the coalescer if it is
+   on and the backend is worth batching (see DisorderBackend.cache_predictions).
+   '''
+   coalescer = _DISORDER_COALESCER
+   if coalescer is not None and backend.cache_predictions == True:
+      return coalescer.predict_batch(backend, sequences)
+   return backend.predict_batch(sequences)
+
+
+def predict_disorder(sequence, backend=None):
+   """
+   Function for predicting the disorder of a sequence. Returns
+   the cached profile if the sequence has already been predicted.
+
+   Parameters
+   -------------
+   sequence : string
+     the amino acid sequence as a string
+
+   backend : None, string, or DisorderBackend
+     The disorder predictor to use. None uses the current default 
+     (see set_disorder_backend), otherwise the name of a backend 
+     or a DisorderBackend instance.
+
+   Returns
+   ---------
+   np.ndarray
+     A read-only array of per-residue disorder values
+   """
+   backend = get_disorder_backend(backend)
+   if backend.cache_predictions == False:
+      return _as_profile(backend.predict(sequence))
+
+   version = backend.version()
+   profile = _DISORDER_CACHE.get((version, sequence))
+   if profile is None:
+      if _DISORDER_STORE is not None:
+         profile = _DISORDER_STORE.get(sequence, version)
+      if profile is None:
+         if _DISORDER_COALESCER is not None:
+            profile = _as_profile(_run_backend(backend, [sequence])[0])
+         else:
+            profile = _as_profile(backend.predict(sequence))
+         if _DISORDER_STORE is not None:
+            _DISORDER_STORE.put(sequence, profile, version)
+      _DISORDER_CACHE.put((version, sequence), profile)
+   return profile
+
+
+def predict_disorder_batch(sequences, backend=None, use_cache=True):
+   """
+   Function for predicting the disorder of many sequences. Any sequences
+   that are not in the cache are predicted together in a single batched
+   call to the predictor.
+
+   Parameters
+   -------------
+   sequences : list
+     list of amino acid sequences as strings
+
+   backend : None, string, or DisorderBackend
+     The disorder predictor to use. See predict_disorder.
+
+   use_cache : bool
+     Whether to use (and add to) the disorder cache and store. Set to
+     False for sequences that are unlikely to be predicted again.
+
+   Returns
+   ---------
+   list
+     A list of read-only arrays of per-residue disorder values in the
+     same order as the input sequences
+   """
+   backend = get_disorder_backend(backend)
+   if backend.cache_predictions == False or use_cache == False:
+      return [_as_profile(disorder) for disorder in _run_backend(backend, list(sequences))]
+
+   version = backend.version()
+   profiles = [_DISORDER_CACHE.get((version, sequence)) for sequence in sequences]
+
+   # get the unique sequences that still need to be predicted
+   to_predict = []
+   seen = set()
+   for seq_num in range(0, len(sequences)):
+      if profiles[seq_num] is None and sequences[seq_num] not in seen:
+         to_predict.append(sequences[seq_num])
+         seen.add(sequences[seq_num])
+
+   predicted = {}
+   # see if any of the sequences were predicted on a previous run
+   if to_predict != [] and _DISORDER_STORE is not None:
+      predicted = _DISORDER_STORE.get_many(to_predict, version)
+      for sequence in predicted:
+         _DISORDER_CACHE.put((version, sequence), predicted[sequence])
+      to_predict = [sequence for sequence in to_predict if sequence not in predicted]
+
+   if to_predict != []:
+      for sequence, disorder in zip(to_predict, _run_backend(backend, to_predict)):
+         predicted[sequence] = _as_profile(disorder)
+         _DISORDER_CACHE.put((version, sequence), predicted[sequence])
+      if _DISORDER_STORE is not None:
+         _DISORDER_STORE.put_many({sequence: predicted[sequence] for sequence in to_predict}, version)
+
+   if predicted != {}:
+      for seq_num in range(0, len(sequences)):
+         if profiles[seq_num] is None:
+            profiles[seq_num] = predicted[sequences[seq_num]]
+
+   return profiles
+
+
+def _rescore_regions(sequence, reference_sequence, window):
+   """
+   Figures out the regions that need to be re-predicted for sequence
+   given that reference_sequence is the same length and only differs at
+   a few positions. Returns a list of (predict_start, predict_end,
+   splice_start, splice_end) tuples. Every residue within window of a
+   changed position is spliced and each spliced region is predicted with
+   a further window residues of context on each side.
+   """
+   changed = np.flatnonzero(np.frombuffer(sequence.encode(), dtype=np.uint8) != np.frombuffer(reference_sequence.encode(), dtype=np.uint8))
+   seq_length = len(sequence)
+
+   # merge changes whose prediction windows would overlap
+   splice_regions = []
+   for position in changed:
+      splice_start = max(0, position - window)
+      splice_end = min(seq_length, position + window + 1)
+      if splice_regions != [] and splice_start <= splice_regions[-1][1] + window:
+         splice_regions[-1][1] = splice_end
+      else:
+         splice_regions.append([splice_start, splice_end])
+
+   return [(max(0, start - window), min(seq_length, end + window), start, end) for start, end in splice_regions]
+
+
+def predict_disorder_incremental_batch(sequences, reference_sequence, reference_disorder, window=parameters.DISORDER_RESCORE_WINDOW, backend=None):
+   """
+   Function for getting the disorder of many sequences that each differ
+   from a reference sequence at a few positions (point mutations or swaps).
+   Rather than predicting every sequence in full, only a window around the 
+   changed positions is predicted and spliced into the disorder profile of
+   the reference sequence. All windows are predicted in a single batch.
+
+   The spliced profiles are approximate. See validate_windowed_rescoring
+   for how close they are to full predictions.
+
+   Parameters
+   -------------
+   sequences : list
+     list of amino acid sequences as strings
+
+   reference_sequence : string
+     the sequence the input sequences were made from
+
+   reference_disorder : list or np.ndarray
+     the disorder profile of the reference sequence (which can itself
+     be a spliced profile)
+
+   window : int or None
+     the number of residues on either side of a change to re-predict.
+     The same number of residues is used as context for the prediction.
+     None predicts every sequence in full.
+
+   backend : None, string, or DisorderBackend
+     The disorder predictor to use. See predict_disorder.
+
+   Returns
+   ---------
+   list
+     A list of read-only arrays of per-residue disorder values in the
+     same order as the input sequences
+   """
+   if window == None:
+      return predict_disorder_batch(sequences, backend=backend)
+
+   reference_disorder = np.asarray(reference_disorder, dtype=np.float32)
+
+   # figure out what needs to be predicted for each sequence
+   all_regions = []
+   subsequences = []
+   for sequence in sequences:
+      if len(sequence) != len(reference_sequence):
+         regions = [(0, len(sequence), 0, len(sequence))]
+      else:
+         regions = _rescore_regions(sequence, reference_sequence, window)
+         # if the windows cover most of the sequence just predict all of it
+         if sum([region[1]-region[0] for region in regions]) >= len(sequence):
+            regions = [(0, len(sequence), 0, len(sequence))]
+      all_regions.append(regions)
+      for predict_start, predict_end, splice_start, splice_end in regions:
+         subsequences.append(sequence[predict_start:predict_end])
+
+   predictions = predict_disorder_batch(subsequences, backend=backend)
+
+   # splice the windows into the reference profile
+   profiles = []
+   prediction_num = 0
+   for seq_num in range(0, len(sequences)):
+      regions = all_regions[seq_num]
+      if len(regions) == 1 and regions[0][1] - regions[0][0] == len(sequences[seq_num]):
+         profiles.append(predictions[prediction_num])
+         prediction_num += 1
+         continue
+      profile = reference_disorder.copy()
+      for predict_start, predict_end, splice_start, splice_end in regions:
+         profile[splice_start:splice_end] = predictions[prediction_num][splice_start-predict_start:splice_end-predict_start]
+         prediction_num += 1
+      profile.setflags(write=False)
+      profiles.append(profile)
+
+   return profiles
+
+
+def predict_disorder_incremental(sequence, reference_sequence, reference_disorder, window=parameters.DISORDER_RESCORE_WINDOW, backend=None):
+   """
+   Function for getting the disorder of a sequence that differs from 
+   a reference sequence at a few positions. See 
+   predict_disorder_incremental_batch for details.
+
+   Parameters
+   -------------
+   sequence : string
+     the amino acid sequence as a string
+
+   reference_sequence : string
+     the sequence the input sequence was made from
+
+   reference_disorder : list or np.ndarray
+     the disorder profile of the reference sequence
+
+   window : int or None
+     the number of residues on either side of a change to re-predict.
+     None predicts the sequence in full.
+
+   backend : None, string, or DisorderBackend
+     The disorder predictor to use. See predict_disorder.
+
+   Returns
+   ---------
+   np.ndarray
+     A read-only array of per-residue disorder values
+   """
+   return predict_disorder_incremental_batch([sequence], reference_sequence, reference_disorder, window=window, backend=backend)[0]
+
+
+def validate_windowed_rescoring(sequences, window=parameters.DISORDER_RESCORE_WINDOW, num_moves=20, move='swap', 
+   disorder_threshold=parameters.DISORDER_THRESHOLD, backend=None):
+   """
+   Measures how far windowed rescoring deviates from full predictions.
+   For each sequence num_moves random moves are made one after the other
+   and the profile is carried along with predict_disorder_incremental
+   (like an optimizer would). After every move the carried profile is
+   compared to a full prediction of the current sequence.
+
+   Parameters
+   -------------
+   sequences : list
+     list of amino acid sequences as strings to test
+
+   window : int
+     the window used for rescoring
+
+   num_moves : int
+     the number of moves made on each sequence
+
+   move : string
+     'swap' to swap two random positions or 'substitution' to 
+     change one random position to a random amino acid
+
+   disorder_threshold : float
+     threshold used to count residues called ordered by one 
+     profile but not the other
+
+   backend : None, string, or DisorderBackend
+     The disorder predictor to use. See predict_disorder.
+
+   Returns
+   ---------
+   dict
+     max_abs_error : largest per-residue difference seen
+     mean_abs_error : mean per-residue difference
+     final_mean_abs_error : mean per-residue difference after the last move
+     threshold_disagreement : fraction of residues on different sides of
+        disorder_threshold in the spliced and full profiles
+     num_moves : total number of moves tested
+   """
+   if move not in ['swap', 'substitution']:
+      raise GooseInputError("move must be 'swap' or 'substitution'")
+
+   amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+   errors = []
+   final_errors = []
+   disagreements = 0
+   total_moves = 0
+   for sequence in sequences:
+      current_sequence = sequence
+      carried_disorder = predict_disorder(sequence, backend=backend)
+      for move_num in range(0, num_moves):
+         new_sequence = list(current_sequence)
+         first = random.randint(0, len(sequence)-1)
+         if move == 'swap':
+            second = random.randint(0, len(sequence)-1)
+            new_sequence[first], new_sequence[second] = new_sequence[second], new_sequence[first]
+         else:
+            new_sequence[first] = random.choice(amino_acids)
+         new_sequence = ''.join(new_sequence)
+
+         carried_disorder = predict_disorder_incremental(new_sequence, current_sequence, carried_disorder, window=window, backend=backend)
+         full_disorder = predict_disorder(new_sequence, backend=backend)
+         difference = np.abs(np.asarray(carried_disorder, dtype=np.float64) - full_disorder)
+         errors.append(difference)
+         disagreements += np.sum((carried_disorder < disorder_threshold) != (full_disorder < disorder_threshold))
+         current_sequence = new_sequence
+         total_moves += 1
+      if num_moves > 0:
+         final_errors.append(np.mean(errors[-1]))
+
+   if errors == []:
+      return {'max_abs_error': 0.0, 'mean_abs_error': 0.0, 'final_mean_abs_error': 0.0, 'threshold_disagreement': 0.0, 'num_moves': 0}
+
+   all_errors = np.concatenate(errors)
+   return {'max_abs_error': float(np.max(all_errors)), 'mean_abs_error': float(np.mean(all_errors)), 
+           'final_mean_abs_error': float(np.mean(final_errors)), 
+           'threshold_disagreement': float(disagreements / len(all_errors)), 'num_moves': total_moves}
+
+
+def set_disorder_cache(maxsize=None, eviction=None):
+   """
+   Changes the size and / or eviction policy of the disorder cache.
+
+   Parameters
+   -------------
+   maxsize : int
+     Maximum number of profiles to hold. 0 turns off caching.
+
+   eviction : string
+     'lru' or 'fifo'
+   """
+   _DISORDER_CACHE.resize(maxsize=maxsize, eviction=eviction)
+
+
+def clear_disorder_cache():
+   """
+   Removes everything from the disorder cache and resets its statistics.
+   """
+   _DISORDER_CACHE.clear()
+
+
+def disorder_cache_info():
+   """
+   Returns a dict of the disorder cache statistics (hits, misses,
+   hit_rate, evictions, size, maxsize, and eviction).
+   """
+   return _DISORDER_CACHE.info()
+
+
+def enable_disorder_store(path, max_entries=parameters.DISORDER_STORE_MAX_ENTRIES):
+   """
+   Turns on the persistent disorder store. Profiles that aren't in
+   the disorder cache are looked up in the store before they are 
+   predicted and new predictions are added to it.
+
+   Parameters
+   -------------
+   path : string
+     Path to the SQLite file used for the store. Made if it doesn't exist.
+
+   max_entries : int
+     Maximum number of profiles to keep in the store.
+
+   Returns
+   ---------
+   DisorderStore
+     The store that is now being used.
+   """
+   global _DISORDER_STORE
+   _DISORDER_STORE = DisorderStore(path, max_entries=max_entries)
+   return _DISORDER_STORE
+
+
+def disable_disorder_store():
+   """
+   Turns off the persistent disorder store.
+   """
+   global _DISORDER_STORE
+   _DISORDER_STORE = None
+
+
+def enable_disorder_coalescer(max_batch_size=parameters.DISORDER_COALESCER_BATCH_SIZE, max_wait=parameters.DISORDER_COALESCER_MAX_WAIT):
+   """
+   Turns on the disorder coalescer. Predictions requested at the same time 
+   by different threads are then made together in shared batches. Only 
+   worth it when GOOSE is used from several threads at once, a single 
+   thread will just wait up to max_wait for every prediction.
+
+   Parameters
+   -------------
+   max_batch_size : int
+     Maximum number of sequences predicted in a single batch.
+
+   max_wait : float
+     Maximum time (in seconds) a prediction waits for others to batch with.
+
+   Returns
+   ---------
+   DisorderCoalescer
+     The coalescer that is now being used.
+   """
+   global _DISORDER_COALESCER
+   disable_disorder_coalescer()
+   _DISORDER_COALESCER = DisorderCoalescer(max_batch_size=max_batch_size, max_wait=max_wait)
+   return _DISORDER_COALESCER
+
+
+def disable_disorder_coalescer():
+   """
+   Turns off the disorder coalescer. Anything already waiting in it is 
+   still predicted.
+   """
+   global _DISORDER_COALESCER
+   coalescer = _DISORDER_COALESCER
+   _DISORDER_COALESCER = None
+   if coalescer is not None:
+      coalescer.stop()
+
+
+def disorder_coalescer_info():
+   """
+   Returns a dict of the coalescer statistics (batches, requests, sequences,
+   average_batch_size, max_batch_size, max_wait) or None if it is off.
+   """
+   if _DISORDER_COALESCER is None:
+      return None
+   return _DISORDER_COALESCER.info()
+
+
+# turn on the store if the environment asks for it
+if os.environ.get('GOOSE_DISORDER_STORE'):
+   enable_disorder_store(os.environ['GOOSE_DISORDER_STORE'])
+
+
+
+# function for predicting the disorder of every possible next residue 
+# of a sequence in one batch.
+def score_next_residues(sequence, amino_acid_list=None, seq_range=None, context_length=parameters.NEXT_RESIDUE_CONTEXT, score_window=1, backend=None):
+
+   """
+   Function for predicting the disorder of each possible next residue
+   of a sequence. Each candidate residue is added to the end of the 
+   last context_length amino acids of the sequence (or of a range of
+   the sequence) and the disorder of the added residue is predicted. All 
+   candidates are predicted in a single batched prediction.
+
+   Parameters
+   -------------
+   sequence : string
+     the amino acid sequence as a string
+
+   amino_acid_list : list
+      The amino acids to add to the end of the sequence and to
+      predict the disorder value for. Default is all 20 amino acids.
+
+   seq_range : list
+      The coordinates of the substring to use instead of the
+      end of the sequence. default = None (range not used)
+
+   context_length : int
+      How many amino acids before the added residue are used for
+      the prediction. Default is 20.
+
+   score_window : int
+      The score for each candidate is the average disorder of this many
+      residues at the end of the prediction. Default is 1 (just the added
+      residue). Larger windows also account for the effect of the added
+      residue on the residues before it.
+
+   backend : None, string, or DisorderBackend
+     The disorder predictor to use. See predict_disorder.
+
+   Returns
+   ---------
+   Dict
+     Returns the predicted disorder for each amino acid as a dictionary 
+     where the key:value pairs are the amino acid and the predicted 
+     disorder for that amino acid after the input sequence.
+   """
+
+   # if no amino acid list provided, use all
+   if amino_acid_list == None or amino_acid_list == []:
+      amino_acid_list = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+
+   # figure out what the sequence is
+   if seq_range != None and seq_range != []:
+      sequence = sequence[seq_range[0]: seq_range[1]]
+   # cut off the length to the last context_length amino acids
+   if len(sequence) > context_length:
+      sequence = sequence[len(sequence)-context_length:]
+
+   # add each amino acid to the sequence and predict them all at once
+   # these sequences are rarely seen twice so they are not cached
+   predictions = predict_disorder_batch([sequence + amino_acid for amino_acid in amino_acid_list], backend=backend, use_cache=False)
+
+   # the value for the final residue corresponds to the added amino acid
+   results_dict = {}
+   for aa_num in range(0, len(amino_acid_list)):
+      results_dict[amino_acid_list[aa_num]] = float(np.mean(predictions[aa_num][-score_window:]))
+   return results_dict
+
 
 
 # function for predicting disorder of last 20 aas of a sequence with a specific
@@ -60,40 +621,13 @@ def predict(sequence, amino_acid, seq_range = []):
      Returns the predicted value for the disorder using the specified
      amino acid at the end of the sequence (or at the end of the sub sequence)
    """   
+   return score_next_residues(sequence, amino_acid_list=[amino_acid], seq_range=seq_range, context_length=20)[amino_acid]
 
-   # step 1. Figure out what the sequence is
-   if seq_range == []:
-      # cut off length to last 20 amino acids
-      if len(sequence) > 20:
-         used_sequence = sequence[len(sequence)-20:]
-      else:
-         used_sequence = sequence
-   else:
-      # get the subsequence
-      sub_sequence = sequence[seq_range[0]: seq_range[1]]
-      # cut off the length of the subsequence
-      if len(sub_sequence) > 20:
-         used_sequence = sub_sequence[len(sub_sequence)-20:]
-      else:
-         used_sequence = sub_sequence     
-   
-   # step 2. Add the amino acid to the sequence 
-   final_sequence = used_sequence + amino_acid
-   
-   # step 3. Predict the disorder
-   cur_prediction = meta.predict_disorder(final_sequence)
-
-   # step 4. Grab the disorder prediction for the final vallue in the list which
-   # corresponds to the value for the amino acid to be added to the sequence
-   final_value = cur_prediction[-1]
-   
-   # step 5. return the final value
-   return final_value
 
 
-
-# function for calculating the disorder for a sequence using
-# the predict function. Allows for simultaneous predictions.
+# function for calculating the disorder for a sequence for 
+# multiple amino acids. Kept for backwards compatibility, 
+# just uses score_next_residues.
 def calculate_disorder_for_AA(sequence, amino_acid_list = [], seq_range=[]):
    
    """
@@ -124,124 +658,4 @@ def calculate_disorder_for_AA(sequence, amino_acid_list = [], seq_range=[]):
      as a dictionary where the key:value pairs are the amino acid and the 
      predicted disorder for that amino acid after the input sequence.
    """     
-
-   # if no amino acid list provided, use all
-   if amino_acid_list==[]:
-      amino_acid_list = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
-
-   # create empty dict to hold results
-   results_dict = {}
-
-   # create thread(s)
-   A_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'A', seq_range,))
-   C_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'C', seq_range,))
-   D_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'D', seq_range,))
-   E_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'E', seq_range,))
-   F_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'F', seq_range,))
-   G_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'G', seq_range,))
-   H_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'H', seq_range,))
-   I_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'I', seq_range,))
-   K_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'K', seq_range,))
-   L_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'L', seq_range,))
-   M_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'M', seq_range,))
-   N_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'N', seq_range,))
-   P_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'P', seq_range,))
-   Q_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'Q', seq_range,))
-   R_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'R', seq_range,))
-   S_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'S', seq_range,))
-   T_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'T', seq_range,))
-   V_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'V', seq_range,))
-   W_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'W', seq_range,))
-   Y_thread = ThreadWithReturnValue(target=predict, args = (sequence, 'Y', seq_range,))
-
-   # start necessary threads depending on which amino acids to test.
-   # probably could have been done in a loop, but didn't want to mess with that.
-   if 'A' in amino_acid_list: 
-      A_thread.start()
-   if 'C' in amino_acid_list: 
-      C_thread.start()
-   if 'D' in amino_acid_list: 
-      D_thread.start()
-   if 'E' in amino_acid_list: 
-      E_thread.start()
-   if 'F' in amino_acid_list: 
-      F_thread.start()
-   if 'G' in amino_acid_list: 
-      G_thread.start()
-   if 'H' in amino_acid_list: 
-      H_thread.start()
-   if 'I' in amino_acid_list: 
-      I_thread.start()
-   if 'K' in amino_acid_list: 
-      K_thread.start()
-   if 'L' in amino_acid_list: 
-      L_thread.start()
-   if 'M' in amino_acid_list: 
-      M_thread.start()
-   if 'N' in amino_acid_list: 
-      N_thread.start()
-   if 'P' in amino_acid_list: 
-      P_thread.start()
-   if 'Q' in amino_acid_list: 
-      Q_thread.start()
-   if 'R' in amino_acid_list: 
-      R_thread.start()
-   if 'S' in amino_acid_list: 
-      S_thread.start()
-   if 'T' in amino_acid_list: 
-      T_thread.start()
-   if 'V' in amino_acid_list: 
-      V_thread.start()
-   if 'W' in amino_acid_list: 
-      W_thread.start()
-   if 'Y' in amino_acid_list: 
-      Y_thread.start()  
-
-   # join necessary threads. Using the ThreadWithResults class, 
-   # join() now returns a value, so we can use that to add the
-   # amino acid / predicted disorder value pair to our results_dict.
-   if 'A' in amino_acid_list: 
-      results_dict['A']=A_thread.join()
-   if 'C' in amino_acid_list: 
-      results_dict['C']=C_thread.join()
-   if 'D' in amino_acid_list: 
-      results_dict['D']=D_thread.join()
-   if 'E' in amino_acid_list: 
-      results_dict['E']=E_thread.join()
-   if 'F' in amino_acid_list: 
-      results_dict['F']=F_thread.join()
-   if 'G' in amino_acid_list: 
-      results_dict['G']=G_thread.join()
-   if 'H' in amino_acid_list: 
-      results_dict['H']=H_thread.join()
-   if 'I' in amino_acid_list: 
-      results_dict['I']=I_thread.join()
-   if 'K' in amino_acid_list: 
-      results_dict['K']=K_thread.join()
-   if 'L' in amino_acid_list: 
-      results_dict['L']=L_thread.join()
-   if 'M' in amino_acid_list: 
-      results_dict['M']=M_thread.join()
-   if 'N' in amino_acid_list: 
-      results_dict['N']=N_thread.join()
-   if 'P' in amino_acid_list: 
-      results_dict['P']=P_thread.join()
-   if 'Q' in amino_acid_list: 
-      results_dict['Q']=Q_thread.join()
-   if 'R' in amino_acid_list: 
-      results_dict['R']=R_thread.join()
-   if 'S' in amino_acid_list: 
-      results_dict['S']=S_thread.join()
-   if 'T' in amino_acid_list: 
-      results_dict['T']=T_thread.join()
-   if 'V' in amino_acid_list: 
-      results_dict['V']=V_thread.join()
-   if 'W' in amino_acid_list: 
-      results_dict['W']=W_thread.join()
-   if 'Y' in amino_acid_list: 
-      results_dict['Y']=Y_thread.join()
-
-   # return results dict
-   return results_dict
-      
-
+   return score_next_residues(sequence, amino_acid_list=amino_acid_list, seq_range=seq_range, context_length=20)
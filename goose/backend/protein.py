@@ -4,14 +4,156 @@ values based off of the amino acids
 """
 
 import random
-import math
+
+import numpy as np
 
 from goose.backend.amino_acids import AminoAcid
+from goose.backend import parameters
+from goose.goose_exceptions import GooseInputError
+
+
+# value used in the code arrays for anything that isn't an amino acid
+_INVALID = 255
+
+# ASCII code -> position in AminoAcid.standard_amino_acids
+_AA_CODES = np.full(256, _INVALID, dtype=np.uint8)
+for _aa_num, _aa in enumerate(AminoAcid.standard_amino_acids):
+    _AA_CODES[ord(_aa)] = _aa_num
+
+# properties of each amino acid (in the order of AminoAcid.standard_amino_acids)
+_HYDROPATHY = np.array([AminoAcid.hydro(aa) for aa in AminoAcid.standard_amino_acids], dtype=np.float64)
+_CHARGE = np.array([AminoAcid.charge_value(aa) for aa in AminoAcid.standard_amino_acids], dtype=np.int64)
+_AROMATIC = np.array([AminoAcid.aromatic_check(aa) for aa in AminoAcid.standard_amino_acids])
+_POLAR = np.array([AminoAcid.polar_check(aa) for aa in AminoAcid.standard_amino_acids])
+_ALIPHATIC = np.array([AminoAcid.aliphatic_check(aa) for aa in AminoAcid.standard_amino_acids])
+
+# ASCII code -> charge (0 for anything that isn't D, E, K or R)
+_ASCII_CHARGE = np.zeros(256, dtype=np.float64)
+for _aa in AminoAcid.standard_amino_acids:
+    _ASCII_CHARGE[ord(_aa)] = AminoAcid.charge_value(_aa)
+
+
+def encode_protein(seq):
+    '''
+    returns seq as a uint8 array of positions in 
+    AminoAcid.standard_amino_acids.
+    '''
+    codes = _AA_CODES[np.frombuffer(seq.encode('ascii', errors='replace'), dtype=np.uint8)]
+    if np.any(codes == _INVALID):
+        raise Exception ("Invalid amino acid detected. Make sure value is a canonical amino acid.")
+    return codes
+
+
+def _ordered_sum(values):
+    '''
+    returns the sum of values added one after the other (np.sum adds
+    pairwise, which can give slightly different floats than a loop).
+    '''
+    if len(values) == 0:
+        return 0
+    return float(np.cumsum(values)[-1])
+
+
+def _blob_sigma_table(bloblen):
+    '''
+    returns the sigma of a blob of bloblen residues for each number of 
+    charged residues (rows) and net charge + bloblen (columns), worked out 
+    the same way as Protein.calc_sigma so the values are the same floats.
+    '''
+    table = _blob_sigma_tables.get(bloblen)
+    if table is None:
+        table = np.zeros((bloblen+1, 2*bloblen+1), dtype=np.float64)
+        for charged in range(0, bloblen+1):
+            for charge in range(-charged, charged+1):
+                table[charged, charge+bloblen] = Protein._sigma_from_values(round(charged / bloblen, 6), round(charge / bloblen, 6))
+        _blob_sigma_tables[bloblen] = table
+    return table
+
+_blob_sigma_tables = {}
+
+
+def _delta_pre_from_codes(codes, bloblen):
+    '''
+    Protein.delta_pre for each row of a 2-D array of encoded sequences of
+    the same length (at least 5). The number of charged residues and the net
+    charge of every blob come from cumulative sums along each sequence.
+    '''
+    num_sequences, length = codes.shape
+    nblobs = length - bloblen + 1
+    if nblobs <= 0:
+        return np.zeros(num_sequences, dtype=np.float64)
+    charges = _CHARGE[codes]
+    charged = (charges != 0).astype(np.int64)
+
+    # sigma of each whole sequence, worked out once for each number of charged residues and net charge
+    sequence_keys, key_positions = np.unique(charged.sum(axis=1)*(2*length+1) + charges.sum(axis=1) + length, return_inverse=True)
+    sequence_sigma = [Protein._sigma_from_values(round((key // (2*length+1)) / length, 6), round((key % (2*length+1) - length) / length, 6))
+                      for key in sequence_keys.tolist()]
+    sigma_seq = np.array(sequence_sigma, dtype=np.float64)[key_positions.reshape(-1)]
+
+    # charged residues and net charge of each blob as a position in the blob sigma table
+    cumulative_charged = np.concatenate((np.zeros((num_sequences, 1), dtype=np.int64), np.cumsum(charged, axis=1)), axis=1)
+    cumulative_charge = np.concatenate((np.zeros((num_sequences, 1), dtype=np.int64), np.cumsum(charges, axis=1)), axis=1)
+    blob_charged = cumulative_charged[:, bloblen:] - cumulative_charged[:, :nblobs]
+    blob_charge = cumulative_charge[:, bloblen:] - cumulative_charge[:, :nblobs]
+    blob_positions = blob_charged*(2*bloblen+1) + blob_charge + bloblen
+
+    # There are only a few different sigma values, so the term for each blob
+    # is worked out in Python for each pair of sequence and blob sigma values
+    # (numpy squares floats slightly differently than ** in Python does).
+    unique_sigma, sigma_positions = np.unique(sigma_seq, return_inverse=True)
+    blob_sigma_values = _blob_sigma_table(bloblen).ravel().tolist()
+    terms = np.array([[((cur_sigma_seq - cur_sigma) ** 2) / nblobs for cur_sigma in blob_sigma_values]
+                      for cur_sigma_seq in unique_sigma.tolist()])
+
+    # added up one blob after the other as delta_pre always has
+    return np.cumsum(terms[sigma_positions.reshape(-1, 1), blob_positions], axis=1)[:, -1]
+
+
+def _delta_from_codes(codes):
+    '''
+    Protein.calc_delta for each row of a 2-D array of encoded sequences
+    of the same length (at least 5), as a list.
+    '''
+    deltas = []
+    for delta_5, delta_6 in zip(_delta_pre_from_codes(codes, 5).tolist(), _delta_pre_from_codes(codes, 6).tolist()):
+        deltas.append(round(((delta_5 + delta_6) /2), 6))
+    return deltas
+
+
+def _SCD_from_charges(charges):
+    '''
+    Protein.calc_SCD for each row of a 2-D array of the residue charges of
+    sequences of the same length, as a list.
+
+    SCD is the sum over residue pairs m > n+1 of q_m * q_n * sqrt(m - n),
+    divided by the length. Summing the charge products of the pairs that
+    are d residues apart first (an autocorrelation of the charges, done 
+    with an FFT) leaves one sqrt(d) term per distance.
+    '''
+    num_sequences, length = charges.shape
+    if length < 3:
+        return [round(0.0 * (1/length), 5)]*num_sequences
+    fft_size = 1 << (2*length - 1).bit_length()
+    transformed = np.fft.rfft(charges, fft_size, axis=1)
+    # the products are integers, rounding removes the FFT error
+    pair_products = np.rint(np.fft.irfft(transformed * np.conj(transformed), fft_size, axis=1)[:, 2:length]).astype(np.int64)
+    sqrt_distances = np.sqrt(np.arange(2, length))
+    # each row is done on its own so the values don't depend on the other sequences
+    return [round(float(np.dot(row, sqrt_distances)) * (1/length), 5) for row in pair_products]
+
 
 class Protein:
     """
     Class that holds the properties of an amino acid sequence.
+
+    The sequence is held as an array of amino acid positions and each 
+    property is only worked out the first time it is used. The calc_ 
+    functions can also be used on their own on a sequence string, e.g.
+    Protein.calc_FCR(seq).
     """
+    __slots__ = ('seq', 'sequence', 'length', 'encoded', '_cache')
+
     def __init__(self, seq):
         #make the sequence all uppercase
         self.seq = seq.upper()
@@ -24,156 +166,164 @@ class Protein:
                 
         self.sequence = seq
         self.length = len(seq)
-        self.fractions = Protein.calc_frac(seq)
-        self.FCR = Protein.calc_FCR(seq)
-        self.NCPR = Protein.calc_NCPR(seq)
-        self.sigma = Protein.calc_sigma(seq)
-        self.delta = Protein.calc_delta(seq)
-        self.scd = Protein.calc_SCD(seq)
-        self.hydro = Protein.calc_mean_hydro(seq)
-        self.hydropathy = Protein.calc_mean_hydro(seq)
-        self.properties = Protein.calc_all_properties(seq)
-        self.percent_polar = Protein.calc_percent_polar(seq)
-        self.percent_aliphatic = Protein.calc_percent_aliphatic(seq)
-        self.basic_properties = Protein.calc_basic_properties(seq)
+        self.encoded = encode_protein(seq)
+        self._cache = {}
+
+    def _cached(self, name, function):
+        # works out a property the first time it is used
+        if name not in self._cache:
+            self._cache[name] = function()
+        return self._cache[name]
+
+    @property
+    def fractions(self):
+        return self._cached('fractions', lambda: Protein._frac_from_codes(self.encoded))
+
+    @property
+    def FCR(self):
+        return self._cached('FCR', lambda: Protein._FCR_from_codes(self.encoded))
+
+    @property
+    def NCPR(self):
+        return self._cached('NCPR', lambda: Protein._NCPR_from_codes(self.encoded))
+
+    @property
+    def sigma(self):
+        return self._cached('sigma', lambda: Protein._sigma_from_values(self.FCR, self.NCPR))
+
+    @property
+    def delta(self):
+        if self.length < 5:
+            return self._cached('delta', lambda: Protein.calc_delta(self.sequence))
+        return self._cached('delta', lambda: _delta_from_codes(self.encoded[np.newaxis, :])[0])
+
+    @property
+    def scd(self):
+        return self._cached('scd', lambda: Protein.calc_SCD(self.sequence))
+
+    @property
+    def hydropathy(self):
+        return self._cached('hydropathy', lambda: Protein._mean_hydro_from_codes(self.encoded))
+
+    @property
+    def hydro(self):
+        return self.hydropathy
+
+    @property
+    def properties(self):
+        return self._cached('properties', lambda: {'length': self.length, 'FCR': self.FCR, 'NCPR': self.NCPR,
+                                                   'hydropathy': self.hydropathy, 'sigma': self.sigma,
+                                                   'delta': self.delta, 'SCD': self.scd})
+
+    @property
+    def percent_polar(self):
+        return self._cached('percent_polar', lambda: Protein._percent_from_codes(self.encoded, _POLAR))
+
+    @property
+    def percent_aliphatic(self):
+        return self._cached('percent_aliphatic', lambda: Protein._percent_from_codes(self.encoded, _ALIPHATIC))
+
+    @property
+    def basic_properties(self):
+        return self._cached('basic_properties', lambda: {'length': self.length, 'FCR': self.FCR,
+                                                         'NCPR': self.NCPR, 'hydropathy': self.hydropathy})
+
+    # the calculations on encoded sequences, used by the properties and the calc_ functions
+    def _frac_from_codes(codes):
+        counts = np.bincount(codes, minlength=len(AminoAcid.standard_amino_acids)).tolist()
+        return {amino_acid: round(count / len(codes), 5) for amino_acid, count in zip(AminoAcid.standard_amino_acids, counts)}
+
+    def _FCR_from_codes(codes):
+        return round(int(np.count_nonzero(_CHARGE[codes])) / len(codes), 6)
+
+    def _NCPR_from_codes(codes):
+        return round(int(_CHARGE[codes].sum()) / len(codes), 6)
+
+    def _sigma_from_values(FCR_seq, NCPR_seq):
+        if FCR_seq ==  0:
+            return 0
+        return round(((NCPR_seq**2) / FCR_seq), 6)
+
+    def _mean_hydro_from_codes(codes):
+        return round(_ordered_sum(_HYDROPATHY[codes]) / len(codes), 6)
+
+    def _percent_from_codes(codes, in_group):
+        # the residues have always been picked with AminoAcid(i).*_check, 
+        # which is the (always true) method rather than its result, so every 
+        # residue is counted and in_group does not change the value
+        N = len(codes)
+        if N > 0:
+            return N/len(codes)
+        return 0
 
     #function that returns the fraction of each amino acid in a sequence    
     def calc_frac(seq):
-        fraction_amino_acids = {
-        'A': 0, 'C': 0, 'D': 0, 'E': 0, 'F': 0, 'G': 0, 'H': 0, 
-        'I': 0, 'K': 0, 'L': 0,'M': 0,'N': 0, 'P': 0,
-        'Q': 0,'R': 0,'S': 0,'T': 0,'V': 0,'W': 0,'Y': 0}
-        for amino_acid in seq:
-            fraction_amino_acids[amino_acid] += 1
-        for amino_acid in fraction_amino_acids:
-            fraction_amino_acids[amino_acid] = round((fraction_amino_acids[amino_acid] / len(seq)),5)
-        return fraction_amino_acids
+        return Protein._frac_from_codes(encode_protein(seq))
 
     def calc_FCR(seq):
-        charged_res = 0
-        for i in seq:
-            if AminoAcid(i).charge != 0:
-                charged_res += 1
-        return round(charged_res / len(seq), 6)
+        return Protein._FCR_from_codes(encode_protein(seq))
 
     #function that returns the fraction of positive values
     def calc_NCPR(seq):
-        charge = 0
-        for i in seq:
-            charge += AminoAcid(i).charge
-        return round(charge / len(seq), 6)
+        return Protein._NCPR_from_codes(encode_protein(seq))
 
     #function to calculate sigma of a sequence
     def calc_sigma(seq):
-        FCR_seq = Protein.calc_FCR(seq)
-        NCPR_seq = Protein.calc_NCPR(seq)
-        if FCR_seq ==  0:
-            Sigma = 0
-        else:
-            Sigma = round(((NCPR_seq**2) / FCR_seq), 6)
-        return Sigma
+        codes = encode_protein(seq)
+        return Protein._sigma_from_values(Protein._FCR_from_codes(codes), Protein._NCPR_from_codes(codes))
 
     def delta_pre(seq, bloblen = 5):
-        sigma_seq = Protein.calc_sigma(seq)
-        nblobs = len(seq) - bloblen + 1
-        final_delta = 0
-        total_blob_sigma = 0
         if len(seq) < 5:
             print("can't calculate for length less than 6")
-        else:
-            arb_val = 0
-            for i in range(0, nblobs):
-                cur_blob = seq[arb_val: (arb_val + bloblen)]
-                cur_sigma = Protein.calc_sigma(cur_blob)
-                add_sigma = ((sigma_seq - cur_sigma) ** 2) / nblobs
-                total_blob_sigma += add_sigma
-                arb_val += 1
-        return total_blob_sigma
+            return 0
+        if len(seq) < bloblen:
+            # there are no blobs
+            return 0
+        return float(_delta_pre_from_codes(encode_protein(seq)[np.newaxis, :], bloblen)[0])
 
     #function to calculate delta with bloblen 5.5
     def calc_delta(seq):
         return round(((Protein.delta_pre(seq, bloblen=5) + Protein.delta_pre(seq, bloblen=6)) /2), 6)
 
+    def calc_delta_batch(sequences):
+        """
+        Returns calc_delta for each of a list of sequences (of any lengths) 
+        as a list. Sequences of the same length are done together.
+        """
+        deltas = [None]*len(sequences)
+        by_length = {}
+        for seq_num, seq in enumerate(sequences):
+            by_length.setdefault(len(seq), []).append(seq_num)
+        for length, seq_nums in by_length.items():
+            if length < 5:
+                for seq_num in seq_nums:
+                    deltas[seq_num] = Protein.calc_delta(sequences[seq_num])
+                continue
+            codes = encode_protein(''.join([sequences[seq_num] for seq_num in seq_nums])).reshape(len(seq_nums), length)
+            for seq_num, delta in zip(seq_nums, _delta_from_codes(codes)):
+                deltas[seq_num] = delta
+        return deltas
+
     # function to calculate sequence charge decoration
     def calc_SCD(sequence):
-        total = 0
-        for m in range(1, len(sequence)):
-            m_val = m+1
-            for n in range(0, m-1):
-                n_val = n+1
-
-                cur_m_res = sequence[m]
-                cur_n_res = sequence[n]
-                
-                if cur_m_res == "D" or cur_m_res == "E":
-                    cur_m_charge = -1
-                elif cur_m_res == "K" or cur_m_res == "R":
-                    cur_m_charge = 1
-                else:
-                    cur_m_charge = 0
-
-                if cur_n_res == "D" or cur_n_res == "E":
-                    cur_n_charge = -1
-                elif cur_n_res == "K" or cur_n_res == "R":
-                    cur_n_charge = 1
-                else:
-                    cur_n_charge = 0
-
-                charge_val = cur_m_charge * cur_n_charge
-                final_val = charge_val * (math.sqrt((m_val)-(n_val)))
-
-                total += final_val
-
-        return round(total * (1/len(sequence)), 5)
+        charges = _ASCII_CHARGE[np.frombuffer(sequence.encode('ascii', errors='replace'), dtype=np.uint8)]
+        return _SCD_from_charges(charges[np.newaxis, :])[0]
 
 
     #function to calculate the mean hydropathy of a sequence
     def calc_mean_hydro(seq):
-        total_hydro = 0
-        for i in seq:
-            total_hydro += AminoAcid(i).hydropathy
-        return round(total_hydro / len(seq), 6)
+        return Protein._mean_hydro_from_codes(encode_protein(seq))
 
     def calc_percent_aromatic(seq):
         #function to determine percent of amino acids that are aromatic
-        N=0
-        for i in seq:
-            if AminoAcid(i).aromatic_check:
-                N+=1
-            else:
-                continue
-        if N > 0:
-            percent_aromatic = N/len(seq)
-        else:
-            percent_aromatic = 0
-        return percent_aromatic
+        return Protein._percent_from_codes(encode_protein(seq), _AROMATIC)
 
     def calc_percent_polar(seq):
         #function to determine percent of amino acids that are polar
-        N=0
-        for i in seq:
-            if AminoAcid(i).polar_check:
-                N+=1
-            else:
-                continue
-        if N > 0:
-            percent_polar = N/len(seq)
-        else:
-            percent_polar = 0
-        return percent_polar
+        return Protein._percent_from_codes(encode_protein(seq), _POLAR)
 
     def calc_percent_aliphatic(seq):
-        N=0
-        for i in seq:
-            if AminoAcid(i).aliphatic_check:
-                N+=1
-            else:
-                continue
-        if N > 0:
-            percent_aliphatic = N/len(seq)
-        else:
-            percent_aliphatic = 0
-        return percent_aliphatic
+        return Protein._percent_from_codes(encode_protein(seq), _ALIPHATIC)
 
     def auto_name():
         # generates an autoname based on the sequence properties
@@ -206,4 +356,115 @@ class Protein:
         properties_dict['hydropathy'] = Protein.calc_mean_hydro(seq)
         #properties_dict['fractions'] = Protein.calc_frac(seq)
         return properties_dict
-            
+
+
+def _round_ratios(numerators, denominators, digits):
+    '''
+    returns round(numerator / denominator, digits) for arrays of integer
+    numerators and denominators. There are few different pairs, so each
+    pair is rounded once with Python's round (numpy rounds differently).
+    '''
+    numerators = np.asarray(numerators, dtype=np.int64)
+    denominators = np.asarray(denominators, dtype=np.int64)
+    if len(numerators) == 0:
+        return np.zeros(0, dtype=np.float64)
+    # one integer for each pair
+    lowest = int(numerators.min())
+    width = int(denominators.max()) + 1
+    keys, positions = np.unique((numerators - lowest)*width + denominators, return_inverse=True)
+    rounded = [round((key // width + lowest) / (key % width), digits) for key in keys.tolist()]
+    return np.array(rounded, dtype=np.float64)[positions.reshape(-1)]
+
+
+def calc_properties_batch(sequences, lengths=None, fractions=True):
+    '''
+    Protein.calc_all_properties (and optionally Protein.calc_frac) for
+    many sequences at once, returned as columns.
+
+    Parameters
+    ----------
+    sequences : List or np.ndarray
+        A list of amino acid sequences (of any lengths), or a 2-D uint8 
+        array of ASCII codes with one sequence per row (see 
+        disorder_lookup.encode_sequences), padded with anything after
+        the end of each sequence
+
+    lengths : np.ndarray
+        The length of each sequence in the array. Only used if sequences
+        is an array, by default every row is a whole sequence.
+
+    fractions : Bool
+        Whether to also return the fraction of each amino acid
+
+    Returns
+    -------
+    dict
+        Arrays with one value per sequence (in the order of sequences) for
+        'length', 'FCR', 'NCPR', 'hydropathy', 'sigma', 'delta' and 'SCD', 
+        and if fractions is True, 'fractions', a dict of amino acid : 
+        array. The values are the same as the Protein.calc_ functions give.
+    '''
+    # get the sequences as positions in AminoAcid.standard_amino_acids, padded with _INVALID
+    if isinstance(sequences, np.ndarray):
+        ascii_codes = np.atleast_2d(sequences).astype(np.uint8, copy=False)
+        if lengths is None:
+            lengths = np.full(ascii_codes.shape[0], ascii_codes.shape[1], dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        if lengths.shape != (ascii_codes.shape[0],) or np.any(lengths > ascii_codes.shape[1]):
+            raise GooseInputError('There must be one length for each sequence and no length can be longer than the array.')
+        codes = _AA_CODES[ascii_codes]
+        in_sequence = np.arange(ascii_codes.shape[1]) < lengths[:, np.newaxis]
+        codes[~in_sequence] = _INVALID
+    else:
+        lengths = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+        codes = np.full((len(sequences), int(lengths.max()) if len(sequences) > 0 else 0), _INVALID, dtype=np.uint8)
+        in_sequence = np.arange(codes.shape[1]) < lengths[:, np.newaxis]
+        if len(sequences) > 0:
+            codes[in_sequence] = _AA_CODES[np.frombuffer(''.join(sequences).encode('ascii', errors='replace'), dtype=np.uint8)]
+    if np.any(lengths < 1):
+        raise GooseInputError('Every sequence must have at least 1 amino acid.')
+    if np.any(codes[in_sequence] == _INVALID):
+        raise GooseInputError('Sequences can only contain the 20 standard amino acids.')
+
+    num_sequences = len(lengths)
+    columns = {'length': lengths.copy()}
+
+    # charge and hydropathy with 0 after the end of each sequence
+    padded_codes = np.where(in_sequence, codes, 0)
+    charges = np.where(in_sequence, _CHARGE[padded_codes], 0)
+    num_charged = np.count_nonzero(charges, axis=1)
+    net_charge = charges.sum(axis=1)
+    columns['FCR'] = _round_ratios(num_charged, lengths, 6)
+    columns['NCPR'] = _round_ratios(net_charge, lengths, 6)
+
+    # adding 0 after the end of a sequence doesn't change the sum in order
+    if num_sequences > 0:
+        hydropathy_totals = np.cumsum(np.where(in_sequence, _HYDROPATHY[padded_codes], 0.0), axis=1)[:, -1]
+    else:
+        hydropathy_totals = np.zeros(0, dtype=np.float64)
+    columns['hydropathy'] = np.array([round(total / length, 6) for total, length in zip(hydropathy_totals.tolist(), lengths.tolist())], dtype=np.float64)
+
+    sigma_values = [Protein._sigma_from_values(FCR_seq, NCPR_seq) for FCR_seq, NCPR_seq in zip(columns['FCR'].tolist(), columns['NCPR'].tolist())]
+    columns['sigma'] = np.array(sigma_values, dtype=np.float64)
+
+    # delta and SCD for the sequences of each length, a chunk at a time
+    columns['delta'] = np.zeros(num_sequences, dtype=np.float64)
+    columns['SCD'] = np.zeros(num_sequences, dtype=np.float64)
+    chunk_size = parameters.PROPERTY_BATCH_CHUNK_SIZE
+    for length in np.unique(lengths).tolist():
+        seq_nums = np.flatnonzero(lengths == length)
+        for start in range(0, len(seq_nums), chunk_size):
+            chunk = seq_nums[start:start+chunk_size]
+            # delta is 0 for sequences shorter than 5 (see Protein.delta_pre)
+            if length >= 5:
+                columns['delta'][chunk] = _delta_from_codes(padded_codes[chunk, :length])
+            columns['SCD'][chunk] = _SCD_from_charges(charges[chunk, :length].astype(np.float64))
+
+    if fractions == True:
+        # count of each amino acid in each sequence (padding is counted as a 21st amino acid)
+        num_amino_acids = len(AminoAcid.standard_amino_acids)
+        counted = np.where(in_sequence, codes, num_amino_acids).astype(np.int64) + (num_amino_acids+1)*np.arange(num_sequences)[:, np.newaxis]
+        counts = np.bincount(counted.ravel(), minlength=num_sequences*(num_amino_acids+1)).reshape(num_sequences, num_amino_acids+1)
+        columns['fractions'] = {amino_acid: _round_ratios(counts[:, aa_num], lengths, 5) for aa_num, amino_acid in enumerate(AminoAcid.standard_amino_acids)}
+
+    return columns
@@ -0,0 +1,260 @@
+'''
+Samplers for the weighted amino acid lists.
+
+The lists used for sequence generation (HydroDict, NeutralHydroDict,
+alpha_helix_lists, disordered_list, ...) are weighted by repetition and
+can be thousands of amino acids long. Picking a random element of one of
+those lists is the same as picking one of the 20 amino acids with a
+probability equal to how often it appears in the list, so each list is
+held here as a 20 element probability vector with a cumulative table.
+Residues are then drawn for a whole sequence (or many sequences) at once
+with numpy, and excluded residues are handled by renormalising the
+probabilities of the remaining residues rather than copying and filtering
+the list.
+
+The numpy random generator used for each draw is seeded from python's
+random module, so random.seed() still makes sequence generation
+reproducible.
+'''
+
+import random
+import threading
+
+import numpy as np
+
+from goose.backend import lists
+from goose.backend.disorder_lookup import AMINO_ACIDS, decode_sequences
+from goose.goose_exceptions import GooseInputError
+
+
+# ASCII codes of the amino acids in the order of the probability vectors
+_AMINO_ACID_CODES = np.frombuffer(''.join(AMINO_ACIDS).encode('ascii'), dtype=np.uint8)
+
+# ASCII code -> position in AMINO_ACIDS (255 for anything else)
+_INVALID = 255
+_POSITIONS = np.full(256, _INVALID, dtype=np.uint8)
+for aa_num, aa in enumerate(AMINO_ACIDS):
+    _POSITIONS[ord(aa)] = aa_num
+
+
+def numpy_rng():
+    '''
+    returns a numpy random generator seeded from python's random module.
+    '''
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def _counts_from_codes(codes):
+    '''
+    returns the number of times each amino acid appears in a
+    uint8 array of ASCII codes.
+    '''
+    positions = _POSITIONS[codes]
+    if np.any(positions == _INVALID):
+        raise GooseInputError('Weighted lists can only contain the 20 standard amino acids.')
+    return np.bincount(positions, minlength=len(AMINO_ACIDS))
+
+
+class ResidueSampler:
+    '''
+    Draws amino acids with fixed probabilities.
+
+    Parameters
+    ----------
+    weights : np.ndarray
+        Non-negative weight for each amino acid in the order of
+        disorder_lookup.AMINO_ACIDS. The weights of a weighted list
+        are the number of times each amino acid appears in it.
+    '''
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (len(AMINO_ACIDS),) or np.any(weights < 0):
+            raise GooseInputError(f'A residue sampler needs {len(AMINO_ACIDS)} non-negative weights.')
+        if weights.sum() == 0:
+            raise GooseInputError('A residue sampler needs at least one amino acid with a weight above 0.')
+        self.weights = weights
+        self.weights.setflags(write=False)
+        # cumulative tables for each set of excluded residues used so far
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_list(cls, seq_list):
+        '''
+        makes a sampler that is equivalent to picking random
+        elements from a (weighted) list of amino acids.
+        '''
+        if len(seq_list) == 0:
+            raise GooseInputError('Can not sample from an empty list of amino acids.')
+        codes = np.frombuffer(''.join(seq_list).encode('ascii'), dtype=np.uint8)
+        return cls(_counts_from_codes(codes))
+
+    @classmethod
+    def from_counts(cls, counts):
+        '''
+        makes a sampler from a dict of amino acid : weight.
+        Amino acids that aren't in the dict have a weight of 0.
+        '''
+        weights = np.zeros(len(AMINO_ACIDS), dtype=np.float64)
+        for aa, count in counts.items():
+            if aa not in AMINO_ACIDS:
+                raise GooseInputError(f'{aa} is not one of the 20 standard amino acids.')
+            weights[AMINO_ACIDS.index(aa)] = count
+        return cls(weights)
+
+    @property
+    def probabilities(self):
+        '''
+        the probability of drawing each amino acid as a dict.
+        '''
+        probabilities = self.weights / self.weights.sum()
+        return dict(zip(AMINO_ACIDS, probabilities.tolist()))
+
+    def _exclusion_mask(self, exclude):
+        '''
+        returns the exclusion bit mask for an iterable of amino acids.
+        '''
+        mask = 0
+        for aa in exclude:
+            if aa in AMINO_ACIDS:
+                mask |= 1 << AMINO_ACIDS.index(aa)
+        return mask
+
+    def can_sample(self, exclude=None):
+        '''
+        returns True if there are amino acids with a weight above
+        0 left after removing the excluded amino acids.
+        '''
+        if not exclude:
+            return True
+        mask = self._exclusion_mask(exclude)
+        allowed = [(mask >> aa_num) & 1 == 0 for aa_num in range(len(AMINO_ACIDS))]
+        return bool(self.weights[allowed].sum() > 0)
+
+    def cumulative_table(self, exclude=None):
+        '''
+        returns the cumulative probabilities of the amino acids with the
+        excluded amino acids given a probability of 0 and the remaining
+        amino acids renormalised. Tables are kept for reuse.
+        '''
+        mask = self._exclusion_mask(exclude) if exclude else 0
+        table = self._tables.get(mask)
+        if table is None:
+            weights = self.weights.copy()
+            for aa_num in range(len(AMINO_ACIDS)):
+                if (mask >> aa_num) & 1:
+                    weights[aa_num] = 0
+            total = weights.sum()
+            if total == 0:
+                raise GooseInputError('Can not sample amino acids, every amino acid with a weight above 0 was excluded.')
+            table = np.cumsum(weights) / total
+            # make sure the last allowed amino acid catches everything up to 1
+            table[table >= table[np.flatnonzero(weights)[-1]]] = 1.0
+            table.setflags(write=False)
+            with self._lock:
+                self._tables[mask] = table
+        return table
+
+    def probability_vector(self, exclude=None):
+        '''
+        returns the probability of drawing each amino acid (in the order
+        of disorder_lookup.AMINO_ACIDS) with the excluded amino acids
+        removed and the rest renormalised.
+        '''
+        return np.diff(self.cumulative_table(exclude), prepend=0.0)
+
+    def sample_codes(self, num_sequences, length, exclude=None, rng=None):
+        '''
+        draws num_sequences sequences of the specified length.
+
+        Parameters
+        ----------
+        num_sequences : Int
+            The number of sequences to draw
+
+        length : Int
+            The length of each sequence
+
+        exclude : List
+            Amino acids that can't be drawn
+
+        rng : np.random.Generator
+            The random generator to use. By default a new one
+            seeded from python's random module is used.
+
+        Returns
+        -------
+        np.ndarray
+            uint8 array of ASCII codes with shape (num_sequences, length),
+            see disorder_lookup.decode_sequences
+        '''
+        table = self.cumulative_table(exclude)
+        if rng is None:
+            rng = numpy_rng()
+        draws = rng.random((num_sequences, length))
+        return _AMINO_ACID_CODES[np.searchsorted(table, draws, side='right')]
+
+    def sample_batch(self, num_sequences, length, exclude=None, as_strings=True, rng=None):
+        '''
+        draws num_sequences sequences of the specified length, returned as a
+        list of strings, or as a uint8 array if as_strings is False.
+        '''
+        codes = self.sample_codes(num_sequences, length, exclude=exclude, rng=rng)
+        if as_strings == True:
+            return decode_sequences(codes)
+        return codes
+
+    def sample(self, length, exclude=None, rng=None):
+        '''
+        draws a single sequence of the specified length.
+        '''
+        if length == 0:
+            return ''
+        return self.sample_codes(1, length, exclude=exclude, rng=rng)[0].tobytes().decode('ascii')
+
+
+# samplers for the lists / dicts in goose.backend.lists, made when first used
+_samplers = {}
+_samplers_lock = threading.Lock()
+
+
+def _data_list_names():
+    return set(lists.load_data_array('list_names').tolist())
+
+
+def list_sampler(name):
+    '''
+    returns the sampler for one of the weighted lists in goose.backend.lists
+    (e.g. 'disordered_list' or 'Hydro_dis_2_5'). Lists from the data
+    file are counted straight from the data file without being loaded.
+    '''
+    sampler = _samplers.get(name)
+    if sampler is None:
+        with _samplers_lock:
+            sampler = _samplers.get(name)
+            if sampler is None:
+                if name in _data_list_names():
+                    sampler = ResidueSampler(_counts_from_codes(lists.load_data_array(name)))
+                elif isinstance(getattr(lists, name, None), list):
+                    sampler = ResidueSampler.from_list(getattr(lists, name))
+                else:
+                    raise GooseInputError(f'{name} is not a weighted list in goose.backend.lists.')
+                _samplers[name] = sampler
+    return sampler
+
+
+def dict_sampler(dict_name, key):
+    '''
+    returns the sampler for lists.<dict_name>[key], where dict_name is
+    'HydroDict', 'NeutralHydroDict' or 'alpha_helix_lists'. Raises a
+    KeyError if key isn't in the dict.
+    '''
+    sampler = _samplers.get((dict_name, key))
+    if sampler is None:
+        keys = lists.load_data_array(f'{dict_name}__keys').tolist()
+        if key not in keys:
+            raise KeyError(key)
+        sampler = list_sampler(lists.load_data_array(f'{dict_name}__lists').tolist()[keys.index(key)])
+        _samplers[(dict_name, key)] = sampler
+    return sampler
+
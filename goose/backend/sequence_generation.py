@@ -6,15 +6,16 @@ backend does not check disorder because it allows for more rapid generation
 of input sequences that can then be checked here.
 '''
 
-import metapredict as meta
-
+from goose.backend.predict_disorder import predict_disorder, predict_disorder_batch
+from goose.backend.disorder_prefilter import passes_prefilter
+from goose.backend.disorder_rules import evaluate_disorder_batch
 from goose.backend.sequence_generation_backend import create_seq_by_props, sigma_FCR_NCPR, create_seq_by_fracs
 from goose.backend import parameters
-from goose.goose_exceptions import GooseFail
+from goose.goose_exceptions import GooseFail, GooseInputError
 from goose.backend.protein import Protein
 
 
-def check_disorder(sequence, disorder_threshold=parameters.DISORDER_THRESHOLD, strict=False):
+def check_disorder(sequence, disorder_threshold=parameters.DISORDER_THRESHOLD, strict=False, backend=None, prefilter=None):
     '''
     function to check whether a generated sequence is disordered.
     The function allows some 'ordered' residues provided that 
@@ -33,6 +34,17 @@ def check_disorder(sequence, disorder_threshold=parameters.DISORDER_THRESHOLD, s
         If set to True, then if any residue goes below threshold, the sequence
         will not be considered disordered. Default is False.
 
+    backend : None, String, or DisorderBackend
+        The disorder predictor to use. None uses the default predictor
+        (metapredict unless changed with set_disorder_backend).
+
+    prefilter : None, Bool, or Float
+        If set, the sequence is first scored with the lookup table
+        disorder predictor and rejected without running the disorder 
+        predictor if the score is below the prefilter threshold. True uses 
+        parameters.DISORDER_PREFILTER_THRESHOLD, a float sets the threshold.
+        See goose.backend.disorder_prefilter. Default is None (no prefilter).
+
     Returns
     -------
     Bool
@@ -40,62 +52,156 @@ def check_disorder(sequence, disorder_threshold=parameters.DISORDER_THRESHOLD, s
 
     
     '''
-    # calculate the sequence disorder using metapredict
+    # reject hopeless sequences before predicting disorder
+    if passes_prefilter(sequence, prefilter) == False:
+        return False
+
+    # calculate the sequence disorder
+    sequence_disorder = predict_disorder(_disorder_region(sequence), backend=backend)
+
+    return evaluate_disorder(sequence, sequence_disorder, disorder_threshold=disorder_threshold, strict=strict)
+
+
+
+def _disorder_region(sequence):
+    '''
+    returns the part of a sequence that is used to check disorder.
+    For sequences over 20 amino acids the first and last 2 residues
+    are not considered because the terminal residues are always
+    predicted to have lower disorder.
+    '''
     if len(sequence) > 20:
-        sequence_disorder = meta.predict_disorder(sequence[2:len(sequence)-2])
-    else:
-        sequence_disorder=meta.predict_disorder(sequence)
+        return sequence[2:len(sequence)-2]
+    return sequence
 
-    # see what the min disorder is
-    min_disorder = min(sequence_disorder)
-    if min_disorder >= disorder_threshold:
-        return True
 
-    # if the minimum disorder is very low, just return false.
-    elif min_disorder < 0.25:
-        return False
-    # see if sequence is likely to be disorderd
-    else:
-        # if strict set to True, nothing can be below threshold. Return False
-        if strict==True:
-            return False
-        # if strict not set to True, can have some 'order'
-        else:
-            # allow a little bit of 'order'
-            cur_order_streak = 0
-            # keep track of total number of disordered residues
-            total_ordered_residues = 0
-            # allow up to 5 % of residues to be 'ordered' provided they aren't consecutive
-            allowed_order_residues = round(0.05*len(sequence))
-            if allowed_order_residues < 1:
-                allowed_order_residues = 1
-            
-            # calculate number of conseuctively allowed residues
-            # going to allow up to the length of the sequence over 25 but 
-            # not greater than 10
-            consec_allowed = round(len(sequence)/25)
-            if consec_allowed < 1:
-                consec_allowed = 1
-            if consec_allowed > 10:
-                consec_allowed = 10
-
-            # now going to go through the sequence
-            for residue in sequence_disorder:
-                if residue < disorder_threshold:
-                    cur_order_streak += 1
-                    total_ordered_residues += 1
-                else:
-                    cur_order_streak = 0
-                if cur_order_streak > consec_allowed or total_ordered_residues > allowed_order_residues:
-                    return False
-    return True
 
+def evaluate_disorder(sequence, sequence_disorder, disorder_threshold=parameters.DISORDER_THRESHOLD, strict=False):
+    '''
+    function that applies the disorder rules used by check_disorder
+    to a disorder profile that has already been predicted.
 
+    Parameters
+    ----------
+    sequence : String
+        The amino acid sequence the disorder profile corresponds to
+
+    sequence_disorder : List
+        The predicted disorder values for the sequence (with the terminal
+        residues removed for sequences over 20 amino acids)
+
+    disorder_threshold : Float
+        The disorder threshold value. Higher values are more 'strict'
+
+    strict : Bool
+        Whether to allow for any residues below the disorder_threshold.
+
+    Returns
+    -------
+    Bool
+        Returns True if sequence is disordered and False if not disordered
+    '''
+    # the rules are applied by evaluate_disorder_batch (see goose.backend.disorder_rules)
+    return bool(evaluate_disorder_batch([sequence_disorder], len(sequence), disorder_threshold, strict=strict)[0])
+
+
+
+def check_disorder_batch(sequences, disorder_threshold=parameters.DISORDER_THRESHOLD, strict=False, backend=None, prefilter=None):
+    '''
+    function to check whether each sequence in a list of sequences is
+    disordered. Applies exactly the same rules as check_disorder but 
+    predicts the disorder of all of the sequences in a single batched
+    metapredict call, which is much faster than predicting them one 
+    at a time. The predictions are not added to the disorder cache.
+
+    Parameters
+    ----------
+    sequences : List
+        A list of amino acid sequences as strings
+
+    disorder_threshold : Float
+        The disorder threshold value. Higher values are more 'strict'
+
+    strict : Bool
+        Whether to allow for any residues below the disorder_threshold.
+        See check_disorder for more details.
+
+    backend : None, String, or DisorderBackend
+        The disorder predictor to use. See check_disorder.
+
+    prefilter : None, Bool, or Float
+        If set, sequences that fail the lookup table prefilter are
+        rejected without being predicted. See check_disorder.
+
+    Returns
+    -------
+    List
+        Returns a list of bools (one per input sequence) where True means
+        the sequence is disordered
+    '''
+    results = [False]*len(sequences)
+
+    # only predict the sequences that get through the prefilter
+    to_check = [seq_num for seq_num in range(0, len(sequences)) if passes_prefilter(sequences[seq_num], prefilter)]
+    if to_check == []:
+        return results
+
+    # predict everything at once. Profiles come back in the order of the input sequences.
+    # The sequences are freshly generated candidates that are very unlikely to be
+    # predicted again, so they are kept out of the disorder cache and store.
+    predictions = predict_disorder_batch([_disorder_region(sequences[seq_num]) for seq_num in to_check], backend=backend, use_cache=False)
+
+    # sequences of the same length are evaluated together
+    by_length = {}
+    for prediction_num in range(0, len(to_check)):
+        by_length.setdefault(len(sequences[to_check[prediction_num]]), []).append(prediction_num)
+    for sequence_length, prediction_nums in by_length.items():
+        accepted = evaluate_disorder_batch([predictions[prediction_num] for prediction_num in prediction_nums], sequence_length, disorder_threshold, strict=strict)
+        for prediction_num, is_disordered in zip(prediction_nums, accepted):
+            results[to_check[prediction_num]] = bool(is_disordered)
+    return results
+
+
+
+def _screen_candidates(build_candidate, num_seqs, batch_size, attempts, disorder_threshold, strict_disorder, backend=None, prefilter=None):
+    '''
+    builds candidate sequences batch_size at a time using build_candidate,
+    checks the disorder of each batch with a single batched prediction and
+    keeps the candidates that pass (in the order they were made) until 
+    num_seqs sequences are found. 
+
+    Raises GooseFail if num_seqs disordered sequences were not made 
+    in attempts batches.
+    '''
+    if batch_size < 1:
+        raise GooseInputError('batch_size must be at least 1.')
+
+    disordered_seqs = []
+    for attempt_num in range(0, attempts):
+        candidates = []
+        for candidate_num in range(0, batch_size):
+            # if attempt to build the sequence failed, just keep going
+            try:
+                candidates.append(build_candidate())
+            except:
+                continue
+
+        # score the whole batch at once
+        disorder_results = check_disorder_batch(candidates, disorder_threshold=disorder_threshold, strict=strict_disorder, backend=backend, prefilter=prefilter)
+        for candidate_num in range(0, len(candidates)):
+            if disorder_results[candidate_num]:
+                disordered_seqs.append(candidates[candidate_num])
+                if len(disordered_seqs) == num_seqs:
+                    return disordered_seqs
+
+    # if not enough disordered sequences in number of attempts, raise GooseFail
+    raise GooseFail('Unable to generate sequence!')
 
 
 
 def generate_disordered_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, sigma=None, attempts=20, 
-    allowed_hydro_error = parameters.HYDRO_ERROR, disorder_threshold = parameters.DISORDER_THRESHOLD, strict_disorder=False):
+    allowed_hydro_error = parameters.HYDRO_ERROR, disorder_threshold = parameters.DISORDER_THRESHOLD, strict_disorder=False,
+    batch_size=None):
     '''
     Function to actually generate a disordered sequence.
     General idea is to first generate the sequecne and see
@@ -139,6 +245,12 @@ def generate_disordered_seq_by_props(length, FCR=None, NCPR=None, hydropathy=Non
         the disorder theshold provided it is minimal. See check_disorder for more
         details.
 
+    batch_size : Int
+        If specified, candidate sequences are made batch_size at a time and the
+        disorder of each batch is predicted in one batched call. In this case
+        attempts is the number of batches to try. The first candidate that passes
+        is returned. See generate_disordered_seqs_by_props for more details.
+
     Returns
     -------
     final_seq : String
@@ -146,6 +258,12 @@ def generate_disordered_seq_by_props(length, FCR=None, NCPR=None, hydropathy=Non
 
 
     '''
+    # if using batches, just get a single sequence from the batched generator
+    if batch_size != None:
+        return generate_disordered_seqs_by_props(length, num_seqs=1, FCR=FCR, NCPR=NCPR, hydropathy=hydropathy, 
+            sigma=sigma, attempts=attempts, batch_size=batch_size, allowed_hydro_error=allowed_hydro_error, 
+            disorder_threshold=disorder_threshold, strict_disorder=strict_disorder)[0]
+
     # try the number of specified attempts to build the seq
     for attempt_num in range(0, attempts):
         # if sigma is specified, get the corresponding
@@ -174,6 +292,83 @@ def generate_disordered_seq_by_props(length, FCR=None, NCPR=None, hydropathy=Non
 
 
 
+def generate_disordered_seqs_by_props(length, num_seqs=1, FCR=None, NCPR=None, hydropathy=None, sigma=None, attempts=20, 
+    batch_size=parameters.DISORDER_BATCH_SIZE, allowed_hydro_error = parameters.HYDRO_ERROR, 
+    disorder_threshold = parameters.DISORDER_THRESHOLD, strict_disorder=False, backend=None, prefilter=None):
+    '''
+    Batched version of generate_disordered_seq_by_props. Candidate 
+    sequences are made batch_size at a time and the disorder of 
+    every candidate in a batch is predicted in a single batched 
+    metapredict call. Candidates that pass check_disorder are kept 
+    until num_seqs sequences have been made.
+
+    Parameters
+    ----------
+    length : Int
+        The length of the wanted protein sequence as an integer value
+
+    num_seqs : Int
+        The number of disordered sequences to return
+
+    FCR : Float
+        The fraction of charged residues wanted for the sequence as a 
+        decimal value.
+
+    NCPR : Float
+        The wanted net charge of the sequence given as a decimal value
+
+    hydropathy : Float 
+        The wanted mean hydropathy value of the sequence.
+
+    sigma : Float
+        The wanted sigma value of the sequence
+
+    attempts : Int
+        The number of batches to try before throwing in the towel
+
+    batch_size : Int
+        The number of candidate sequences to score per batched prediction
+
+    allowed_hydro_error : Float
+        The allowed error for hydropathy between the value of hydropathy and
+        the final hydropathy value of the generated sequence
+
+    disorder_threshold : Float
+        The value for a residue to be considered disordered.
+
+    strict_disorder : Bool
+        Whether to have a strict cutoff for disorder. See check_disorder for more
+        details.
+
+    backend : None, String, or DisorderBackend
+        The disorder predictor used to screen candidates. See check_disorder.
+
+    prefilter : None, Bool, or Float
+        Whether to reject candidates with the lookup table prefilter
+        before predicting their disorder. See check_disorder.
+
+    Returns
+    -------
+    List
+        Returns a list of num_seqs disordered sequences.
+
+    '''
+    def build_candidate():
+        cur_FCR = FCR
+        cur_NCPR = NCPR
+        # if sigma is specified, get the corresponding
+        # FCR and NCPR values
+        if sigma != None:
+            FCR_NCPR_Dict = sigma_FCR_NCPR(length, sigma)
+            cur_FCR = FCR_NCPR_Dict['FCR']
+            cur_NCPR = FCR_NCPR_Dict['NCPR']
+        return create_seq_by_props(length, FCR=cur_FCR, NCPR=cur_NCPR, hydropathy=hydropathy, attempts=20, 
+            allowed_hydro_error=allowed_hydro_error)
+
+    return _screen_candidates(build_candidate, num_seqs, batch_size, attempts, disorder_threshold, strict_disorder, backend=backend, prefilter=prefilter)
+
+
+
 
 def generate_disordered_seq_by_fractions(length, **kwargs):
     '''
@@ -203,6 +398,11 @@ def generate_disordered_seq_by_fractions(length, **kwargs):
         the disorder theshold provided it is minimal. See check_disorder for more
         details.
 
+    batch_size : Int
+        If specified, candidate sequences are made batch_size at a time and the
+        disorder of each batch is predicted in one batched call. In this case
+        attempts is the number of batches to try.
+
     **kwargs : Variable, float
         The desired amino acid as a variable (no need for quotations).     
         The fraction of amino acids as a float followed immediately by
@@ -232,6 +432,11 @@ def generate_disordered_seq_by_fractions(length, **kwargs):
     else:
         strict_disorder = kwargs['strict_disorder']    
 
+    if 'batch_size' not in list(kwargs.keys()):
+        batch_size = None
+    else:
+        batch_size = kwargs['batch_size']
+
     # make input kwargs just amino acids
     input_kwargs = {}
     amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
@@ -240,6 +445,10 @@ def generate_disordered_seq_by_fractions(length, **kwargs):
         if kw in amino_acids:
             input_kwargs[kw] = curkwval
 
+    # if using batches, score batch_size candidates at a time
+    if batch_size != None:
+        return _screen_candidates(lambda: create_seq_by_fracs(length, **input_kwargs), 1, batch_size, 
+            attempts, cutoff, strict_disorder)[0]
 
     # try the number of specified attempts to build the seq
     for attempt_num in range(0, attempts):
@@ -259,3 +468,64 @@ def generate_disordered_seq_by_fractions(length, **kwargs):
 
     # if no disordered sequence in number of attempts, raise GooseFail
     raise GooseFail('Unable to generate sequence!')
+
+
+
+def generate_disordered_seqs_by_fractions(length, num_seqs=1, **kwargs):
+    '''
+    Batched version of generate_disordered_seq_by_fractions. Candidate 
+    sequences are made batch_size at a time and the disorder of every
+    candidate in a batch is predicted in a single batched metapredict call.
+
+    Parameters
+    ----------
+    length : Int
+        The length of the wanted protein sequence as an integer value
+
+    num_seqs : Int
+        The number of disordered sequences to return
+
+    attempts : Int
+        The number of batches to try before throwing in the towel
+
+    batch_size : Int
+        The number of candidate sequences to score per batched prediction
+
+    cutoff : Float
+        The value for a residue to be considered disordered.
+
+    strict_disorder : Bool
+        Whether to have a strict cutoff for disorder. See check_disorder for more
+        details.
+
+    backend : None, String, or DisorderBackend
+        The disorder predictor used to screen candidates. See check_disorder.
+
+    prefilter : None, Bool, or Float
+        Whether to reject candidates with the lookup table prefilter
+        before predicting their disorder. See check_disorder.
+
+    **kwargs : Variable, float
+        The desired amino acid as a variable (no need for quotations).     
+        The fraction of amino acids as a float followed immediately by
+
+    Returns
+    -------
+    List
+        Returns a list of num_seqs disordered sequences.
+
+    '''
+    # check for necessary kwargs
+    attempts = kwargs.get('attempts', 1)
+    cutoff = kwargs.get('cutoff', parameters.DISORDER_THRESHOLD)
+    strict_disorder = kwargs.get('strict_disorder', False)
+    batch_size = kwargs.get('batch_size', parameters.DISORDER_BATCH_SIZE)
+    backend = kwargs.get('backend', None)
+    prefilter = kwargs.get('prefilter', None)
+
+    # make input kwargs just amino acids
+    amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+    input_kwargs = {kw: kwargs[kw] for kw in kwargs.keys() if kw in amino_acids}
+
+    return _screen_candidates(lambda: create_seq_by_fracs(length, **input_kwargs), num_seqs, batch_size, 
+        attempts, cutoff, strict_disorder, backend=backend, prefilter=prefilter)
@@ -1,5 +1,10 @@
+import bisect
 import random
 import math
+import threading
+from collections import Counter
+
+import numpy as np
 from random import randint
 
 from goose.backend import lists
@@ -7,6 +12,12 @@ from goose.backend.protein import Protein
 from goose.backend.amino_acids import AminoAcid
 from goose.goose_exceptions import GooseError, GooseInputError
 from goose.backend import parameters
+from goose.backend.predict_disorder import score_next_residues
+from goose.backend.disorder_lookup import reduced_key, disorder_row, lookup_disorder, load_lookup_table, encode_sequences, decode_sequences, AMINO_ACIDS
+from goose.backend.residue_sampler import ResidueSampler, list_sampler, numpy_rng
+from goose.backend.markov_sampler import sample_chains, clear_transition_tables
+from goose.backend.hydropathy_sampler import sample_hydropathy_counts, hydropathy_distribution
+from goose.backend.optimizer_state import LookupDisorderState, PropertyState
 
 
 
@@ -41,42 +52,11 @@ def optimal_residue_key(four_amino_acids):
 
     """
 
-    # make an empty string to hold the 4 amino acids
-    key = ""
-
-    # for the amino acids in the input amino acids, change each one
-    # to the corresponding amino acid used for the dis_val_dict
-    for i in four_amino_acids:
-        if i == "F" or i == "W" or i == "Y":
-            key += "W"
-        elif i == "C":
-            key += "C"
-        elif i == "L" or i == "V" or i == "I":
-            key += "L"
-        elif i == "M":
-            key += "M"
-        elif i == "A":
-            key += "A"
-        elif i == "H":
-            key += "H"
-        elif i == "K" or i == "R":
-            key += "K"
-        elif i == "Q" or i == "N":
-            key += "Q"
-        elif i == "D" or i == "E":
-            key += "D"
-        elif i == "G" or i == "S":
-            key += "G"
-        elif i == "T":
-            key += "T"
-        elif i == "P":
-            key += "P"
-        else:
-            continue
-    
-    # return the final 4 amino acids that are the key to the 
-    # dis_val_dict
-    return key
+    # change each amino acid to the corresponding amino acid used 
+    # for the dis_val_dict (see goose.backend.disorder_lookup)
+    if _optimal_residue_table is not None:
+        return _optimal_residue_table.key(four_amino_acids)
+    return reduced_key(four_amino_acids)
 
 
 def get_optimal_residue(four_amino_acids, exclude_residues = [], cutoff_disorder = None, return_all=False):
@@ -134,26 +114,8 @@ def get_optimal_residue(four_amino_acids, exclude_residues = [], cutoff_disorder
     if len(exclude_residues) >= 20:
         raise GooseInputError("You cannot exclude all amino acids.")
 
-    # set order of amino acids for potential_AA_vals 
-    # This order matches what was used for the input 5th
-    # amino acid during generation of the aa_dis_val_4_V2 dict
-    ordered_amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
-    
-    # make empty list to hold potential resiudes if more than
-    # one would in theory work.
-    potential_residue_numbers = []
-    
     # translate the sequence to keys that are in the dict
     four_amino_acids_key = optimal_residue_key(four_amino_acids)
-    
-    # get vals from dict
-    potential_AA_vals = lists.aa_dis_val_4_v3[four_amino_acids_key]
-    
-    # sort the values from highest to lowest
-    potential_residue_numbers = sorted(potential_AA_vals, reverse=True)
-    
-    # make empty list to hold potential amino_acids
-    candidate_amino_acids = [] 
 
     # adjust the cutoff value for the dis_val list
     # Note - this was empiracally determined based on disorder vals
@@ -163,49 +125,198 @@ def get_optimal_residue(four_amino_acids, exclude_residues = [], cutoff_disorder
     # average disorder in dict = 0.6397844593942738, stdev of scores in dict = 0.07225962272855471
     # THIS IS DIFFERENT THAN parameters.DISORDER_THRESHOLD due to how the precomputed dict was made.
     if cutoff_disorder == None:
-        cutoff_disorder = 0.7120440821228284
+        cutoff_disorder = parameters.OPTIMAL_RESIDUE_CUTOFF
 
 
     # make sure cutoff dis val doesn't get too high
     if cutoff_disorder > 0.95:
         cutoff_disorder = 0.95
 
-    # iterate through potential amino acids
+    # get the candidates for this key, cutoff and set of excluded residues
+    candidate_amino_acids = optimal_residue_candidates(four_amino_acids_key, exclude_residues, cutoff_disorder)
+
+    # choose a random amino acid from the list to return
+    if return_all == False:
+        return candidate_amino_acids[randint(0, len(candidate_amino_acids)-1)]
+    else:
+        return list(candidate_amino_acids)
+
+
+# order of amino acids for the values in the aa_dis_val_4_v3 dict
+_OPTIMAL_RESIDUE_ORDER = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+_OPTIMAL_RESIDUE_BITS = {aa: 1 << aa_num for aa_num, aa in enumerate(_OPTIMAL_RESIDUE_ORDER)}
+
+# candidate residues for (key, cutoff, exclusion bit mask), filled as they are used
+_optimal_residue_candidates = {}
+_optimal_residue_lock = threading.Lock()
+
+# lookup table used instead of aa_dis_val_4_v3 (None uses aa_dis_val_4_v3)
+_optimal_residue_table = None
+
+
+def set_optimal_residue_table(table):
+    '''
+    sets the lookup table get_optimal_residue uses to find candidate
+    residues. Takes a LookupTable, the path to a table file made with
+    devtools/scripts/build_lookup_table.py, or None to go back to
+    aa_dis_val_4_v3. get_optimal_residue only gets the last 4 residues,
+    so the table must have a context of 4 residues. The batch samplers
+    (create_seqs_by_length_batch and create_seqs_by_fracs_batch) use
+    the same table.
+    '''
+    global _optimal_residue_table
+    if table is not None:
+        table = load_lookup_table(table)
+        if table.context_length != 4:
+            raise GooseInputError(f'get_optimal_residue needs a lookup table with a context of 4 residues, {table.name} has a context of {table.context_length}.')
+    with _optimal_residue_lock:
+        _optimal_residue_table = table
+        # the candidates and transition tables made so far came from the old table
+        _optimal_residue_candidates.clear()
+        clear_transition_tables()
+
+
+def optimal_residue_candidates(four_amino_acids_key, exclude_residues, cutoff_disorder):
+    '''
+    returns the tuple of residues get_optimal_residue picks from for a 
+    key of the aa_dis_val_4_v3 dict. The candidates for each key, cutoff 
+    and set of excluded residues are only worked out once and kept (up to 
+    parameters.OPTIMAL_RESIDUE_CACHE_SIZE of them, oldest dropped first).
+
+    Parameters
+    -------------
+    four_amino_acids_key : String
+        A key of the aa_dis_val_4_v3 dict (see optimal_residue_key)
+
+    exclude_residues : List
+        List of residues that can't be candidates
+
+    cutoff_disorder : Float
+        Residues with a disorder value over the cutoff are candidates
+
+    Returns
+    ---------
+    Tuple
+        The candidate residues
+    '''
+    exclusion_mask = 0
+    for aa in exclude_residues:
+        exclusion_mask |= _OPTIMAL_RESIDUE_BITS.get(aa, 0)
+    cache_key = (four_amino_acids_key, cutoff_disorder, exclusion_mask)
+    candidate_amino_acids = _optimal_residue_candidates.get(cache_key)
+    if candidate_amino_acids is None:
+        candidate_amino_acids = _find_optimal_residue_candidates(four_amino_acids_key, exclusion_mask, cutoff_disorder)
+        with _optimal_residue_lock:
+            if len(_optimal_residue_candidates) >= parameters.OPTIMAL_RESIDUE_CACHE_SIZE:
+                del _optimal_residue_candidates[next(iter(_optimal_residue_candidates))]
+            _optimal_residue_candidates[cache_key] = candidate_amino_acids
+    return candidate_amino_acids
+
+
+def _find_optimal_residue_candidates(four_amino_acids_key, exclusion_mask, cutoff_disorder):
+    '''
+    works out the candidates for optimal_residue_candidates.
+    '''
+    # get vals from the table (same values as the aa_dis_val_4_v3 dict)
+    if _optimal_residue_table is not None:
+        potential_AA_vals = _optimal_residue_table.row(four_amino_acids_key).tolist()
+    else:
+        potential_AA_vals = disorder_row(four_amino_acids_key).tolist()
+
+    # sort the values from highest to lowest
+    potential_residue_numbers = sorted(potential_AA_vals, reverse=True)
+
+    # every amino acid over the cutoff that isn't excluded
+    candidate_amino_acids = []
     for i in range(0, len(potential_AA_vals)):
-        # get the predicted disorder value for that amino acid
-        predicted_value = potential_AA_vals[i]
-        # if that value is greater than the cutoff
-        if predicted_value > cutoff_disorder:
-            # Get the corresponding amino acid
-            corresponding_amino_acid = ordered_amino_acids[i]
-            # if the amino acid is not supposed to be excluded...
-            if corresponding_amino_acid not in exclude_residues:
-                # add that amino acid to the candidate amino acid list
-                candidate_amino_acids.append(corresponding_amino_acid)
+        if potential_AA_vals[i] > cutoff_disorder and not exclusion_mask & (1 << i):
+            candidate_amino_acids.append(_OPTIMAL_RESIDUE_ORDER[i])
 
     # if the candidate amino acids list is still empty, need to do something else...
     if candidate_amino_acids == []:
         # setting arbitrary index value to iterate through the potential residue numbers
         amino_acid_index = 0
-        # while we don't yet have the best possible amino acid under 0.7...
+        # while we don't yet have the best possible amino acid under the cutoff...
         while candidate_amino_acids == []:
             # figure out what index value corresponds to the highest current value
             current_index_value = potential_residue_numbers[amino_acid_index]
             
-            # figure out where the residue is in the original unsorted list
+            # figure out where the residue is in the original unsorted list. For 
+            # tied values this is always the first residue with that value.
             current_residue_position = potential_AA_vals.index(current_index_value)
             
-            # get the corresponding amino acid. Amino acids always in order
-            # for list ordered_amino_acids, so just call index as is
-            corresponding_amino_acid = ordered_amino_acids[current_residue_position]            
-            # if that amino acid is not to be excluded...
-            if corresponding_amino_acid not in exclude_residues:
-                # add it to the candidate list
-                candidate_amino_acids.append(corresponding_amino_acid)
+            # if that amino acid is not to be excluded add it to the candidate list
+            if not exclusion_mask & (1 << current_residue_position):
+                candidate_amino_acids.append(_OPTIMAL_RESIDUE_ORDER[current_residue_position])
             # go to next amino acid index
             amino_acid_index += 1
 
-    # choose a random amino acid from the list to return
+    return tuple(candidate_amino_acids)
+
+
+def get_predicted_optimal_residue(sequence, exclude_residues = [], cutoff_disorder = None, return_all=False):
+
+    """
+
+    Slower alternative to get_optimal_residue that uses predicted disorder. Rather
+    than looking up approximate disorder values for the next residue 
+    from the last 4 amino acids, the disorder of every possible next
+    residue is predicted (in a single batch) using the last 20 amino 
+    acids of the sequence. Each candidate is scored by the average 
+    predicted disorder of the last few residues (see 
+    parameters.NEXT_RESIDUE_SCORE_WINDOW) and a random residue above
+    the cutoff is returned.
+
+    Parameters
+    -------------
+
+    sequence : String
+        The sequence generated so far. Only the end of the 
+        sequence is used.
+
+    exclude_residues : List
+        List of residues to be excluded from possible residues to be
+        returned.
+    
+    cutoff_disorder : Float
+        The cutoff value to be used for considering something as disordered.
+        Default is the mean + 1 standard deviation of the predicted values.
+
+    return_all : Bool
+        Whether to return all candidate residues
+
+    Returns
+    ---------
+
+    String
+        A single amino acid as a string.
+
+    """
+    if len(exclude_residues) >= 20:
+        raise GooseInputError("You cannot exclude all amino acids.")
+
+    # predict the disorder of every allowed next residue
+    allowed_residues = [aa for aa in lists.amino_acids if aa not in exclude_residues]
+    residue_scores = score_next_residues(sequence, amino_acid_list=allowed_residues, score_window=parameters.NEXT_RESIDUE_SCORE_WINDOW)
+
+    # The last residue of a sequence is always predicted to be fairly 
+    # disordered, so a fixed cutoff lets almost everything through. Like the
+    # cutoff for get_optimal_residue (average value in the lookup table + 1 
+    # standard deviation) the default cutoff is the average + 1 standard 
+    # deviation, but of the predicted values for this sequence.
+    if cutoff_disorder == None:
+        score_values = [residue_scores[aa] for aa in allowed_residues]
+        mean_score = sum(score_values)/len(score_values)
+        cutoff_disorder = mean_score + math.sqrt(sum([(score - mean_score)**2 for score in score_values])/len(score_values))
+    if cutoff_disorder > 0.95:
+        cutoff_disorder = 0.95
+
+    candidate_amino_acids = [aa for aa in allowed_residues if residue_scores[aa] > cutoff_disorder]
+
+    # if nothing is over the cutoff, take the best residue
+    if candidate_amino_acids == []:
+        candidate_amino_acids = [max(allowed_residues, key=lambda aa: residue_scores[aa])]
+
     if return_all == False:
         return candidate_amino_acids[randint(0, len(candidate_amino_acids)-1)]
     else:
@@ -257,41 +368,10 @@ def fast_predict_disorder(sequence):
         Returns the disorder values on a residue-by-residue basis as a list
         of float values.
     '''
-    # make list to hold disorder values
-    disorder_values = []
-    # amino acids in the order used to generate aa_dis_val_4_v3_dict
-    amino_acids = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
-    # iterate through sequence
-    for i in range(0, len(sequence)):
-        # first 3 values need to be tweeked such that we can get disorder values back
-        # this is because the 'pseudo predictor' requries 4 residues to get the predicted
-        # disorder for the following residue.
-        beginning = [0, 1, 2, 3]
-
-        # if the value is in the first 4 amino acids, just use the first 4 as the 'base'
-        if i in beginning:
-            cur_sequence = sequence[0:4]
-        else:
-            # if not first 4 amino acids, take the 4 amino acids
-            # preceeding the next amino acid to get the optimal
-            # residue key to use in the aa_dis_val_4_v3_dict dictionary
-            cur_sequence = sequence[i-4:i]
-        
-        # now input the base (4 amino acicds) as cur_sequence to get the 
-        # corresponding key for the dict holding pseudo disorder values
-        cur_sequence = optimal_residue_key(cur_sequence)
-        # get the disorder values using the key from the aa_dis_val_4_v3 dict
-        all_disorder_values=(lists.aa_dis_val_4_v3[cur_sequence])
-        # get the next residue in the sequence
-        next_residue = sequence[i]
-        # figure out the index value for that residue
-        index_value = amino_acids.index(next_residue)
-        # get the corresponding disorder value
-        disorder_value = all_disorder_values[index_value]
-        # append the disorder value to the growing list of disorder values
-        disorder_values.append(disorder_value)
-    # return a list of disorder values corresponding to each amino acid
-    return disorder_values
+    # the first 4 residues use the first 4 residues as the 'base', every
+    # other residue uses the 4 residues before it. The values for the whole
+    # sequence are looked up at once (see goose.backend.disorder_lookup)
+    return lookup_disorder(sequence).tolist()
 
 
 
@@ -356,56 +436,64 @@ def optimize_once(sequence):
         The best sequence as far as optimization
 
     '''
-    # get pseudo disorder
-    sequence_disorder = fast_predict_disorder(sequence)
+    state = LookupDisorderState(sequence)
+    optimize_state_once(state)
+    return state.sequence
+
+
+
+def optimize_state_once(state):
+    '''
+    optimize_once for a LookupDisorderState (see goose.backend.optimizer_state).
+    Finds the best swap for the worst residue the same way as optimize_once
+    and makes it. Only the value at the worst residue is needed for each 
+    possible swap and the state can give that without making the swap, so 
+    this doesn't have to look at the rest of the sequence.
+
+    Parameters
+    -------------
+    state : LookupDisorderState
+        The state of the sequence being optimized. Changed in place.
+
+    Returns
+    ---------
+    Bool
+        Whether a swap was made
+    '''
+    sequence = state.residues
     # find worst residue based on pseudo disorder predicotor
-    worst_residue_index = sequence_disorder.index(min(sequence_disorder))
+    worst_residue_index = state.worst_position()
     # get worst residue
     worst_residue = sequence[worst_residue_index]
-    # figure out all amino acids present in the sequence
-    all_possible_amino_acids = set([char for char in sequence])
-    # now make list of sequences where the amino acids are switched between the worst and other amino acids
-    test_sequence = []
 
-    # now for all the possible amino acids
-    for i in all_possible_amino_acids:
+    # set the best disorder value to the minimume of seq disorder
+    # because we only want stuff better than that.
+    best_disorder_value = state.scores[worst_residue_index]
+    best_index = None
+
+    # now for all the possible amino acids (in the same order as set(sequence)
+    # so the same random residues are picked as before)
+    for i in set(sequence):
         # find their locations
-        possible_indices = identify_residue_positions(sequence, i)
+        possible_indices = state.positions[i]
         if len(possible_indices)>1:
             cur_index = possible_indices[randint(0, len(possible_indices)-1)]
         else:
-            cur_index = sequence.index(i)
+            cur_index = possible_indices[0]
         # figure out if the cur res is not the residue trying to be swapped
-        cur_res = sequence[cur_index]
-        if cur_res != worst_residue:
-            if worst_residue_index < cur_index:
-                cur_sequence = sequence[0:worst_residue_index] + cur_res + sequence[worst_residue_index+1:cur_index] + worst_residue + sequence[cur_index+1:] 
-            else:
-                cur_sequence = sequence[0:cur_index] + worst_residue + sequence[cur_index+1:worst_residue_index] + cur_res + sequence[worst_residue_index+1:]
-            # add the sequence to the test sequence list
-            test_sequence.append(cur_sequence)
+        if sequence[cur_index] != worst_residue:
+            # figure out the disorder at the worst residue position after the swap
+            cur_dis_at_worst = state.score_after_swap(worst_residue_index, worst_residue_index, cur_index)
+            # if it's better than the best disorder value replace it
+            if cur_dis_at_worst > best_disorder_value:
+                best_index = cur_index
+                best_disorder_value = cur_dis_at_worst
 
-    # set the best disorder value to the minimume of seq disorder
-    # because we only want stuff better than that.
-    best_disorder_value = min(sequence_disorder)
-    
-    # set the best sequence to the input because if we cnan't make anyhting
-    # better we will return the input sequence as is
-    best_sequence = sequence
-
-    # for each sequence to be tested
-    for i in test_sequence:
-        # get it's fast disorder
-        cur_disorder = fast_predict_disorder(i)
-        # figure out the current disorder at the worst residue position
-        cur_dis_at_worst = cur_disorder[worst_residue_index]
-        # if it's better than the best disorder value replace it
-        if cur_dis_at_worst > best_disorder_value:
-            best_sequence = i
-            best_disorder_value = cur_dis_at_worst
-
-    # return the best sequenc
-    return best_sequence
+    # if nothing was better the sequence is left as is
+    if best_index == None:
+        return False
+    state.swap(worst_residue_index, best_index)
+    return True
 
 
 
@@ -429,35 +517,33 @@ def optimize_sequence(sequence, iterations=100):
         A new sequence that should have a better chance of being disordered
 
     '''
-    # keep track of list of sequences. That way if we start getting the same sequence
-    # again we can kill the optimization
-    already_used = [sequence]
+    # the lookup values are kept for the whole optimization and only
+    # updated where a swap changes them
+    state = LookupDisorderState(sequence)
 
-    # keep track if repeat sequence is made. If the sequence is repeated than we have
-    # more or less optimized as much as we can.
-    repeat_sequence = False
+    # keep track of how many times each sequence was made. That way if we start 
+    # getting the same sequence again we can kill the optimization
+    already_used = Counter([sequence])
 
     # keep track of iterations
     cur_iter = 0
 
     # iteratively optimized sequecnce
-    while repeat_sequence == False:
-        new_sequence = optimize_once(sequence)
-        if already_used.count(new_sequence) > 1 or cur_iter == iterations:
+    while True:
+        optimize_state_once(state)
+        new_sequence = state.sequence
+        if already_used[new_sequence] > 1 or cur_iter == iterations:
             # if we are at the max number of iterations or we have 
-            # the same sequence in the list twice, return it and kill
+            # made the same sequence twice, return it and kill
             # the optimization
             return new_sequence
-            repeat_sequence = True
-        # add the generated sequence to the list of sequences already generated
+        # add the generated sequence to the sequences already generated
         # to keep track of possible duplicates
-        already_used.append(new_sequence)
-        sequence = new_sequence
+        already_used[new_sequence] += 1
         # update cur_iter
         cur_iter += 1
 
 
-
 def shuffle_seq(seq):
 
     """
@@ -507,7 +593,7 @@ def random_optimization(sequence, min_random_iterations = 100, min_is_max = Fals
     
     '''
     # keep track of best sequence
-    best_min_disorder = min(fast_predict_disorder(sequence))
+    best_min_disorder = lookup_disorder(sequence).min()
     # set best sequences = sequence in case nothing better is made
     best_sequence = sequence
     # adjust random iterations based on seq length
@@ -524,7 +610,7 @@ def random_optimization(sequence, min_random_iterations = 100, min_is_max = Fals
     # generate some random seqs
     for i in range(0, random_iterations):
         generated_sequence = shuffle_seq(sequence)
-        cur_min_disorder = min(fast_predict_disorder(generated_sequence))
+        cur_min_disorder = lookup_disorder(generated_sequence).min()
         if cur_min_disorder > best_min_disorder:
             best_sequence = generated_sequence
             best_min_disorder = cur_min_disorder
@@ -647,17 +733,15 @@ def gen_sequence(length, usedlist=[]):
 
     '''
 
-    final_sequence = ''
     if usedlist == []:
         usedlist = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
-    for i in range(0, length):
-        final_sequence += random_amino_acid(usedlist)
-    return final_sequence
+    # draw the whole sequence at once from the list's amino acid frequencies
+    return ResidueSampler.from_list(usedlist).sample(length)
 
 
 
 
-def all_excluded_residues_hydro(sequence, objective_hydropathy, no_charge=False, input_exclusion=[]):
+def all_excluded_residues_hydro(sequence, objective_hydropathy, no_charge=False, input_exclusion=[], current_hydropathy=None):
 
     """
     
@@ -682,6 +766,10 @@ def all_excluded_residues_hydro(sequence, objective_hydropathy, no_charge=False,
     input_exclusion : List
         A list of additional residues to exclude from potential residues
 
+    current_hydropathy : Float
+        The hydropathy of the sequence if it is already known. If it
+        is given, sequence is not used.
+
 
     Returns
     ---------
@@ -699,15 +787,18 @@ def all_excluded_residues_hydro(sequence, objective_hydropathy, no_charge=False,
         if i not in exclude_amino_acids:
             exclude_amino_acids.append(i)
 
+    if current_hydropathy is None:
+        current_hydropathy = Protein.calc_mean_hydro(sequence)
+
     # if the objective hydro is less than the current hydro add residues greater than objective to list
-    if Protein.calc_mean_hydro(sequence) > objective_hydropathy:
+    if current_hydropathy > objective_hydropathy:
         for i in lists.amino_acids:
             if AminoAcid.hydro(i) > objective_hydropathy:
                 if i not in exclude_amino_acids:
                     exclude_amino_acids.append(i)
 
     # if the objective hydro is greater than the current hydro add residues less than objective to list
-    if Protein.calc_mean_hydro(sequence) < objective_hydropathy:
+    if current_hydropathy < objective_hydropathy:
         for i in lists.amino_acids:
             if AminoAcid.hydro(i) < objective_hydropathy:
                 if i not in exclude_amino_acids:
@@ -786,18 +877,24 @@ def optimize_hydro(sequence, final_hydropathy, use_charged_residues=False, cutof
         hydropathy.
 
     """
+    state = PropertyState(sequence)
+    optimize_hydro_state(state, final_hydropathy, use_charged_residues=use_charged_residues, excluded_residues=excluded_residues)
+    return state.sequence
+
+
+def optimize_hydro_state(state, final_hydropathy, use_charged_residues=False, excluded_residues=[]):
+    """
+    optimize_hydro for a PropertyState (see goose.backend.optimizer_state).
+    Changes at most one residue of the state and returns True if a 
+    residue was changed.
+    """
 
     #set current_hydro equal to the current hydropathy of the sequence
-    current_hydro = Protein.calc_mean_hydro(sequence)
-    
-    #set worst value to 0
-    value_coordinate = 0
+    current_hydro = state.mean_hydropathy
     
     # determine whether or not to stop the optimzation
     if abs(current_hydro - final_hydropathy) < 0.01:
-        stop=True
-    else:
-        stop=False
+        return False
     
     # make initial list of residues to exclude based on those input
     exclude_these_residues = excluded_residues
@@ -811,79 +908,113 @@ def optimize_hydro(sequence, final_hydropathy, use_charged_residues=False, cutof
             if residue not in exclude_these_residues:
                 exclude_these_residues.append(residue)
 
-    # if current hydropathy is too high, find amino acids
-    # to change that will lower it
+    # the first position (from position 3 on) of each amino acid that can be changed
+    first_positions = []
+    for amino_acid, positions in state.positions.items():
+        if amino_acid not in exclude_these_residues:
+            first_index = bisect.bisect_left(positions, 3)
+            if first_index < len(positions):
+                first_positions.append((AminoAcid.hydro(amino_acid), positions[first_index]))
+
+    # if there is nothing to change, we won't be able to get an optimal residue
+    if first_positions == []:
+        return False
+
+    # if current hydropathy is too high, change the first of the residues
+    # with the highest hydropathy, otherwise the first of the residues
+    # with the lowest hydropathy
     if current_hydro > final_hydropathy:
-        worst_value = -100
-        for amino_acid_index in range(3, len(sequence)):
-            if sequence[amino_acid_index] not in exclude_these_residues:
-                cur_hydro_value = Protein.calc_mean_hydro(sequence[amino_acid_index])
-                if cur_hydro_value > worst_value:
-                    worst_value = cur_hydro_value
-                    value_coordinate = amino_acid_index
-
-    # if current hydropathy is too high, find amino acids
-    # to change that will raise it
-    elif current_hydro < final_hydropathy:
-        worst_value = 100
-        for amino_acid_index in range(3, len(sequence)):
-            if sequence[amino_acid_index] not in exclude_these_residues:
-                cur_hydro_value = float(Protein.calc_mean_hydro(sequence[amino_acid_index]))
-                if cur_hydro_value < float(worst_value):
-                    worst_value = cur_hydro_value
-                    value_coordinate = amino_acid_index
-
-    # just another check to make sure optimization does not occur if hydropatyh
-    # of the sequence is not greater than or less than the final_hydropathy
+        value_coordinate = max(first_positions, key=lambda value: (value[0], -value[1]))[1]
     else:
-        stop == True
+        value_coordinate = min(first_positions)[1]
 
-    # if optimization is not to be stopped..
-    if stop == False:
-        # if the value coordinate is 0, we won't be able to get an optimal residue.
-        # so we will have to simply return the sequence.
-        if value_coordinate == 0:
-            final_sequence = sequence
+    #figure out what residues need to be excluded
+    exclude_vals = all_excluded_residues_hydro(sequence=None,
+                objective_hydropathy=final_hydropathy, no_charge=True,
+                 input_exclusion=excluded_residues, current_hydropathy=current_hydro)
+    
+    # make sure all excluded_residues are in exclude_vals
+    for AA in excluded_residues:
+        if AA not in exclude_vals:
+            exclude_vals.append(AA)
 
-        else:
-            #figure out what residues need to be excluded
-            exclude_vals = all_excluded_residues_hydro(sequence=sequence,
-                        objective_hydropathy=final_hydropathy, no_charge=True,
-                         input_exclusion=excluded_residues)
-            
-            # make sure all excluded_residues are in exclude_vals
-            for AA in excluded_residues:
-                if AA not in exclude_vals:
-                    exclude_vals.append(AA)
+    #figure out what amino acids precede the worst value coordinate
+    optimal_key = ''.join(state.residues[value_coordinate-3:value_coordinate + 1])
+    
+    # get best residue based on the amino acid chosen to change and the 
+    # residues that are to be excluded
+    best_residue = get_optimal_residue(optimal_key, exclude_vals)
+    if best_residue == state.residues[value_coordinate]:
+        return False
 
-            #figure out what amino acids precede the worst value coordinate
-            optimal_key = sequence[int(value_coordinate-3):int(value_coordinate + 1)]
-            
-            # get best residue based on the amino acid chosen to change and the 
-            # residues that are to be excluded
-            best_residue = get_optimal_residue(optimal_key, exclude_vals)
-            
-            # put the sequence back together
-            seq_part1 = sequence[0:value_coordinate]
-
-            # if value coordinate is the very end of the sequence, there is
-            # nothing to add after the best_residue
-            if value_coordinate == len(sequence)-1:
-                seq_part_2 = ""
-            # figure out seq_part_2 such that it avoids the residue to be removed
-            else:
-                seq_part_2 = sequence[value_coordinate+1:]
+    state.substitute(value_coordinate, best_residue)
+    return True
 
-            # make the final sequence
-            final_sequence = seq_part1 + best_residue + seq_part_2
-    
-    # if stop == true, set the final sequence to the input sequence
-    else:
-        final_sequence = sequence
 
-    # return the final sequence
-    return final_sequence
 
+# hydropathy of each amino acid indexed by ASCII code
+_HYDROPATHY_CODES = np.zeros(256, dtype=np.float64)
+for _aa in AminoAcid.standard_amino_acids:
+    _HYDROPATHY_CODES[ord(_aa)] = AminoAcid.hydro(_aa)
+
+
+def mean_hydropathy_batch(encoded):
+    '''
+    returns Protein.calc_mean_hydro for each row of a 2-D uint8
+    array of ASCII codes (see disorder_lookup.encode_sequences).
+    The values are summed in order so they are the same floats.
+    '''
+    totals = np.cumsum(_HYDROPATHY_CODES[encoded], axis=1)[:, -1]
+    return [round(total / encoded.shape[1], 6) for total in totals.tolist()]
+
+
+# ASCII codes of the amino acids in the order used by the samplers
+_AMINO_ACID_CODES = np.frombuffer(''.join(AMINO_ACIDS).encode('ascii'), dtype=np.uint8)
+
+
+def compose_hydro_seq(length, mean_hydro, probabilities, allowed_error):
+    '''
+    Makes a sequence with a mean hydropathy within allowed_error of
+    mean_hydro in one go. The number of each amino acid is chosen first
+    (see goose.backend.hydropathy_sampler) and the residues are then
+    shuffled and put in a better order with optimize_sequence.
+
+    Parameters
+    ----------
+    length : Int
+        The length of the sequence
+
+    mean_hydro : Float
+        The mean hydropathy wanted for the sequence
+
+    probabilities : np.ndarray
+        The probability of each amino acid (in the order of
+        disorder_lookup.AMINO_ACIDS), e.g. from a weighted list
+
+    allowed_error : Float
+        The allowed error between the mean hydropathy and mean_hydro
+
+    Returns
+    -------
+    String or None
+        The sequence, or None if a composition with the
+        right hydropathy couldn't be made
+    '''
+    if length < 1:
+        return None
+    rng = numpy_rng()
+    counts = sample_hydropathy_counts(length, mean_hydro, probabilities, allowed_error, rng)
+    if counts is None:
+        return None
+    sequence = rng.permutation(np.repeat(_AMINO_ACID_CODES, counts)).tobytes().decode('ascii')
+    # same check as for sequences drawn from the weighted lists
+    current_hydropathy = round(mean_hydropathy_batch(encode_sequences(sequence))[0], 4)
+    if abs(mean_hydro - current_hydropathy) > allowed_error:
+        return None
+    # the lookup disorder values need at least 4 residues
+    if length >= 4:
+        sequence = optimize_sequence(sequence, iterations=parameters.HYDRO_SEQ_ORDER_ITERATIONS)
+    return sequence
 
 
 def hydro_seq(length, mean_hydro, just_neutral=False, allowed_error=None, return_best_seq = False, exclude_residues = []):
@@ -927,7 +1058,7 @@ def hydro_seq(length, mean_hydro, just_neutral=False, allowed_error=None, return
 
     """ 
 
-    #  Choose weighted list for seq generation
+    #  Choose residue probabilities for seq generation
     #--------------------------------------------#
     # if no customized allowed error, set to 0.05
     if allowed_error == None:
@@ -936,84 +1067,53 @@ def hydro_seq(length, mean_hydro, just_neutral=False, allowed_error=None, return
     # set best_error to stupidly high error
     best_error = 10000
 
-    #convert mean_hydro into a string.
-    rounded_value = str(round(mean_hydro, 1))
-    len_hydro = len(rounded_value)
-
-    # use value to get proper dict key for weighted list
-    if len_hydro > 1:
-        final_value = "{}_{}".format(rounded_value[0], rounded_value[2])
-    else:
-        final_value = "{}_0".format(rounded_value[0])
-    
-    #if mean hydro is any value greater than the max that I can make disordered (6.1).
-    if just_neutral == False:
-        if mean_hydro > 6.1:
-            used_list = lists.HydroDict['Hydro_dis_6_1']
-        else:
-            dict_key = "Hydro_dis_"+str(final_value)
-            used_list = lists.HydroDict[dict_key]
-    else:
-        '''
-        if just_neutral == True then could be input for 
-        generating specific hydro, fcr, ncpr sequence
-        '''
-
-        if mean_hydro > 9.0:
-            used_list = lists.NeutralHydroDict['Neutral_hydro_dis_9_0']
-        elif mean_hydro <= 1.0:
-            used_list = lists.NeutralHydroDict['Neutral_hydro_dis_1_0']
-        else:
-            dict_key = "Neutral_hydro_dis_"+str(final_value)
-            used_list = lists.NeutralHydroDict[dict_key]        
+    # get the residue probabilities for mean_hydro. These come from the weighted
+    # lists either side of mean_hydro (HydroDict, or NeutralHydroDict if 
+    # just_neutral == True, which could be input for generating specific 
+    # hydro, fcr, ncpr sequence) adjusted to be centred on mean_hydro. 
+    # Excluded residues are taken out. See goose.backend.hydropathy_sampler.
+    probabilities = hydropathy_distribution(mean_hydro, just_neutral=just_neutral, exclude_residues=exclude_residues)
+    if probabilities is None:
+        raise GooseInputError('The function hydro_seq in /backend/sequence_generation_backend.py is attempting to build a sequence with an empty list due to specified excluded residues.')
+    sampler = ResidueSampler(probabilities)
 
     #  Start attempts to build the sequence
     #--------------------------------------------#
-    # set correct hydro to false
-    correct_hydro = False
-    
     # keep track of iterations
     iters = 0
 
-    if exclude_residues != []:
-        excluded_list = []
-        for i in used_list:
-            if i not in exclude_residues:
-                excluded_list.append(i)
-        used_list = excluded_list
-        if used_list == []:
-            raise GooseInputError('The function hydro_seq in /backend/sequence_generation_backend.py is attempting to build a sequence with an empty list due to specified excluded residues.')
-
-    # while the correct hydro is false, try to generate sequence with correct hydro
-    while correct_hydro==False:
-        # make a sequence
-        current_sequence = gen_sequence(length, usedlist=used_list)
-        # figure out hydropathy
-        current_hydropathy = round(Protein.calc_mean_hydro(current_sequence), 4)
-        # figure out current error
-        cur_error = abs(mean_hydro - current_hydropathy)
-        # see if it matches mean_hydro within allowed_error
-        if cur_error <= allowed_error:
-            # set final sequence
-            final_sequence = current_sequence
-            # return the sequence
-            return final_sequence
-            # set correct_hydro to True
-            correct_hydro == True
-        else:
-            if cur_error < best_error:
-                best_error = cur_error
-                best_sequence = current_sequence
-
-        iters += 1
-
-        if iters == 30000:
-            if return_best_seq == True:
-                return best_sequence
+    # build a composition with the right hydropathy and put it in order using
+    # the lookup disorder values. Sequences are only drawn from the probabilities
+    # until one has the right hydropathy if that doesn't work.
+    composed_sequence = compose_hydro_seq(length, mean_hydro, probabilities, allowed_error)
+    if composed_sequence != None:
+        return composed_sequence
+
+    # the sequences are drawn in batches and checked in the order they were drawn
+    batch_size = parameters.HYDRO_SEQ_BATCH_SIZE
+    while iters < 30000:
+        # make a batch of sequences
+        candidates = sampler.sample_codes(min(batch_size, 30000-iters), length)
+        # figure out hydropathy of each sequence
+        candidate_hydropathy = mean_hydropathy_batch(candidates)
+        for candidate_num, candidate_hydro in enumerate(candidate_hydropathy):
+            current_hydropathy = round(candidate_hydro, 4)
+            # figure out current error
+            cur_error = abs(mean_hydro - current_hydropathy)
+            # see if it matches mean_hydro within allowed_error
+            if cur_error <= allowed_error:
+                # return the sequence
+                return candidates[candidate_num].tobytes().decode('ascii')
             else:
-                raise GooseError('Unable to generate sequence with correct hydropathy value.')
-                # set correct_hydro to True
-                correct_hydro == True
+                if cur_error < best_error:
+                    best_error = cur_error
+                    best_sequence = candidates[candidate_num].tobytes().decode('ascii')
+        iters += len(candidate_hydropathy)
+
+    if return_best_seq == True:
+        return best_sequence
+    else:
+        raise GooseError('Unable to generate sequence with correct hydropathy value.')
 
 
 def generate_charged_residues(length, FCR, objective_hydropathy):
@@ -1397,32 +1497,24 @@ def hydropathy_optimization(sequence, objective_hydropathy, allowed_error = para
         dumb reason named 'current_sequence'.
     '''
 
+    # the hydropathy is kept up to date as residues are changed
+    state = PropertyState(sequence)
     optimizer=0
-    current_sequence = sequence
-    # set number of possible optimizations to legnth * 3 to limit how long it does this.
+    # set number of possible optimizations to legnth * 2 to limit how long it does this.
     # objective is to just get the sequence reasonably close here.
     while optimizer < len(sequence)*2:
-        # try optimizing the sequence
-        non_optimized_seq = optimize_hydro(current_sequence, objective_hydropathy, use_charged_residues=False)
-        # if optimization did nothing, kill the loop
-        if non_optimized_seq == current_sequence:
-            current_sequence = non_optimized_seq
-            return current_sequence
-            optimizer = optimizer + length*40
-        # set sequence equal to non_optimized sequence for next optimization
-        current_sequence = non_optimized_seq
+        # try optimizing the sequence, if optimization did nothing, kill the loop
+        if optimize_hydro_state(state, objective_hydropathy, use_charged_residues=False) == False:
+            return state.sequence
         # add one to optimizer value
         optimizer = optimizer + 1
 
-        current_hydropathy = round(Protein.calc_mean_hydro(current_sequence), 4)
+        current_hydropathy = round(state.mean_hydropathy, 4)
         # see if it matches mean_hydro within allowed_error
         if abs(objective_hydropathy - current_hydropathy) <= allowed_error:
-            # set final sequence
-            final_sequence = current_sequence
             # return the sequence
-            return final_sequence
-            optimizer = optimizer + length*40
-    return current_sequence
+            return state.sequence
+    return state.sequence
 
 
 def replace_residues(sequence, residue, replacement):
@@ -1483,41 +1575,42 @@ def FCR_optimization(sequence, objective_hydropathy, allowed_error=parameters.HY
         returns the final sequence as a string
     '''
     
-    cur_hydro = Protein.calc_mean_hydro(sequence)
+    # the hydropathy is kept up to date as residues are replaced
+    state = PropertyState(sequence)
+    cur_hydro = state.mean_hydropathy
     if abs(objective_hydropathy-cur_hydro) > allowed_error:
-        new_sequence = sequence
         if cur_hydro > objective_hydropathy:
-            # replace D's with K
+            # replace D's with K (the first D each time)
             count_D = sequence.count('D')
             for i in range(0, count_D):
-                cur_hydro = Protein.calc_mean_hydro(new_sequence)
+                cur_hydro = state.mean_hydropathy
                 if cur_hydro > objective_hydropathy:
-                    new_sequence = replace_residues(new_sequence, 'D', 'K')
+                    state.substitute(state.positions['D'][0], 'K')
             # replace E's with K
             if cur_hydro > objective_hydropathy:
                 count_E = sequence.count('E')
                 for i in range(0, count_E):
-                    cur_hydro = Protein.calc_mean_hydro(new_sequence)
+                    cur_hydro = state.mean_hydropathy
                     if cur_hydro > objective_hydropathy:
-                        new_sequence = replace_residues(new_sequence, 'E', 'K')
+                        state.substitute(state.positions['E'][0], 'K')
                 # return the sequence after K_R optimizations
-                final_seq = K_R_optimization(new_sequence, objective_hydropathy)
+                final_seq = K_R_optimization(state.sequence, objective_hydropathy)
         else:
             # replace K's with D
             count_K = sequence.count('K')
             for i in range(0, count_K):
-                cur_hydro = Protein.calc_mean_hydro(new_sequence)
+                cur_hydro = state.mean_hydropathy
                 if cur_hydro < objective_hydropathy:
-                    new_sequence = replace_residues(new_sequence, 'K', 'D')
+                    state.substitute(state.positions['K'][0], 'D')
             # replace R's with E
             if cur_hydro < objective_hydropathy:
                 count_R = sequence.count('R')
                 for i in range(0, count_R):
-                    cur_hydro = Protein.calc_mean_hydro(new_sequence)
+                    cur_hydro = state.mean_hydropathy
                     if cur_hydro > objective_hydropathy:
-                        new_sequence = replace_residues(new_sequence, 'R', 'E')
+                        state.substitute(state.positions['R'][0], 'E')
             # return the sequence after K_R optimizations
-            final_seq = K_R_optimization(new_sequence, objective_hydropathy)
+            final_seq = K_R_optimization(state.sequence, objective_hydropathy)
     else:
         final_seq = sequence
     return final_seq   
@@ -1525,7 +1618,8 @@ def FCR_optimization(sequence, objective_hydropathy, allowed_error=parameters.HY
 
 
 
-def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1, allowed_hydro_error = parameters.HYDRO_ERROR, exclude = []):
+def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1, allowed_hydro_error = parameters.HYDRO_ERROR, exclude = [],
+    predicted_residues=False):
 
     '''
     Function that allows the user to generate a sequence with specific
@@ -1561,6 +1655,15 @@ def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1
         A list of residues that are not allowed to be used in the generation
         the specific sequecne
 
+    predicted_residues : Bool
+        If True, residues that are chosen for disorder (everything but 
+        the charged residues in the charge based sequences) are picked by 
+        predicting the disorder of every possible next residue 
+        (get_predicted_optimal_residue) instead of using the lookup 
+        table (get_optimal_residue). Much slower, mostly useful when the
+        lookup table does poorly for a specific set of excluded residues.
+        Not used for sequences with a specified hydropathy. Default is False.
+
 
     Returns
     -------
@@ -1570,13 +1673,20 @@ def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1
         NOT GAURANTEED TO BE DISORDERED!
     '''
 
+    # figure out how residues are chosen and how much of the
+    # sequence is needed to choose them
+    if predicted_residues == True:
+        choose_residue = get_predicted_optimal_residue
+        context_length = parameters.NEXT_RESIDUE_CONTEXT
+    else:
+        choose_residue = get_optimal_residue
+        context_length = 4
+
     for num_attempts in range(0, attempts):
 
         # make an empty string to hold 4 amino acids that are 'starter'
         # amino acids for the get_optimal_residue function.
-        seq = ''
-        for i in range(0, 4):
-            seq += random_amino_acid(lists.disordered_list)
+        seq = list_sampler('disordered_list').sample(4)
 
         # empty string to hold amino acids for the final sequence
         final_seq = ''
@@ -1587,12 +1697,12 @@ def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1
             for i in range(0, length):
                 if len(final_seq) < 4:
                     cur_input = seq[len(seq)-4:]
-                    residue = get_optimal_residue(cur_input, exclude_residues = exclude)
+                    residue = choose_residue(cur_input, exclude_residues = exclude)
                     final_seq += residue
                     seq += residue
                 else:
-                    cur_input = final_seq[len(final_seq)-4:]
-                    residue = get_optimal_residue(cur_input, exclude_residues = exclude)
+                    cur_input = final_seq[len(final_seq)-context_length:]
+                    residue = choose_residue(cur_input, exclude_residues = exclude)
                     final_seq += residue
             return final_seq
 
@@ -1626,12 +1736,12 @@ def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1
                 if i not in charged_positions:                
                     if len(final_seq) < 4:
                         cur_input = seq[len(seq)-4:]
-                        residue = get_optimal_residue(cur_input, exclude_residues = final_exclusion)
+                        residue = choose_residue(cur_input, exclude_residues = final_exclusion)
                         final_seq += residue
                         seq += residue
                     else:
-                        cur_input = final_seq[len(final_seq)-4:]
-                        residue = get_optimal_residue(cur_input, exclude_residues = final_exclusion)
+                        cur_input = final_seq[len(final_seq)-context_length:]
+                        residue = choose_residue(cur_input, exclude_residues = final_exclusion)
                         final_seq += residue
                 else:
                     residue = random_amino_acid(lists.charged_list)
@@ -1701,12 +1811,12 @@ def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1
                 if i not in charged_positions:                
                     if len(final_seq) < 4:
                         cur_input = seq[len(seq)-4:]
-                        residue = get_optimal_residue(cur_input, exclude_residues = final_exclusion)
+                        residue = choose_residue(cur_input, exclude_residues = final_exclusion)
                         final_seq += residue
                         seq += residue
                     else:
-                        cur_input = final_seq[len(final_seq)-4:]
-                        residue = get_optimal_residue(cur_input, exclude_residues = final_exclusion)
+                        cur_input = final_seq[len(final_seq)-context_length:]
+                        residue = choose_residue(cur_input, exclude_residues = final_exclusion)
                         final_seq += residue
                 else:
                     residue = charged_residue_list.pop()
@@ -1763,12 +1873,12 @@ def create_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None, attempts=1
                 if i not in charged_positions:                
                     if len(final_seq) < 4:
                         cur_input = seq[len(seq)-4:]
-                        residue = get_optimal_residue(cur_input, exclude_residues = final_exclusion)
+                        residue = choose_residue(cur_input, exclude_residues = final_exclusion)
                         final_seq += residue
                         seq += residue
                     else:
-                        cur_input = final_seq[len(final_seq)-4:]
-                        residue = get_optimal_residue(cur_input, exclude_residues = final_exclusion)
+                        cur_input = final_seq[len(final_seq)-context_length:]
+                        residue = choose_residue(cur_input, exclude_residues = final_exclusion)
                         final_seq += residue
                 else:
                     residue = charged_residue_list.pop()
@@ -2163,28 +2273,25 @@ def test_seq_by_props(length, FCR=None, NCPR=None, hydropathy=None):
 #/-/-/-/-/-/-/-/-/-/-/- Amino acid Fractions /-/-/-/-/-/-/-/-/-/-/-/-/-
 #/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-/-
 
-def create_seq_by_fracs(length, **kwargs):
+def fraction_residues(length, fractions):
     """
-    This will return a sequence with the specified fraction of
-    amino acids. To use simply specify the amino acid followed by
-    the fraction you want as a decimal.
-    
+    Works out the residues needed in a sequence of a given length 
+    for create_seq_by_fracs and checks the fractions are possible.
+
     Parameters
     ------------
     length : Int
         length of desired disordered sequence
 
-    **kargs : Variable, float
-        The desired amino acid as a variable (no need for quotations).     
-        The fraction of amino acids as a float followed immediately by
-        
+    fractions : Dict
+        amino acid : fraction of the sequence as a decimal
 
     Returns
     -----------
-    String
-       A string of the amino acid sequence
+    Tuple
+        (list of the specified residues, list of the amino acids specified,
+        total fraction specified)
     """
-
     # dict holding the max fractions that each amino acid can be individually specified as
     max_fraction = {"A": parameters.MAX_FRACTION_A,
     "A": parameters.MAX_FRACTION_A,
@@ -2216,38 +2323,32 @@ def create_seq_by_fracs(length, **kwargs):
     #           Checks on input parameters
     #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#
     # make sure no fractions specified as greater than they can be generated as in testing
-    for amino in kwargs.keys():
-        if kwargs[amino] > max_fraction[amino]:
-            exception_value = f'Specified fraction for {amino} of {kwargs[amino]} is greater than max allowed fraction for {amino} of {max_fraction[amino]}!'
+    for amino in fractions.keys():
+        if fractions[amino] > max_fraction[amino]:
+            exception_value = f'Specified fraction for {amino} of {fractions[amino]} is greater than max allowed fraction for {amino} of {max_fraction[amino]}!'
             raise GooseInputError(exception_value)
 
-    total_fraction = sum(kwargs.values())
+    total_fraction = sum(fractions.values())
     if total_fraction > 1:
         raise GooseInputError('Cannot specify a total fraction of residues greater than 1!')
 
 
-    #  Start attempts to build the sequence
+    #  Build the list of specified residues
     #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#
 
-    # make empty final sequence
-    final_sequence = ""
-
     sequence_list=[]
 
     used_AAs = []
 
-    # some things won't be possible based on the FCR specified and the resultant hydropathy.
-    checked_hydro_is_possible = False
-
     # for each amino acid for which we passed fractional information...
-    for cur_AA in kwargs.keys():
+    for cur_AA in fractions.keys():
 
         # keep track of residues can't use down the line.
         used_AAs.append(cur_AA)
 
         # res_count is the actual number of cur_AA expected in a sequence
         # of $length residues with $cur_frac fraction
-        res_count = int(kwargs[cur_AA]*length)
+        res_count = int(fractions[cur_AA]*length)
 
         # generate a list of the right number copies of the current
         # amino acid
@@ -2257,6 +2358,37 @@ def create_seq_by_fracs(length, **kwargs):
         # residues
         sequence_list.extend(AA_homopolymer)
 
+    return sequence_list, used_AAs, total_fraction
+
+
+
+def create_seq_by_fracs(length, **kwargs):
+    """
+    This will return a sequence with the specified fraction of
+    amino acids. To use simply specify the amino acid followed by
+    the fraction you want as a decimal.
+    
+    Parameters
+    ------------
+    length : Int
+        length of desired disordered sequence
+
+    **kargs : Variable, float
+        The desired amino acid as a variable (no need for quotations).     
+        The fraction of amino acids as a float followed immediately by
+        
+
+    Returns
+    -----------
+    String
+       A string of the amino acid sequence
+    """
+
+    # work out the residues needed for the specified fractions
+    sequence_list, used_AAs, total_fraction = fraction_residues(length, kwargs)
+
+    #  Start attempts to build the sequence
+    #=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#=-=#
 
     # shuffle here so no risk of introducing bias based on order in which
     # residues are introduced
@@ -2279,9 +2411,7 @@ def create_seq_by_fracs(length, **kwargs):
 
         # build a disordered starter sequence which we'll use to help us select 
         # randomly generated disordered residues 
-        starter_seq = ''
-        for i in range(0, 4):
-            starter_seq += random_amino_acid(lists.disordered_list)
+        starter_seq = list_sampler('disordered_list').sample(4)
 
         # create a copy of sequence_list. 
         local_sequence_list = sequence_list.copy()
@@ -2334,3 +2464,86 @@ def create_seq_by_fracs(length, **kwargs):
 
 
 
+
+
+
+def create_seqs_by_length_batch(length, num_sequences, exclude=[], as_strings=True):
+    """
+    Makes many sequences at once the same way create_seq_by_props
+    makes a sequence when only the length is specified (growing each
+    sequence with get_optimal_residue), see goose.backend.markov_sampler.
+    Uses the lookup table set with set_optimal_residue_table.
+
+    Parameters
+    ------------
+    length : Int
+        length of the sequences
+
+    num_sequences : Int
+        number of sequences to make
+
+    exclude : List
+        residues that can't be used
+
+    as_strings : Bool
+        whether to return a list of strings rather than a uint8 array
+        of ASCII codes with one row per sequence
+
+    Returns
+    -----------
+    List or np.ndarray
+       The sequences
+    """
+    return sample_chains(num_sequences, length, exclude_residues=exclude, as_strings=as_strings, table=_optimal_residue_table)
+
+
+
+def create_seqs_by_fracs_batch(length, num_sequences, as_strings=True, **kwargs):
+    """
+    Makes many sequences at once the same way as create_seq_by_fracs. 
+    The specified residues are shuffled separately for each sequence and
+    the remaining positions are filled in for all of the sequences together
+    (see goose.backend.markov_sampler). Uses the lookup table set with 
+    set_optimal_residue_table.
+
+    Parameters
+    ------------
+    length : Int
+        length of the sequences
+
+    num_sequences : Int
+        number of sequences to make
+
+    as_strings : Bool
+        whether to return a list of strings rather than a uint8 array
+        of ASCII codes with one row per sequence
+
+    **kargs : Variable, float
+        The desired amino acid as a variable followed by the fraction
+        of amino acids as a float, as for create_seq_by_fracs
+
+    Returns
+    -----------
+    List or np.ndarray
+       The sequences
+    """
+    # work out the residues needed for the specified fractions
+    sequence_list, used_AAs, total_fraction = fraction_residues(length, kwargs)
+
+    # the specified residues plus '0' for each position to fill in, 
+    # shuffled separately for each sequence
+    if total_fraction != 1:
+        sequence_list = sequence_list + ['0']*(length - len(sequence_list))
+    rng = numpy_rng()
+    layout = np.frombuffer(''.join(sequence_list).encode('ascii'), dtype=np.uint8)
+    layouts = rng.permuted(np.tile(layout, (num_sequences, 1)), axis=1)
+
+    # if all the residues are accounted for the shuffled residues are the sequences
+    if total_fraction == 1:
+        sequences = layouts
+    else:
+        sequences = sample_chains(num_sequences, length, exclude_residues=used_AAs, fixed=layouts, rng=rng, table=_optimal_residue_table)
+
+    if as_strings == True:
+        return decode_sequences(sequences)
+    return sequences
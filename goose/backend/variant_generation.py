@@ -9,12 +9,14 @@ from goose.backend.protein import Protein
 from goose.goose_exceptions import GooseError, GooseInputError, GooseFail, GooseException
 from goose.backend.variant_generation_backend import create_kappa_variant, create_shuffle_variant, create_constant_residue_variant, create_hydropathy_class_variant, create_new_variant, create_constant_class_variant, create_new_var_constant_class_nums
 
-import metapredict as meta
+from goose.backend.disorder_prefilter import passes_prefilter
+from goose.backend.disorder_rules import variant_disorder_batch, sequence_variant_disorder_batch
+from goose.backend.predict_disorder import predict_disorder, predict_disorder_incremental
 
 import random
 
 
-def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff_val=parameters.DISORDER_THRESHOLD, strict=False):
+def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff_val=parameters.DISORDER_THRESHOLD, strict=False, backend=None, prefilter=None):
     """
     Function for determining if a sequence variant is disordered. The
     purpose of this over the typical check_disorder function for generated
@@ -45,6 +47,16 @@ def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff_v
         if set to true, will not count a sequence as disordered even if a single amino
         acid falls below the cutoff value.
 
+    backend : None, string, or DisorderBackend
+        The disorder predictor to use for the variant. None uses the
+        default predictor. Should be the same predictor that was used
+        for original_disorder_list.
+
+    prefilter : None, bool, or float
+        If set, the variant is rejected without predicting its disorder
+        if its lookup table disorder score is below the prefilter threshold.
+        See goose.backend.disorder_prefilter. Default is None (no prefilter).
+
     Returns
     ---------
 
@@ -56,80 +68,21 @@ def sequence_variant_disorder(current_sequence, original_disorder_list, cutoff_v
 
     """
 
-    # first get the list of disordered residues for the current sequence
-    variant_disorder_list = meta.predict_disorder(current_sequence)
-
-    # first make a 'modified' disorder value list so that
-    # residues can go below cutoff.
-    adjusted_disorder_values = []
-
-    # for the disorder values in the disorder list
-    for disorder_vals in range(0, len(variant_disorder_list)):
-
-        # get the original disorder value at the current position
-        input_disorder = original_disorder_list[disorder_vals]
-        
-        # if the input disorder value is greater than the specified cutoff value
-        if input_disorder > cutoff_val:
-            # reduce the necessary input disorder value to the cutoff value
-            input_disorder = cutoff_val
-
-        # otherwise, the input disorder value is simply equal to the disorder
-        # value for the original sequence residue at the current position
-        else:
-            input_disorder = input_disorder
-
-        adjusted_disorder_values.append(input_disorder)
-
-    # keep track of consecutively ordered residues and total ordered
-    cur_order_streak = 0
-    total_ordered_residues = 0
-
-    # allow up to 5 % of residues to be 'ordered' provided they aren't consecutive
-    allowed_order_residues = round(0.05*len(current_sequence))
-    if allowed_order_residues < 1:
-        allowed_order_residues = 1
-
-    # calculate number of conseuctively allowed residues
-    # going to allow up to the length of the sequence over 25 but 
-    # not greater than 10
-    consec_allowed = round(len(current_sequence)/25)
-    if consec_allowed < 1:
-        consec_allowed = 1
-    if consec_allowed > 10:
-        consec_allowed = 10
-
-    for disorder_val in range(0, len(adjusted_disorder_values)):
-        # get current values for the original and the variant
-        variant_disorder = variant_disorder_list[disorder_val]
-        original_disorder = adjusted_disorder_values[disorder_val]
-
-        # see if strict set to true
-        if strict == True:
-            if variant_disorder < original_disorder:
-                return False
-        else:
-            if variant_disorder < original_disorder:
-                cur_order_streak += 1
-                total_ordered_residues += 1
-            else:
-                cur_order_streak = 0
-            # check to see if order streak is too high
-            # or total num ordered residues too high
-            if cur_order_streak > consec_allowed:
-                return False
-            if total_ordered_residues > allowed_order_residues:
-                return False
-
-    # if all residues in the sequence variant are greater than either
-    # the original value or at least the cutoff value, return True
-    return True
+    # reject hopeless variants before predicting disorder
+    if passes_prefilter(current_sequence, prefilter) == False:
+        return False
 
+    # first get the list of disordered residues for the current sequence
+    variant_disorder_list = predict_disorder(current_sequence, backend=backend)
 
+    # residues can go below the cutoff as long as they are at least as 
+    # disordered as the original. The rules are applied by 
+    # variant_disorder_batch (see goose.backend.disorder_rules)
+    return bool(variant_disorder_batch([variant_disorder_list], original_disorder_list, cutoff_val, strict=strict)[0])
 
 
 
-def optimize_disorder_within_class_once(sequence):
+def optimize_disorder_within_class_once(sequence, disorder=None):
     '''
     function to move around residues within a sequence
     within individual classes to maximize disorder in variants 
@@ -140,6 +93,10 @@ def optimize_disorder_within_class_once(sequence):
     sequence : string
         the amino acid sequence as a string
 
+    disorder : list
+        the disorder profile of the sequence if it is already
+        known. If None, the disorder is predicted.
+
     returns 
     --------
     rebuilt_sequence : string
@@ -154,7 +111,8 @@ def optimize_disorder_within_class_once(sequence):
     negative = ['D', 'E']
 
     # get disorder
-    disorder = meta.predict_disorder(sequence)
+    if disorder is None:
+        disorder = predict_disorder(sequence)
     
     # lowest val for disorder
     lowest_val = min(disorder)
@@ -249,7 +207,7 @@ def optimize_disorder_within_class_once(sequence):
     return rebuilt_sequence
 
 
-def optimize_disorder_within_class(sequence, num_iterations=500):
+def optimize_disorder_within_class(sequence, num_iterations=500, window=None):
     '''
     function that uses optimize_disorder_within_class
     but follows multiple iterations to try to get a better
@@ -265,12 +223,21 @@ def optimize_disorder_within_class(sequence, num_iterations=500):
     num_iterations : int
         the number of times to run the optimizer.
 
+    window : int
+        if set, after each swap only window residues on either side of
+        the swapped residues are re-predicted and spliced into the 
+        disorder profile (see predict_disorder_incremental) rather 
+        than predicting the whole sequence again. 
+
     returns
     -------
     rebuilt_sequence : string
         returns the rebuilt (optimized) sequence as a string
 
     '''
+    if window != None:
+        return _optimize_disorder_incrementally(sequence, optimize_disorder_within_class_once, num_iterations, window)
+
     # make an optimized seq before puting it in for iterations
     opt_seq = optimize_disorder_within_class_once(sequence)
     for i in range(0, num_iterations):
@@ -280,7 +247,24 @@ def optimize_disorder_within_class(sequence, num_iterations=500):
 
 
 
-def optimize_disorder_once_constant_residues(sequence, constant_residues = []):
+def _optimize_disorder_incrementally(sequence, optimize_once, num_iterations, window, **kwargs):
+    '''
+    runs optimize_once num_iterations + 1 times carrying the disorder
+    profile along with windowed rescoring instead of predicting
+    every intermediate sequence in full.
+    '''
+    disorder = predict_disorder(sequence)
+    opt_seq = sequence
+    for i in range(0, num_iterations+1):
+        new_seq = optimize_once(opt_seq, disorder=disorder, **kwargs)
+        if new_seq != opt_seq:
+            disorder = predict_disorder_incremental(new_seq, opt_seq, disorder, window=window)
+        opt_seq = new_seq
+    return opt_seq
+
+
+
+def optimize_disorder_once_constant_residues(sequence, constant_residues = [], disorder=None):
     '''
     function to move around residues within a sequence
     while keeping desired constant residues.. well, constant.
@@ -293,6 +277,10 @@ def optimize_disorder_once_constant_residues(sequence, constant_residues = []):
     constant_residues : list
         the list of residues that you want to be held constant
         in the input sequence
+
+    disorder : list
+        the disorder profile of the sequence if it is already
+        known. If None, the disorder is predicted.
     '''
 
     # forbidden positions for changes. forbidden_positions ... probably
@@ -302,7 +290,8 @@ def optimize_disorder_once_constant_residues(sequence, constant_residues = []):
         forbidden_positions.extend(identify_residue_positions(sequence, i))
 
     # get disorder
-    disorder = meta.predict_disorder(sequence)
+    if disorder is None:
+        disorder = predict_disorder(sequence)
     
     # lowest val for disorder
     lowest_val = min(disorder)
@@ -371,7 +360,7 @@ def optimize_disorder_once_constant_residues(sequence, constant_residues = []):
 
 
 
-def optimize_disorder_constant_residues(sequence, constant_residues=[], num_iterations=500):
+def optimize_disorder_constant_residues(sequence, constant_residues=[], num_iterations=500, window=None):
     '''
     function that uses optimize_disorder_within_class
     but follows multiple iterations to try to get a better
@@ -387,6 +376,11 @@ def optimize_disorder_constant_residues(sequence, constant_residues=[], num_iter
     num_iterations : int
         the number of times to run the optimizer.
 
+    window : int
+        if set, swaps are rescored by re-predicting only window
+        residues on either side of the swapped residues. 
+        See optimize_disorder_within_class.
+
     returns
     -------
     rebuilt_sequence : string
@@ -394,6 +388,10 @@ def optimize_disorder_constant_residues(sequence, constant_residues=[], num_iter
 
     '''
 
+    if window != None:
+        return _optimize_disorder_incrementally(sequence, optimize_disorder_once_constant_residues, 
+            num_iterations, window, constant_residues=constant_residues)
+
     # optimize the sequence once
     opt_seq = optimize_disorder_once_constant_residues(sequence, constant_residues=constant_residues)
     # now go through and continue optimizations
@@ -436,7 +434,7 @@ def gen_new_var_constant_class(sequence, attempts=5,
         returns a disordered sequence as a string
     '''
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_new_var_constant_class_nums(sequence)
@@ -485,7 +483,7 @@ def gen_constant_class_variant(sequence, attempts=5,
     '''
 
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_constant_class_variant(sequence)
@@ -533,7 +531,7 @@ def gen_new_variant(sequence, attempts=5,
     '''
 
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_new_variant(sequence)
@@ -584,7 +582,7 @@ def gen_hydropathy_class_variant(sequence, hydropathy, allowed_hydro_error = par
     '''
 
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_hydropathy_class_variant(sequence, hydro=hydropathy, 
@@ -637,7 +635,7 @@ def gen_constant_residue_variant(sequence, constant_residues = [],
     '''
 
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_constant_residue_variant(sequence, 
@@ -699,7 +697,7 @@ def gen_shuffle_variant(sequence, shuffle_regions = [], use_index=False,
     '''
 
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_shuffle_variant(sequence, 
@@ -751,7 +749,7 @@ def gen_kappa_variant(sequence, kappa, allowed_kappa_error = parameters.MAXIMUM_
     '''
 
     # get original sequence disorder
-    starting_disorder = meta.predict_disorder(sequence)
+    starting_disorder = predict_disorder(sequence)
 
     for attempt_num in range(0, attempts):
         disordered_seq = create_kappa_variant(sequence, kappa=kappa, 
@@ -7,16 +7,23 @@ from random import randint
 from goose.goose_exceptions import GooseInputError, GooseInstallError, GooseBackendBug
 from goose.backend.protein import Protein
 from goose.backend.sequence_generation_backend import identify_residue_positions, get_optimal_residue, optimal_residue_key, random_amino_acid, create_seq_by_props, fast_predict_disorder
-from goose.backend import lists
+from goose.backend.residue_sampler import list_sampler
 from goose.backend.amino_acids import AminoAcid
+from goose.backend.optimizer_state import PropertyState
 from goose.backend import parameters
 
 
-# will update when sparrow is on pip
-try:
-    from sparrow import Protein as pr
-except:
-    raise GooseInstallError('\nSparrow is not installed. Please install Sparrow using : \n pip install git+https://github.com/holehouse-lab/sparrow.git ')
+def pr(sequence):
+    '''
+    returns a sparrow Protein. sparrow is slow to import, so it is
+    only imported the first time it is needed.
+    '''
+    # will update when sparrow is on pip
+    try:
+        from sparrow import Protein
+    except:
+        raise GooseInstallError('\nSparrow is not installed. Please install Sparrow using : \n pip install git+https://github.com/holehouse-lab/sparrow.git ')
+    return Protein(sequence)
 
 
 def return_num_for_class(sequence):
@@ -129,9 +136,7 @@ def get_optimal_res_within_class(residue_class, sequence, additional_exclusion=[
             four_residues = sequence[len(sequence)-4:]
         else:
             needed_residues = 4-len(sequence)
-            four_residues = ''
-            for i in range(0, needed_residues):
-                four_residues += random_amino_acid(lists.disordered_list)
+            four_residues = list_sampler('disordered_list').sample(needed_residues)
             four_residues += sequence
 
         # classes of AAs
@@ -300,23 +305,30 @@ def residue_optimize_hydropathy_within_class(sequence, objective_hydropathy, tar
 
     '''
 
-    # define which residues in each class
-    aromatics = ['F', 'W', 'Y']
-    polar = ['Q', 'N', 'S', 'T']
-    hydrophobics = ['I', 'V', 'L', 'A', 'M']
-    positive = ['K', 'R']
+    # get starting hydropathy
+    starting_hydro = Protein.calc_mean_hydro(sequence)
+
+    # only the target residue changes
+    if target_residue_index not in range(0, len(sequence)):
+        return sequence
+    best_residue = _best_residue_within_class(sequence[target_residue_index], starting_hydro, objective_hydropathy, len(sequence))
+    return sequence[:target_residue_index] + best_residue + sequence[target_residue_index+1:]
+
 
+def _best_residue_within_class(cur_aa, starting_hydro, objective_hydropathy, length):
+    '''
+    returns the residue in the same class as cur_aa that 
+    residue_optimize_hydropathy_within_class puts in its place for a
+    sequence of length residues with hydropathy starting_hydro.
+    '''
     # make an aa class dict
     aa_class_dict = {'aromatic' : ['F', 'W', 'Y'], 'polar' : ['Q', 'N', 'S', 'T'], 'positive' : ['K', 'R'], 'negative' : ['D', 'E'], 'hydrophobic' : ['I', 'V', 'L', 'A', 'M']}
 
     #residues that can't be changed or are useless to change
     dont_change = ['D', 'E', 'G', 'P', 'H', 'C']
 
-    # empty string to hold built sequence
-    build_sequence = ''
-
-    # get starting hydropathy
-    starting_hydro = Protein.calc_mean_hydro(sequence)
+    if cur_aa in dont_change:
+        return cur_aa
 
     # decide whether to increase or decrease hydropathy
     if starting_hydro > objective_hydropathy:
@@ -325,50 +337,29 @@ def residue_optimize_hydropathy_within_class(sequence, objective_hydropathy, tar
         change_hydro = 'increase_hydropathy'
 
     # figure out the ideal difference between the residues to change.
-    total_hydro = starting_hydro * len(sequence)
-    total_objective_hydro = objective_hydropathy * len(sequence)
+    total_hydro = starting_hydro * length
+    total_objective_hydro = objective_hydropathy * length
     ideal_residue_difference = abs(total_hydro - total_objective_hydro)
 
-    # iterate through sequence
-    for cur_aa_num in range(0, len(sequence)):
-        cur_aa = sequence[cur_aa_num]
-        if cur_aa_num != target_residue_index:
-            best_residue = cur_aa
-        else:
-            if cur_aa in dont_change:
-                best_residue = cur_aa
-            else:
-                amino_acid_class = AminoAcid.return_AA_class(cur_aa)
-                cur_AA_hydro = AminoAcid.hydro(cur_aa)
-                if change_hydro == 'decrease_hydropathy':
-
-                    amino_acid_class = AminoAcid.return_AA_class(cur_aa)
-                    best_hydropathy = cur_AA_hydro
-                    best_residue = cur_aa
-                    best_difference = abs(ideal_residue_difference - cur_AA_hydro)
-
-                    for possible_residues in aa_class_dict[amino_acid_class]:
-                        cur_poss_hydro = AminoAcid.hydro(possible_residues)
-                        if cur_poss_hydro < cur_AA_hydro:
-                            if abs(ideal_residue_difference - cur_poss_hydro) >= best_difference:
-                                best_residue = possible_residues
-                                best_hydropathy = cur_poss_hydro
-                                best_difference = abs(ideal_residue_difference - cur_poss_hydro)
-                else:
-                    amino_acid_class = AminoAcid.return_AA_class(cur_aa)
-                    best_hydropathy = cur_AA_hydro
-                    best_residue = cur_aa
-                    best_difference = abs(ideal_residue_difference - cur_AA_hydro)
-                    for possible_residues in aa_class_dict[amino_acid_class]:
-                        cur_poss_hydro = AminoAcid.hydro(possible_residues)
-                        if cur_poss_hydro > cur_AA_hydro:
-                            if abs(ideal_residue_difference - cur_poss_hydro) <= best_difference:
-                                best_residue = possible_residues
-                                best_hydropathy = cur_poss_hydro
-                                best_difference = abs(ideal_residue_difference - cur_poss_hydro)                       
-        build_sequence += best_residue
-    # return the sequence
-    return build_sequence  
+    amino_acid_class = AminoAcid.return_AA_class(cur_aa)
+    cur_AA_hydro = AminoAcid.hydro(cur_aa)
+    best_residue = cur_aa
+    best_difference = abs(ideal_residue_difference - cur_AA_hydro)
+    if change_hydro == 'decrease_hydropathy':
+        for possible_residues in aa_class_dict[amino_acid_class]:
+            cur_poss_hydro = AminoAcid.hydro(possible_residues)
+            if cur_poss_hydro < cur_AA_hydro:
+                if abs(ideal_residue_difference - cur_poss_hydro) >= best_difference:
+                    best_residue = possible_residues
+                    best_difference = abs(ideal_residue_difference - cur_poss_hydro)
+    else:
+        for possible_residues in aa_class_dict[amino_acid_class]:
+            cur_poss_hydro = AminoAcid.hydro(possible_residues)
+            if cur_poss_hydro > cur_AA_hydro:
+                if abs(ideal_residue_difference - cur_poss_hydro) <= best_difference:
+                    best_residue = possible_residues
+                    best_difference = abs(ideal_residue_difference - cur_poss_hydro)
+    return best_residue
 
 
 def optimize_hydropathy_within_class(sequence, objective_hydropathy, allowed_hydro_error = parameters.HYDRO_ERROR):
@@ -402,15 +393,16 @@ def optimize_hydropathy_within_class(sequence, objective_hydropathy, allowed_hyd
         error_message = (f'\n\nUnable to get to objective hydropathy without changing classes of residues.\nFor this sequence the lowest possible hydrpathy is {possible_hydro_range[0]}.\nFor this sequence the highest possible hydropathy is {possible_hydro_range[1]}.\n')
         raise GooseInputError(error_message)
     else:
+        # the hydropathy is kept up to date as residues are changed
+        state = PropertyState(sequence)
         # iterate over every residue in the sequence as necessary
         for amino_acid in range(0, len(sequence)):
-            new_sequence = residue_optimize_hydropathy_within_class(sequence, objective_hydropathy, amino_acid)
-            cur_hydro = Protein.calc_mean_hydro(new_sequence)
-            if abs(cur_hydro - objective_hydropathy) <= allowed_hydro_error:
-                return new_sequence
-            sequence = new_sequence
+            best_residue = _best_residue_within_class(state.residues[amino_acid], state.mean_hydropathy, objective_hydropathy, len(sequence))
+            state.substitute(amino_acid, best_residue)
+            if abs(state.mean_hydropathy - objective_hydropathy) <= allowed_hydro_error:
+                return state.sequence
     # if iterations didn't get within the ideal value, return the sequence
-    return new_sequence
+    return state.sequence
 
 
 
@@ -0,0 +1,17 @@
+"""
+Shared fixtures for the GOOSE tests.
+"""
+import pytest
+
+from goose.backend import predict_disorder as pd
+
+
+@pytest.fixture
+def disorder_cache():
+    """An empty process-wide disorder cache that holds 100 profiles."""
+    settings = pd.disorder_cache_info()
+    pd.clear_disorder_cache()
+    pd.set_disorder_cache(maxsize=100, eviction='lru')
+    yield
+    pd.clear_disorder_cache()
+    pd.set_disorder_cache(maxsize=settings['maxsize'], eviction=settings['eviction'])
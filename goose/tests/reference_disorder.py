@@ -0,0 +1,72 @@
+"""
+Reference versions of the disorder rules, the residue by residue loops
+check_disorder and sequence_variant_disorder used before the rules were
+moved to goose.backend.disorder_rules. The tests check that the
+vectorized rules give the same answers.
+"""
+
+
+def _allowances(sequence_length):
+    allowed_order_residues = round(0.05*sequence_length)
+    if allowed_order_residues < 1:
+        allowed_order_residues = 1
+    consec_allowed = round(sequence_length/25)
+    if consec_allowed < 1:
+        consec_allowed = 1
+    if consec_allowed > 10:
+        consec_allowed = 10
+    return allowed_order_residues, consec_allowed
+
+
+def evaluate_disorder(sequence_length, sequence_disorder, disorder_threshold, strict=False):
+    min_disorder = min(sequence_disorder)
+    if min_disorder >= disorder_threshold:
+        return True
+    elif min_disorder < 0.25:
+        return False
+    else:
+        if strict==True:
+            return False
+        else:
+            cur_order_streak = 0
+            total_ordered_residues = 0
+            allowed_order_residues, consec_allowed = _allowances(sequence_length)
+            for residue in sequence_disorder:
+                if residue < disorder_threshold:
+                    cur_order_streak += 1
+                    total_ordered_residues += 1
+                else:
+                    cur_order_streak = 0
+                if cur_order_streak > consec_allowed or total_ordered_residues > allowed_order_residues:
+                    return False
+    return True
+
+
+def variant_disorder(variant_disorder_list, original_disorder_list, cutoff_val, strict=False):
+    adjusted_disorder_values = []
+    for disorder_vals in range(0, len(variant_disorder_list)):
+        input_disorder = original_disorder_list[disorder_vals]
+        if input_disorder > cutoff_val:
+            input_disorder = cutoff_val
+        adjusted_disorder_values.append(input_disorder)
+
+    cur_order_streak = 0
+    total_ordered_residues = 0
+    allowed_order_residues, consec_allowed = _allowances(len(variant_disorder_list))
+    for disorder_val in range(0, len(adjusted_disorder_values)):
+        variant_disorder = variant_disorder_list[disorder_val]
+        original_disorder = adjusted_disorder_values[disorder_val]
+        if strict == True:
+            if variant_disorder < original_disorder:
+                return False
+        else:
+            if variant_disorder < original_disorder:
+                cur_order_streak += 1
+                total_ordered_residues += 1
+            else:
+                cur_order_streak = 0
+            if cur_order_streak > consec_allowed:
+                return False
+            if total_ordered_residues > allowed_order_residues:
+                return False
+    return True
@@ -0,0 +1,112 @@
+"""
+Reference versions of the Protein property calculations, the residue by
+residue loops that goose.backend.protein used before it worked on encoded
+arrays. The tests check that the current functions give the same values.
+"""
+import math
+import random
+
+from goose.backend.amino_acids import AminoAcid
+
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+NEUTRAL_AMINO_ACIDS = 'ACFGHILMNPQSTVWY'
+
+
+def random_sequences(num_sequences, min_length=1, max_length=300, seed=0):
+    """
+    Random sequences for the tests, including sequences shorter than 6
+    residues, sequences with no charged residues and fully charged ones.
+    """
+    rng = random.Random(seed)
+    sequences = []
+    for seq_num in range(num_sequences):
+        length = rng.randint(min_length, max_length)
+        if seq_num % 5 == 0:
+            alphabet = NEUTRAL_AMINO_ACIDS
+        elif seq_num % 7 == 0:
+            alphabet = 'DEKR'
+        else:
+            alphabet = AMINO_ACIDS
+        sequences.append(''.join(rng.choice(alphabet) for _ in range(length)))
+    for length in range(1, 7):
+        sequences.append(''.join(rng.choice(AMINO_ACIDS) for _ in range(length)))
+        sequences.append(''.join(rng.choice(NEUTRAL_AMINO_ACIDS) for _ in range(length)))
+        sequences.append(''.join(rng.choice('DEKR') for _ in range(length)))
+    return sequences
+
+
+def calc_frac(seq):
+    fraction_amino_acids = {amino_acid: 0 for amino_acid in AMINO_ACIDS}
+    for amino_acid in seq:
+        fraction_amino_acids[amino_acid] += 1
+    for amino_acid in fraction_amino_acids:
+        fraction_amino_acids[amino_acid] = round((fraction_amino_acids[amino_acid] / len(seq)), 5)
+    return fraction_amino_acids
+
+
+def calc_FCR(seq):
+    charged_res = 0
+    for i in seq:
+        if AminoAcid(i).charge != 0:
+            charged_res += 1
+    return round(charged_res / len(seq), 6)
+
+
+def calc_NCPR(seq):
+    charge = 0
+    for i in seq:
+        charge += AminoAcid(i).charge
+    return round(charge / len(seq), 6)
+
+
+def calc_sigma(seq):
+    FCR_seq = calc_FCR(seq)
+    NCPR_seq = calc_NCPR(seq)
+    if FCR_seq == 0:
+        return 0
+    return round(((NCPR_seq**2) / FCR_seq), 6)
+
+
+def delta_pre(seq, bloblen=5):
+    sigma_seq = calc_sigma(seq)
+    nblobs = len(seq) - bloblen + 1
+    total_blob_sigma = 0
+    if len(seq) >= 5:
+        for i in range(0, nblobs):
+            cur_sigma = calc_sigma(seq[i:i+bloblen])
+            total_blob_sigma += ((sigma_seq - cur_sigma) ** 2) / nblobs
+    return total_blob_sigma
+
+
+def calc_delta(seq):
+    return round(((delta_pre(seq, bloblen=5) + delta_pre(seq, bloblen=6)) /2), 6)
+
+
+def _charge(residue):
+    if residue == 'D' or residue == 'E':
+        return -1
+    if residue == 'K' or residue == 'R':
+        return 1
+    return 0
+
+
+def calc_SCD(sequence):
+    total = 0
+    for m in range(1, len(sequence)):
+        for n in range(0, m-1):
+            total += _charge(sequence[m]) * _charge(sequence[n]) * (math.sqrt((m+1)-(n+1)))
+    return round(total * (1/len(sequence)), 5)
+
+
+def calc_mean_hydro(seq):
+    total_hydro = 0
+    for i in seq:
+        total_hydro += AminoAcid(i).hydropathy
+    return round(total_hydro / len(seq), 6)
+
+
+def calc_all_properties(seq):
+    return {'length': len(seq), 'FCR': calc_FCR(seq), 'NCPR': calc_NCPR(seq),
+            'hydropathy': calc_mean_hydro(seq), 'sigma': calc_sigma(seq),
+            'delta': calc_delta(seq), 'SCD': calc_SCD(seq)}
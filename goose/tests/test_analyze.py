@@ -0,0 +1,40 @@
+"""
+Tests for goose.analyze.
+"""
+import sys
+import types
+
+import pytest
+
+from goose import analyze
+from goose.backend.protein import Protein
+
+
+class StubSparrowProtein:
+    """Stand in for sparrow.Protein that only has kappa."""
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.kappa = 0.25
+
+
+@pytest.fixture
+def stub_sparrow(monkeypatch):
+    sparrow = types.ModuleType('sparrow')
+    sparrow.Protein = StubSparrowProtein
+    monkeypatch.setitem(sys.modules, 'sparrow', sparrow)
+
+
+def test_properties(stub_sparrow):
+    sequence = 'KKKEEEDDDRRRSSSGGG'
+    props = analyze.properties(sequence)
+    assert props['kappa'] == 0.25
+    assert props['FCR'] == Protein.calc_FCR(sequence)
+    assert props['NCPR'] == Protein.calc_NCPR(sequence)
+    assert props['hydropathy'] == Protein.calc_mean_hydro(sequence)
+    assert props['fractions'] == Protein.calc_frac(sequence)
+
+
+def test_properties_without_fractions(stub_sparrow):
+    props = analyze.properties('KKKEEEDDDRRRSSSGGG', fractions=False)
+    assert 'fractions' not in props
+    assert props['kappa'] == 0.25
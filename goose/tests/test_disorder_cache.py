@@ -0,0 +1,112 @@
+"""
+Tests for goose.backend.disorder_cache and the disorder cache used by
+goose.backend.predict_disorder.
+"""
+import numpy as np
+import pytest
+
+from goose.backend import predict_disorder as pd
+from goose.backend.disorder_backends import StubBackend
+from goose.backend.disorder_cache import DisorderCache
+from goose.goose_exceptions import GooseInputError
+
+
+class CountingBackend(StubBackend):
+    """StubBackend that is cached and counts the sequences it predicts."""
+    cache_predictions = True
+
+    def __init__(self, version='counting-1'):
+        self._version = version
+        self.predicted = []
+
+    def version(self):
+        return self._version
+
+    def predict(self, sequence):
+        self.predicted.append(sequence)
+        return super().predict(sequence)
+
+
+def test_lru_eviction():
+    cache = DisorderCache(maxsize=2, eviction='lru')
+    cache.put('A', 1)
+    cache.put('B', 2)
+    assert cache.get('A') == 1
+    cache.put('C', 3)
+    assert 'A' in cache and 'C' in cache and 'B' not in cache
+    assert cache.info()['evictions'] == 1
+    assert cache.info()['hits'] == 1
+
+
+def test_fifo_eviction():
+    cache = DisorderCache(maxsize=2, eviction='fifo')
+    cache.put('A', 1)
+    cache.put('B', 2)
+    cache.get('A')
+    cache.put('C', 3)
+    assert 'A' not in cache and 'B' in cache and 'C' in cache
+
+
+def test_resize_and_bad_settings():
+    cache = DisorderCache(maxsize=3)
+    for sequence in 'ABC':
+        cache.put(sequence, sequence)
+    cache.resize(maxsize=1)
+    assert len(cache) == 1 and 'C' in cache
+    cache.resize(maxsize=0)
+    cache.put('D', 'D')
+    assert len(cache) == 0
+    with pytest.raises(GooseInputError):
+        DisorderCache(maxsize=-1)
+    with pytest.raises(GooseInputError):
+        DisorderCache(eviction='random')
+
+
+def test_predictions_are_cached(disorder_cache):
+    backend = CountingBackend()
+    first = pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=backend)
+    second = pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=backend)
+    assert second is first
+    assert backend.predicted == ['MKKEEDDSSGGPPAAL']
+    assert np.allclose(first, StubBackend().predict('MKKEEDDSSGGPPAAL'))
+
+    profiles = pd.predict_disorder_batch(['MKKEEDDSSGGPPAAL', 'GSGSGSGSGS', 'GSGSGSGSGS'], backend=backend)
+    assert profiles[0] is first
+    assert backend.predicted == ['MKKEEDDSSGGPPAAL', 'GSGSGSGSGS']
+
+
+def test_cache_is_keyed_on_version(disorder_cache):
+    old_backend = CountingBackend('counting-1')
+    new_backend = CountingBackend('counting-2')
+    pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=old_backend)
+    pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=new_backend)
+    assert new_backend.predicted == ['MKKEEDDSSGGPPAAL']
+    assert pd.disorder_cache_info()['size'] == 2
+
+
+def test_profiles_are_read_only(disorder_cache):
+    backend = CountingBackend()
+    profile = pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=backend)
+    with pytest.raises(ValueError):
+        profile[0] = 0
+    for profile in pd.predict_disorder_batch(['GSGSGSGSGS'], backend=backend) + pd.predict_disorder_batch(['AAAAAAAAAA'], backend=backend, use_cache=False):
+        with pytest.raises(ValueError):
+            profile[0] = 0
+
+
+def test_use_cache_false(disorder_cache):
+    backend = CountingBackend()
+    pd.predict_disorder_batch(['MKKEEDDSSGGPPAAL'], backend=backend, use_cache=False)
+    assert pd.disorder_cache_info()['size'] == 0
+    pd.predict_disorder_batch(['MKKEEDDSSGGPPAAL'], backend=backend, use_cache=False)
+    assert backend.predicted == ['MKKEEDDSSGGPPAAL']*2
+
+
+def test_set_disorder_cache_eviction(disorder_cache):
+    backend = CountingBackend()
+    pd.set_disorder_cache(maxsize=2)
+    for sequence in ['GSGSGSGSGS', 'AAAAAAAAAA', 'KKKKKKKKKK']:
+        pd.predict_disorder(sequence, backend=backend)
+    pd.predict_disorder('GSGSGSGSGS', backend=backend)
+    assert backend.predicted == ['GSGSGSGSGS', 'AAAAAAAAAA', 'KKKKKKKKKK', 'GSGSGSGSGS']
+    assert pd.disorder_cache_info()['evictions'] == 2
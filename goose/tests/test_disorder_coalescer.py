@@ -0,0 +1,56 @@
+"""
+Tests for goose.backend.disorder_coalescer.
+"""
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+
+from goose.backend.disorder_backends import StubBackend
+from goose.backend.disorder_coalescer import DisorderCoalescer
+
+
+SEQUENCES = ['MKKEEDDSSGGPPAAL', 'GSGSGSGSGSGSGSGS', 'LLLLIIIIVVVVAAAA', 'KRKRKRKRDEDEDEDE']
+
+
+def test_predictions_match_backend():
+    backend = StubBackend()
+    coalescer = DisorderCoalescer(max_batch_size=8, max_wait=0.001)
+    try:
+        results = [None]*len(SEQUENCES)
+        def predict(seq_num):
+            results[seq_num] = coalescer.predict(backend, SEQUENCES[seq_num])
+        threads = [threading.Thread(target=predict, args=(seq_num,)) for seq_num in range(len(SEQUENCES))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        coalescer.stop()
+    for sequence, result in zip(SEQUENCES, results):
+        assert np.array_equal(result, backend.predict(sequence))
+
+
+def _predict_in_child(coalescer, queue):
+    queue.put([list(prediction) for prediction in coalescer.predict_batch(StubBackend(), SEQUENCES)])
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs the fork start method')
+def test_predict_after_fork():
+    coalescer = DisorderCoalescer(max_batch_size=8, max_wait=0.001)
+    try:
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        process = context.Process(target=_predict_in_child, args=(coalescer, queue))
+        process.start()
+        process.join(timeout=30)
+        if process.is_alive():
+            process.terminate()
+            pytest.fail('predict_batch did not return in the forked process')
+        assert process.exitcode == 0
+        predictions = queue.get(timeout=5)
+    finally:
+        coalescer.stop()
+    for sequence, prediction in zip(SEQUENCES, predictions):
+        assert np.allclose(prediction, StubBackend().predict(sequence))
@@ -0,0 +1,79 @@
+"""
+Tests for goose.backend.disorder_lookup against the aa_dis_val_4_v3 dict
+and the residue by residue fast_predict_disorder it replaced.
+"""
+import hashlib
+import random
+
+import numpy as np
+import pytest
+
+from goose.backend import lists
+from goose.backend import disorder_lookup
+from goose.backend.sequence_generation_backend import fast_predict_disorder
+from goose.goose_exceptions import GooseInputError
+
+
+AMINO_ACIDS = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+
+# the old optimal_residue_key
+REDUCED = {'F': 'W', 'W': 'W', 'Y': 'W', 'C': 'C', 'L': 'L', 'V': 'L', 'I': 'L', 'M': 'M', 'A': 'A', 'H': 'H',
+           'K': 'K', 'R': 'K', 'Q': 'Q', 'N': 'Q', 'D': 'D', 'E': 'D', 'G': 'G', 'S': 'G', 'T': 'T', 'P': 'P'}
+
+
+def reference_fast_predict_disorder(sequence):
+    disorder_values = []
+    for i in range(0, len(sequence)):
+        if i in [0, 1, 2, 3]:
+            cur_sequence = sequence[0:4]
+        else:
+            cur_sequence = sequence[i-4:i]
+        key = ''.join([REDUCED[aa] for aa in cur_sequence])
+        disorder_values.append(lists.aa_dis_val_4_v3[key][AMINO_ACIDS.index(sequence[i])])
+    return disorder_values
+
+
+def test_dict_matches_the_old_module():
+    # digest of sorted(aa_dis_val_4_v3.items()) from the old lists.py literal
+    assert len(lists.aa_dis_val_4_v3) == 12**4
+    assert hashlib.sha1(repr(sorted(lists.aa_dis_val_4_v3.items())).encode()).hexdigest() == 'd1f6cd834edfeab7bb4492990fc3818f693fc1c0'
+    assert lists.aa_dis_val_4_v3['WWWW'][:3] == [0.54, 0.567, 0.532]
+
+
+def test_table_matches_dict():
+    table = disorder_lookup.disorder_table()
+    assert table.shape == (12**4, 20)
+    for key, values in lists.aa_dis_val_4_v3.items():
+        assert table[disorder_lookup.context_index(key)].tolist() == values
+        assert disorder_lookup.disorder_row(key).tolist() == values
+    with pytest.raises(ValueError):
+        table[0, 0] = 1
+
+
+def test_lookup_matches_reference():
+    rng = random.Random(0)
+    for length in list(range(4, 12)) + [50, 300]:
+        sequences = [''.join(rng.choice(AMINO_ACIDS) for _ in range(length)) for _ in range(20)]
+        expected = [reference_fast_predict_disorder(sequence) for sequence in sequences]
+        assert disorder_lookup.lookup_disorder_batch(sequences).tolist() == expected
+        assert disorder_lookup.lookup_disorder_batch(disorder_lookup.encode_sequences(sequences)).tolist() == expected
+        for sequence, values in zip(sequences, expected):
+            assert disorder_lookup.lookup_disorder(sequence).tolist() == values
+            assert fast_predict_disorder(sequence) == values
+
+
+def test_reduced_key():
+    for aa, reduced in REDUCED.items():
+        assert disorder_lookup.reduced_key(aa*4) == reduced*4
+    with pytest.raises(KeyError):
+        disorder_lookup.context_index('WWW')
+
+
+def test_bad_sequences():
+    with pytest.raises(GooseInputError):
+        disorder_lookup.lookup_disorder('KEE')
+    with pytest.raises(GooseInputError):
+        disorder_lookup.lookup_disorder('KEEBX')
+    with pytest.raises(GooseInputError):
+        disorder_lookup.lookup_disorder_batch(['KEEK', 'KEEKE'])
+    assert disorder_lookup.lookup_disorder_batch([]).shape[0] == 0
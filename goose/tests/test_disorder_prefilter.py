@@ -0,0 +1,56 @@
+"""
+Tests for goose.backend.disorder_prefilter and the prefilter option of
+the disorder checks.
+"""
+import numpy as np
+import pytest
+
+from goose.backend import disorder_prefilter
+from goose.backend.disorder_lookup import lookup_disorder
+from goose.backend.sequence_generation import check_disorder, check_disorder_batch
+from goose.backend.variant_generation import sequence_variant_disorder
+from goose.backend.predict_disorder import predict_disorder
+from goose.goose_exceptions import GooseInputError
+
+
+DISORDERED = 'GSGSEEKKPPSGSDEKSPGSGSEEKKPPSG'
+ORDERED = 'LLIVWFLLIVWFLLIVWFLLIVWFLLIVWF'
+
+
+def test_prefilter_score():
+    assert disorder_prefilter.prefilter_score(DISORDERED) == pytest.approx(float(np.mean(lookup_disorder(DISORDERED))))
+    assert disorder_prefilter.prefilter_score(DISORDERED) > disorder_prefilter.prefilter_score(ORDERED)
+
+
+def test_passes_prefilter():
+    assert disorder_prefilter.passes_prefilter(ORDERED, None)
+    assert disorder_prefilter.passes_prefilter(ORDERED, False)
+    assert disorder_prefilter.passes_prefilter(DISORDERED, True)
+    assert not disorder_prefilter.passes_prefilter(ORDERED, 0.99)
+
+
+def test_short_sequences_pass_prefilter():
+    # too short for the lookup table, so they go on to the real predictor
+    for sequence in ['K', 'KE', 'KEE']:
+        assert disorder_prefilter.passes_prefilter(sequence, True)
+        assert disorder_prefilter.passes_prefilter(sequence, 1.0)
+        assert check_disorder(sequence, prefilter=True, backend='stub') == check_disorder(sequence, prefilter=False, backend='stub')
+    assert check_disorder('KEE', prefilter=True, backend='stub') == True
+    assert check_disorder_batch(['KEE', 'KE', ORDERED, DISORDERED], prefilter=1.0, backend='stub') == [True, True, False, False]
+    original_disorder = predict_disorder('KEE', backend='stub')
+    assert sequence_variant_disorder('EKE', original_disorder, prefilter=True, backend='stub') == sequence_variant_disorder('EKE', original_disorder, backend='stub')
+
+
+def test_prefilter_rejects_without_predicting():
+    class FailingBackend:
+        pass
+    # a backend that can't be used shows the sequence was never predicted
+    assert check_disorder(ORDERED, prefilter=0.99, backend=FailingBackend()) == False
+    assert check_disorder_batch([ORDERED], prefilter=0.99, backend=FailingBackend()) == [False]
+
+
+def test_calibrate_prefilter_needs_a_threshold():
+    with pytest.raises(GooseInputError):
+        disorder_prefilter.calibrate_prefilter([DISORDERED], prefilter=None)
+    with pytest.raises(GooseInputError):
+        disorder_prefilter.calibrate_prefilter([], prefilter=True)
@@ -0,0 +1,80 @@
+"""
+Tests for goose.backend.disorder_rules against the residue by residue
+versions in reference_disorder.
+"""
+import numpy as np
+
+from goose.backend import disorder_rules
+from goose.backend import gen_minimal_variant_backend, variant_generation
+from goose.backend.predict_disorder import predict_disorder
+from goose.tests import reference_disorder as reference
+
+
+# values on both sides of (and exactly at) the thresholds used below. 
+# Profiles are float32 like the predictions from predict_disorder, 
+# and some cases use float64 profiles.
+VALUES = np.array([0.1, 0.2, 0.25, 0.3, 0.45, 0.5, 0.55, 0.59, 0.6, 0.61, 0.65, 0.7, 0.8, 0.9, 1.0], dtype=np.float32)
+
+
+def _random_profiles(rng, num_profiles, length):
+    # mostly disordered profiles with a few low values so every rule gets used
+    disordered = rng.choice(VALUES[VALUES >= 0.6], size=(num_profiles, length))
+    low = rng.choice(VALUES, size=(num_profiles, length))
+    use_low = rng.random((num_profiles, length)) < rng.choice([0.0, 0.02, 0.05, 0.1, 0.3], size=(num_profiles, 1))
+    return np.where(use_low, low, disordered).astype(np.float32)
+
+
+def test_evaluate_disorder_batch_matches_reference():
+    rng = np.random.default_rng(0)
+    for case in range(150):
+        sequence_length = int(rng.integers(1, 400))
+        # check_disorder drops 2 residues from each end of sequences over 20
+        profile_length = sequence_length - 4 if sequence_length > 20 else sequence_length
+        profiles = _random_profiles(rng, 20, profile_length)
+        if case % 3 == 0:
+            profiles = profiles.astype(np.float64)
+        for disorder_threshold in (0.5, 0.6):
+            for strict in (False, True):
+                expected = [reference.evaluate_disorder(sequence_length, profile, disorder_threshold, strict=strict) for profile in profiles]
+                assert disorder_rules.evaluate_disorder_batch(profiles, sequence_length, disorder_threshold, strict=strict).tolist() == expected
+
+
+def test_variant_disorder_batch_matches_reference():
+    rng = np.random.default_rng(1)
+    for case in range(150):
+        length = int(rng.integers(1, 400))
+        original = _random_profiles(rng, 1, length)[0]
+        profiles = _random_profiles(rng, 20, length)
+        if case % 3 == 0:
+            original = original.astype(np.float64)
+        elif case % 3 == 1:
+            profiles = profiles.astype(np.float64)
+        for cutoff_val in (0.6, 0.7):
+            for strict in (False, True):
+                expected = [reference.variant_disorder(profile, original, cutoff_val, strict=strict) for profile in profiles]
+                assert disorder_rules.variant_disorder_batch(profiles, original, cutoff_val, strict=strict).tolist() == expected
+                # one original per variant
+                originals = np.repeat(original[np.newaxis, :], len(profiles), axis=0)
+                assert disorder_rules.variant_disorder_batch(profiles, originals, cutoff_val, strict=strict).tolist() == expected
+
+
+def test_longest_order_streaks():
+    ordered = np.array([[0, 1, 1, 0, 1, 1, 1, 0], [0]*8, [1]*8], dtype=bool)
+    assert disorder_rules.longest_order_streaks(ordered).tolist() == [3, 0, 8]
+    assert disorder_rules.longest_order_streaks(np.zeros((2, 0), dtype=bool)).tolist() == [0, 0]
+
+
+def test_sequence_variant_disorder_batch():
+    # the variant modules share the batch function from disorder_rules
+    assert gen_minimal_variant_backend.sequence_variant_disorder_batch is disorder_rules.sequence_variant_disorder_batch
+    assert variant_generation.sequence_variant_disorder_batch is disorder_rules.sequence_variant_disorder_batch
+
+    original = 'MKKEEDDSSGGPPALLIVWYKRQNSTGGSPEDKK'
+    original_disorder = predict_disorder(original, backend='stub')
+    variants = [original, original.replace('K', 'L'), original.replace('S', 'I'), original[:20], 'LLIVWF'*5]
+    results = disorder_rules.sequence_variant_disorder_batch(variants, original_disorder, cutoff_val=0.6, backend='stub')
+    for variant, result in zip(variants, results):
+        assert result == variant_generation.sequence_variant_disorder(variant, original_disorder, cutoff_val=0.6, backend='stub')
+        assert result == gen_minimal_variant_backend.sequence_variant_disorder(variant, original_disorder, cutoff=0.6, backend='stub')
+    assert results[0] == True
+    assert disorder_rules.sequence_variant_disorder_batch(variants, original_disorder, backend='stub', prefilter=1.0) == [False]*len(variants)
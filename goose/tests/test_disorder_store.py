@@ -0,0 +1,121 @@
+"""
+Tests for goose.backend.disorder_store and its use by
+goose.backend.predict_disorder.
+"""
+import os
+import sys
+import types
+import threading
+import subprocess
+
+import numpy as np
+import pytest
+
+from goose.backend import disorder_store
+from goose.backend import predict_disorder as pd
+from goose.backend.disorder_store import DisorderStore
+from goose.tests.test_disorder_cache import CountingBackend
+from goose.goose_exceptions import GooseInputError
+
+
+PROFILES = {'MKKEEDDSSGGPPAAL': np.linspace(0, 1, 16), 'GSGSGSGSGS': np.full(10, 0.75), 'A': np.array([0.1])}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # a clock that ticks every time it is read, so last_used is never tied
+    ticks = iter(range(1, 1000000))
+    monkeypatch.setattr(disorder_store, 'time', types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+def test_round_trip(tmp_path):
+    store = DisorderStore(tmp_path / 'store.db')
+    store.put_many(PROFILES, 'stub-1')
+    assert len(store) == 3
+    found = store.get_many(list(PROFILES) + ['KKKK'], 'stub-1')
+    assert sorted(found) == sorted(PROFILES)
+    for sequence, profile in PROFILES.items():
+        assert np.array_equal(found[sequence], profile.astype(np.float32))
+    assert store.get('KKKK', 'stub-1') is None
+    store.clear()
+    assert len(store) == 0
+
+
+def test_version_change(tmp_path):
+    store = DisorderStore(tmp_path / 'store.db')
+    store.put('GSGSGSGSGS', PROFILES['GSGSGSGSGS'], 'stub-1')
+    assert store.get('GSGSGSGSGS', 'stub-2') is None
+    store.put('GSGSGSGSGS', np.zeros(10), 'stub-2')
+    assert np.array_equal(store.get('GSGSGSGSGS', 'stub-1'), PROFILES['GSGSGSGSGS'].astype(np.float32))
+    assert np.array_equal(store.get('GSGSGSGSGS', 'stub-2'), np.zeros(10, dtype=np.float32))
+
+
+def test_eviction(tmp_path, clock):
+    store = DisorderStore(tmp_path / 'store.db', max_entries=2)
+    store.put('MKKEEDDSSGGPPAAL', PROFILES['MKKEEDDSSGGPPAAL'], 'stub-1')
+    store.put('GSGSGSGSGS', PROFILES['GSGSGSGSGS'], 'stub-1')
+    # using the first profile makes the second the least recently used
+    assert store.get('MKKEEDDSSGGPPAAL', 'stub-1') is not None
+    store.put('A', PROFILES['A'], 'stub-1')
+    assert len(store) == 2
+    assert store.get('GSGSGSGSGS', 'stub-1') is None
+    assert store.get('MKKEEDDSSGGPPAAL', 'stub-1') is not None
+    assert store.get('A', 'stub-1') is not None
+
+
+def test_reopen(tmp_path):
+    store = DisorderStore(tmp_path / 'store.db')
+    store.put_many(PROFILES, 'stub-1')
+    store.close()
+    reopened = DisorderStore(tmp_path / 'store.db')
+    assert len(reopened) == 3
+    assert np.array_equal(reopened.get('GSGSGSGSGS', 'stub-1'), PROFILES['GSGSGSGSGS'].astype(np.float32))
+
+
+def test_other_threads(tmp_path):
+    store = DisorderStore(tmp_path / 'store.db')
+    store.put('GSGSGSGSGS', PROFILES['GSGSGSGSGS'], 'stub-1')
+    found = []
+    def read():
+        found.append(store.get('GSGSGSGSGS', 'stub-1'))
+        store.put('A', PROFILES['A'], 'stub-1')
+        store.close()
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join()
+    assert found[0] is not None
+    assert store.get('A', 'stub-1') is not None
+
+
+def test_bad_max_entries(tmp_path):
+    with pytest.raises(GooseInputError):
+        DisorderStore(tmp_path / 'store.db', max_entries=0)
+
+
+def test_predictions_use_store(tmp_path, disorder_cache):
+    backend = CountingBackend()
+    try:
+        pd.enable_disorder_store(tmp_path / 'store.db')
+        first = pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=backend)
+        pd.predict_disorder_batch(['GSGSGSGSGS'], backend=backend)
+        # a new run starts with an empty cache but the same store
+        pd.clear_disorder_cache()
+        assert np.array_equal(pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=backend), first)
+        pd.predict_disorder_batch(['GSGSGSGSGS', 'AAAAAAAAAA'], backend=backend)
+        assert backend.predicted == ['MKKEEDDSSGGPPAAL', 'GSGSGSGSGS', 'AAAAAAAAAA']
+        # a different predictor version doesn't use the stored profiles
+        pd.clear_disorder_cache()
+        new_backend = CountingBackend('counting-2')
+        pd.predict_disorder('MKKEEDDSSGGPPAAL', backend=new_backend)
+        assert new_backend.predicted == ['MKKEEDDSSGGPPAAL']
+    finally:
+        pd.disable_disorder_store()
+
+
+def test_environment_variable(tmp_path):
+    path = tmp_path / 'store.db'
+    environment = dict(os.environ, GOOSE_DISORDER_STORE=str(path))
+    code = 'from goose.backend import predict_disorder as pd; print(pd._DISORDER_STORE.path)'
+    result = subprocess.run([sys.executable, '-c', code], env=environment, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == str(path)
+    assert path.exists()
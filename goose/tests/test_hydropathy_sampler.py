@@ -0,0 +1,130 @@
+"""
+Tests for goose.backend.hydropathy_sampler and compose_hydro_seq, and that
+hydro_seq still falls back to drawing whole sequences when they fail.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from goose.backend import sequence_generation_backend as backend
+from goose.backend.disorder_lookup import AMINO_ACIDS
+from goose.backend.hydropathy_sampler import sample_hydropathy_counts, hydropathy_distribution
+from goose.backend.protein import Protein
+from goose.goose_exceptions import GooseError
+
+
+# (below 1.0 needs charged residues)
+OBJECTIVES = [1.0, 1.7, 2.25, 2.9, 3.4, 4.05, 4.6, 5.3, 5.9]
+EXCLUSIONS = [[], ['W', 'C'], ['I', 'V', 'L'], ['K', 'R', 'D', 'E']]
+
+
+def _sequence_from_counts(counts):
+    return ''.join(aa*int(count) for aa, count in zip(AMINO_ACIDS, counts))
+
+
+def _check_counts(counts, length, mean_hydro, probabilities, allowed_error):
+    assert counts.sum() == length
+    assert (counts[probabilities == 0] == 0).all()
+    sequence = _sequence_from_counts(counts)
+    assert abs(Protein.calc_mean_hydro(sequence) - mean_hydro) <= allowed_error
+
+
+def test_counts_hit_objective():
+    rng = np.random.default_rng(7)
+    for length in [37, 100, 250]:
+        for mean_hydro in OBJECTIVES:
+            for exclude_residues in EXCLUSIONS:
+                for allowed_error in [0.05, 0.01]:
+                    probabilities = hydropathy_distribution(mean_hydro, exclude_residues=exclude_residues)
+                    counts = sample_hydropathy_counts(length, mean_hydro, probabilities, allowed_error, rng)
+                    assert counts is not None, (length, mean_hydro, exclude_residues, allowed_error)
+                    _check_counts(counts, length, mean_hydro, probabilities, allowed_error)
+
+
+def test_short_counts_hit_objective_or_fail():
+    # short sequences with a small allowed error can get stuck where no single
+    # change gets closer. Then it gives None (and hydro_seq falls back to drawing
+    # whole sequences), it never gives a composition that misses the objective.
+    rng = np.random.default_rng(8)
+    failed = 0
+    for mean_hydro in OBJECTIVES:
+        for exclude_residues in EXCLUSIONS:
+            probabilities = hydropathy_distribution(mean_hydro, exclude_residues=exclude_residues)
+            for repeat in range(0, 10):
+                counts = sample_hydropathy_counts(10, mean_hydro, probabilities, 0.01, rng)
+                if counts is None:
+                    failed += 1
+                else:
+                    _check_counts(counts, 10, mean_hydro, probabilities, 0.01)
+    assert 0 < failed < len(OBJECTIVES)*len(EXCLUSIONS)*10 / 2
+
+
+def test_counts_unreachable_objective():
+    # only A (6.3) and G (4.1) can be used
+    probabilities = np.array([0.5 if aa in 'AG' else 0.0 for aa in AMINO_ACIDS])
+    rng = np.random.default_rng(0)
+    assert sample_hydropathy_counts(20, 7.0, probabilities, 0.05, rng) is None
+    # 5.2 can only be hit with an even length
+    assert sample_hydropathy_counts(21, 5.2, probabilities, 0.01, rng) is None
+    counts = sample_hydropathy_counts(20, 5.2, probabilities, 0.01, rng)
+    assert counts[AMINO_ACIDS.index('A')] == counts[AMINO_ACIDS.index('G')] == 10
+
+
+def test_compose_hydro_seq_hits_objective():
+    random.seed(3)
+    for length in [4, 25, 80]:
+        for mean_hydro in OBJECTIVES:
+            for exclude_residues in EXCLUSIONS:
+                probabilities = hydropathy_distribution(mean_hydro, exclude_residues=exclude_residues)
+                sequence = backend.compose_hydro_seq(length, mean_hydro, probabilities, 0.05)
+                if sequence is None:
+                    # only allowed when no composition can get close enough
+                    continue
+                assert len(sequence) == length
+                assert not set(sequence) & set(exclude_residues)
+                assert abs(Protein.calc_mean_hydro(sequence) - mean_hydro) <= 0.05
+    assert backend.compose_hydro_seq(0, 2.0, hydropathy_distribution(2.0), 0.05) is None
+
+
+def test_hydro_seq_hits_objective():
+    random.seed(4)
+    for length in [12, 60]:
+        for mean_hydro in OBJECTIVES:
+            for exclude_residues in EXCLUSIONS:
+                for just_neutral in [False, True]:
+                    sequence = backend.hydro_seq(length, mean_hydro, just_neutral=just_neutral,
+                                                 allowed_error=0.05, exclude_residues=exclude_residues)
+                    assert len(sequence) == length
+                    assert not set(sequence) & set(exclude_residues)
+                    if just_neutral:
+                        assert not set(sequence) & set('KRDE')
+                    assert abs(Protein.calc_mean_hydro(sequence) - mean_hydro) <= 0.05
+
+
+def test_hydro_seq_rejection_fallback(monkeypatch):
+    calls = []
+
+    def failing_compose(length, mean_hydro, probabilities, allowed_error):
+        calls.append((length, mean_hydro))
+        return None
+
+    monkeypatch.setattr(backend, 'compose_hydro_seq', failing_compose)
+    random.seed(5)
+    for mean_hydro in [1.5, 2.5, 3.5]:
+        sequence = backend.hydro_seq(30, mean_hydro, allowed_error=0.1)
+        assert len(sequence) == 30
+        assert abs(Protein.calc_mean_hydro(sequence) - mean_hydro) <= 0.1
+    assert calls == [(30, 1.5), (30, 2.5), (30, 3.5)]
+
+
+def test_hydro_seq_unreachable_objective():
+    # only A and G can be used, so 7.0 can't be reached: compose_hydro_seq fails
+    # and the rejection loop either gives the closest sequence or raises
+    exclude_residues = [aa for aa in AMINO_ACIDS if aa not in 'AG']
+    random.seed(6)
+    assert backend.compose_hydro_seq(10, 7.0, hydropathy_distribution(7.0, exclude_residues=exclude_residues), 0.05) is None
+    best_sequence = backend.hydro_seq(10, 7.0, exclude_residues=exclude_residues, return_best_seq=True)
+    assert best_sequence == 'AAAAAAAAAA'
+    with pytest.raises(GooseError):
+        backend.hydro_seq(10, 7.0, exclude_residues=exclude_residues)
@@ -0,0 +1,108 @@
+"""
+Tests for the windowed rescoring in goose.backend.predict_disorder.
+
+StubBackend averages over 5 residues, so a change only moves the values
+of the residues within 2 of it and a window of 2 or more must give
+exactly the full prediction.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from goose.backend import predict_disorder as pd
+from goose.backend import disorder_backends
+from goose.backend import gen_minimal_variant_backend
+from goose.backend.disorder_backends import StubBackend
+from goose.goose_exceptions import GooseInputError
+
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+SEQUENCE = 'MKKEEDDSSGGPPALLIVWYKRQNSTGGSPEDKKLLAVIGSGSRRKDEEDSTNQ'
+
+
+@pytest.fixture
+def stub_backend(monkeypatch):
+    monkeypatch.setattr(disorder_backends, '_DEFAULT_BACKEND', 'stub')
+
+
+def _full(sequence):
+    return StubBackend().predict(sequence)
+
+
+def _substitute(sequence, position, aa):
+    return sequence[:position] + aa + sequence[position+1:]
+
+
+def _swap(sequence, i, j):
+    residues = list(sequence)
+    residues[i], residues[j] = residues[j], residues[i]
+    return ''.join(residues)
+
+
+def test_window_at_the_ends():
+    reference_disorder = pd.predict_disorder(SEQUENCE, backend='stub')
+    for position in [0, 1, 2, len(SEQUENCE)//2, len(SEQUENCE)-2, len(SEQUENCE)-1]:
+        sequence = _substitute(SEQUENCE, position, 'W')
+        for window in (2, 3, 10):
+            spliced = pd.predict_disorder_incremental(sequence, SEQUENCE, reference_disorder, window=window, backend='stub')
+            assert np.allclose(spliced, _full(sequence), atol=1e-6)
+
+
+def test_swaps():
+    reference_disorder = pd.predict_disorder(SEQUENCE, backend='stub')
+    swaps = [(0, len(SEQUENCE)-1), (3, 4), (5, 40), (1, 12), (20, 26)]
+    sequences = [_swap(SEQUENCE, i, j) for i, j in swaps]
+    for spliced, sequence in zip(pd.predict_disorder_incremental_batch(sequences, SEQUENCE, reference_disorder, window=3, backend='stub'), sequences):
+        assert np.allclose(spliced, _full(sequence), atol=1e-6)
+        with pytest.raises(ValueError):
+            spliced[0] = 0
+
+
+def test_carried_profile():
+    rng = random.Random(0)
+    sequence = SEQUENCE
+    disorder = pd.predict_disorder(sequence, backend='stub')
+    for _ in range(50):
+        if rng.random() < 0.5:
+            new_sequence = _swap(sequence, rng.randrange(len(sequence)), rng.randrange(len(sequence)))
+        else:
+            new_sequence = _substitute(sequence, rng.randrange(len(sequence)), rng.choice(AMINO_ACIDS))
+        disorder = pd.predict_disorder_incremental(new_sequence, sequence, disorder, window=2, backend='stub')
+        sequence = new_sequence
+        assert np.allclose(disorder, _full(sequence), atol=1e-6)
+
+
+def test_window_none_is_full_prediction():
+    reference_disorder = np.zeros(len(SEQUENCE))
+    sequences = [_substitute(SEQUENCE, 10, 'W'), _swap(SEQUENCE, 0, 30), SEQUENCE[:20]]
+    for spliced, sequence in zip(pd.predict_disorder_incremental_batch(sequences, SEQUENCE, reference_disorder, window=None, backend='stub'), sequences):
+        assert np.array_equal(spliced, pd.predict_disorder(sequence, backend='stub'))
+
+
+def test_different_lengths_are_predicted_in_full():
+    reference_disorder = np.zeros(len(SEQUENCE))
+    sequence = SEQUENCE + 'KK'
+    assert np.allclose(pd.predict_disorder_incremental(sequence, SEQUENCE, reference_disorder, window=2, backend='stub'), _full(sequence), atol=1e-6)
+
+
+def test_validate_windowed_rescoring():
+    random.seed(0)
+    exact = pd.validate_windowed_rescoring([SEQUENCE], window=2, num_moves=10, move='substitution', backend='stub')
+    assert exact['num_moves'] == 10
+    assert exact['max_abs_error'] < 1e-6
+    random.seed(0)
+    too_small = pd.validate_windowed_rescoring([SEQUENCE], window=0, num_moves=10, move='substitution', backend='stub')
+    assert too_small['max_abs_error'] > 0
+    with pytest.raises(GooseInputError):
+        pd.validate_windowed_rescoring([SEQUENCE], move='insertion', backend='stub')
+
+
+def test_saturation_scores_with_window(stub_backend):
+    positions = [0, 7, len(SEQUENCE)-1]
+    residues, full_scores = gen_minimal_variant_backend.all_scores_at_positions(SEQUENCE, positions)
+    windowed_scores = gen_minimal_variant_backend.all_scores_at_positions(SEQUENCE, positions, window=5)[1]
+    for position, position_scores, position_windowed in zip(positions, full_scores, windowed_scores):
+        expected = [np.sum(_full(_substitute(SEQUENCE, position, aa))) for aa in residues]
+        assert np.allclose(position_scores, expected, atol=1e-4)
+        assert np.allclose(position_windowed, expected, atol=1e-4)
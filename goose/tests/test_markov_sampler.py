@@ -0,0 +1,161 @@
+"""
+Tests for goose.backend.markov_sampler.
+"""
+import numpy as np
+import pytest
+
+from goose.backend import markov_sampler
+from goose.backend import sequence_generation_backend as backend
+from goose.backend.disorder_lookup import AMINO_ACIDS, LookupTable, builtin_lookup_table
+from goose.goose_exceptions import GooseError, GooseInputError
+
+
+HYDROPHOBIC = 'ACFILMVWY'
+
+
+def _two_class_table():
+    # 'H' for hydrophobic and 'P' for everything else. After a hydrophobic
+    # residue only K passes the cutoff and after anything else only L does.
+    residue_classes = ''.join(['H' if aa in HYDROPHOBIC else 'P' for aa in AMINO_ACIDS])
+    values = np.full((2**4, 20), 0.5)
+    for row in range(2**4):
+        last_class = 'HP'[row % 2]
+        values[row, AMINO_ACIDS.index('K' if last_class == 'H' else 'L')] = 0.9
+    return LookupTable(residue_classes, 'HP', 4, values, 'two_class')
+
+
+@pytest.fixture
+def optimal_residue_table():
+    yield
+    backend.set_optimal_residue_table(None)
+
+
+def test_two_class_table():
+    table = _two_class_table()
+    sequences = markov_sampler.sample_chains(50, 30, table=table, as_strings=True)
+    for sequence in sequences:
+        for position in range(4, len(sequence)):
+            assert sequence[position] == ('K' if sequence[position-1] in HYDROPHOBIC else 'L')
+
+
+def test_batch_samplers_use_optimal_residue_table(optimal_residue_table):
+    table = builtin_lookup_table()
+    # a table where only W passes the cutoff
+    values = np.full(table.values.shape, 0.5)
+    values[:, AMINO_ACIDS.index('W')] = 0.9
+    backend.set_optimal_residue_table(LookupTable(table.residue_classes, table.classes, 4, values, 'only_w'))
+    assert backend.get_optimal_residue('KKKK') == 'W'
+    assert backend.create_seqs_by_length_batch(20, 5) == ['W'*20]*5
+    for sequence in backend.create_seqs_by_fracs_batch(20, 5, K=0.25):
+        assert sorted(sequence) == ['K']*5 + ['W']*15
+
+    backend.set_optimal_residue_table(_two_class_table())
+    for sequence in backend.create_seqs_by_length_batch(20, 5):
+        for position in range(4, len(sequence)):
+            assert sequence[position] == ('K' if sequence[position-1] in HYDROPHOBIC else 'L')
+
+    # going back to aa_dis_val_4_v3 drops the transition tables of the other tables
+    backend.set_optimal_residue_table(None)
+    assert markov_sampler._tables == {}
+    assert set(''.join(backend.create_seqs_by_length_batch(50, 20))) != {'W'}
+
+
+def _row_key(row):
+    # the aa_dis_val_4_v3 key of a context row
+    classes = builtin_lookup_table().classes
+    key = ''
+    for _ in range(4):
+        key = classes[row % 12] + key
+        row //= 12
+    return key
+
+
+def test_transition_table_matches_candidates():
+    for exclude, cutoff in [([], None), (['W', 'F', 'Y'], None), (['K', 'R', 'E', 'D', 'S', 'G'], 0.6),
+                            ([], 0.95), (['P', 'S', 'G', 'Q', 'N', 'E', 'D'], 0.9), (AMINO_ACIDS[:18], 0.9)]:
+        candidates, counts = markov_sampler.transition_table(exclude, cutoff)
+        effective_cutoff = markov_sampler._effective_cutoff(cutoff)
+        for row in range(12**4):
+            try:
+                expected = list(backend.optimal_residue_candidates(_row_key(row), exclude, effective_cutoff))
+            except IndexError:
+                # get_optimal_residue fails when the tie breaking only reaches excluded residues
+                expected = []
+            assert [AMINO_ACIDS[column] for column in candidates[row, :counts[row]]] == expected, (row, exclude, cutoff)
+
+
+def _reference_chains(starters, length, exclude, draws, fixed=None):
+    # the create_seq_by_props / create_seq_by_fracs loops, with the
+    # random choice of a candidate taken from draws
+    sequences = []
+    for seq_num, starter_seq in enumerate(starters):
+        sequence = ''
+        for i in range(0, length):
+            if fixed is None or fixed[seq_num][i] == '0':
+                if len(sequence) < 4:
+                    key = starter_seq[len(starter_seq)-4:]
+                else:
+                    key = sequence[len(sequence)-4:]
+                candidate_amino_acids = backend.get_optimal_residue(key, exclude_residues=exclude, return_all=True)
+                chosen_residue = candidate_amino_acids[int(draws[i][seq_num] * len(candidate_amino_acids))]
+                if len(sequence) < 4:
+                    starter_seq += chosen_residue
+            else:
+                chosen_residue = fixed[seq_num][i]
+            sequence += chosen_residue
+        sequences.append(sequence)
+    return sequences
+
+
+def test_chains_match_reference_loops():
+    rng = np.random.default_rng(0)
+    num_sequences = 40
+    for length, exclude in [(1, []), (4, []), (5, ['W']), (60, []), (60, ['K', 'R', 'E', 'D']), (100, ['P', 'S', 'G', 'Q', 'N'])]:
+        starters = [''.join(rng.choice(AMINO_ACIDS, 4)) for _ in range(num_sequences)]
+        seed = int(rng.integers(2**32))
+        draws = np.random.default_rng(seed).random((length, num_sequences))
+        sequences = markov_sampler.sample_chains(num_sequences, length, exclude_residues=exclude, starters=starters,
+                                                 as_strings=True, rng=np.random.default_rng(seed))
+        assert sequences == _reference_chains(starters, length, exclude, draws)
+
+
+def test_fixed_positions_match_reference_loops():
+    rng = np.random.default_rng(1)
+    num_sequences = 40
+    for length, fraction in [(3, 0.34), (10, 0.3), (50, 0.2), (80, 0.5)]:
+        starters = [''.join(rng.choice(AMINO_ACIDS, 4)) for _ in range(num_sequences)]
+        layouts = []
+        for _ in range(num_sequences):
+            layout = ['K']*round(length*fraction) + ['E']*round(length*fraction/2)
+            layout += ['0']*(length - len(layout))
+            layouts.append(''.join(rng.permutation(layout)))
+        seed = int(rng.integers(2**32))
+        draws = np.random.default_rng(seed).random((length, num_sequences))
+        sequences = markov_sampler.sample_chains(num_sequences, length, exclude_residues=['K', 'E'], fixed=layouts,
+                                                 starters=starters, as_strings=True, rng=np.random.default_rng(seed))
+        assert sequences == _reference_chains(starters, length, ['K', 'E'], draws, fixed=layouts)
+        for sequence, layout in zip(sequences, layouts):
+            for residue, fixed_residue in zip(sequence, layout):
+                assert residue == fixed_residue or (fixed_residue == '0' and residue not in 'KE')
+
+
+def test_fracs_batch_keeps_fractions():
+    for kwargs in [{'K': 0.2}, {'K': 0.1, 'E': 0.1, 'W': 0.05}, {'S': 0.5, 'G': 0.5}, {'P': 0.3, 'A': 0.3}]:
+        expected = sorted(backend.fraction_residues(40, kwargs)[0])
+        for sequence in backend.create_seqs_by_fracs_batch(40, 20, **kwargs):
+            assert len(sequence) == 40
+            assert sorted(residue for residue in sequence if residue in kwargs) == expected
+
+
+def test_bad_input():
+    with pytest.raises(GooseInputError):
+        markov_sampler.transition_table(AMINO_ACIDS)
+    with pytest.raises(GooseInputError):
+        markov_sampler.sample_chains(2, 10, starters=['KKKK'])
+    with pytest.raises(GooseInputError):
+        markov_sampler.sample_chains(2, 10, fixed=['KK00000000X'])
+    # a context where the tie breaking only reaches excluded residues
+    candidates, counts = markov_sampler.transition_table(AMINO_ACIDS[:19], 0.9)
+    starter = _row_key(int(np.flatnonzero(counts == 0)[0]))
+    with pytest.raises(GooseError):
+        markov_sampler.sample_chains(1, 10, exclude_residues=AMINO_ACIDS[:19], cutoff_disorder=0.9, starters=[starter])
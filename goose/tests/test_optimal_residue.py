@@ -0,0 +1,107 @@
+"""
+Tests for the candidate cache behind get_optimal_residue in
+goose.backend.sequence_generation_backend.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from goose.backend import lists
+from goose.backend import parameters
+from goose.backend import sequence_generation_backend as backend
+from goose.backend.disorder_lookup import LookupTable, builtin_lookup_table
+
+
+AMINO_ACIDS = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+
+
+def reference_candidates(four_amino_acids_key, exclude_residues, cutoff_disorder):
+    # the old get_optimal_residue(..., return_all=True) after the key and cutoff were worked out
+    potential_AA_vals = lists.aa_dis_val_4_v3[four_amino_acids_key]
+    potential_residue_numbers = sorted(potential_AA_vals, reverse=True)
+    candidate_amino_acids = []
+    for i in range(0, len(potential_AA_vals)):
+        if potential_AA_vals[i] > cutoff_disorder and AMINO_ACIDS[i] not in exclude_residues:
+            candidate_amino_acids.append(AMINO_ACIDS[i])
+    amino_acid_index = 0
+    while candidate_amino_acids == []:
+        current_residue_position = potential_AA_vals.index(potential_residue_numbers[amino_acid_index])
+        if AMINO_ACIDS[current_residue_position] not in exclude_residues:
+            candidate_amino_acids.append(AMINO_ACIDS[current_residue_position])
+        amino_acid_index += 1
+    return candidate_amino_acids
+
+
+def _outcome(function, *args):
+    try:
+        return list(function(*args))
+    except IndexError:
+        return IndexError
+
+
+@pytest.fixture
+def empty_cache():
+    backend.set_optimal_residue_table(None)
+    yield
+    backend.set_optimal_residue_table(None)
+
+
+def test_candidates_match_reference(empty_cache):
+    rng = random.Random(0)
+    keys = list(lists.aa_dis_val_4_v3)
+    cases = []
+    for _ in range(2000):
+        key = rng.choice(keys)
+        exclude = rng.sample(AMINO_ACIDS, rng.choice([0, 0, 1, 3, 8, 15, 19]))
+        cutoff = rng.choice([0.5, 0.6, 0.65, parameters.OPTIMAL_RESIDUE_CUTOFF, 0.75, 0.8, 0.95])
+        cases.append((key, exclude, cutoff))
+    # the second pass comes from the cache
+    for _ in range(2):
+        for key, exclude, cutoff in cases:
+            expected = _outcome(reference_candidates, key, exclude, cutoff)
+            assert _outcome(backend.optimal_residue_candidates, key, exclude, cutoff) == expected
+            # the order of the excluded residues doesn't matter
+            assert _outcome(backend.optimal_residue_candidates, key, list(reversed(exclude)), cutoff) == expected
+
+
+def test_get_optimal_residue(empty_cache):
+    rng = random.Random(1)
+    for _ in range(500):
+        four_amino_acids = ''.join(rng.choice(AMINO_ACIDS) for _ in range(4))
+        exclude = rng.sample(AMINO_ACIDS, rng.choice([0, 2, 10]))
+        key = backend.optimal_residue_key(four_amino_acids)
+        expected = _outcome(reference_candidates, key, exclude, parameters.OPTIMAL_RESIDUE_CUTOFF)
+        if expected is IndexError:
+            continue
+        assert backend.get_optimal_residue(four_amino_acids, exclude_residues=exclude, return_all=True) == expected
+        assert backend.get_optimal_residue(four_amino_acids, exclude_residues=exclude) in expected
+        # cutoffs over 0.95 are capped
+        assert backend.get_optimal_residue(four_amino_acids, exclude_residues=exclude, cutoff_disorder=2, return_all=True) == reference_candidates(key, exclude, 0.95)
+
+
+def test_cache_eviction(empty_cache, monkeypatch):
+    monkeypatch.setattr(parameters, 'OPTIMAL_RESIDUE_CACHE_SIZE', 3)
+    keys = ['WWWW', 'KKKK', 'GGGG', 'DDDD', 'LLLL']
+    for key in keys:
+        backend.optimal_residue_candidates(key, [], 0.6)
+    cached = list(backend._optimal_residue_candidates)
+    assert [cache_key[0] for cache_key in cached] == keys[2:]
+    for key in keys:
+        assert list(backend.optimal_residue_candidates(key, [], 0.6)) == reference_candidates(key, [], 0.6)
+
+
+def test_set_table_clears_cache(empty_cache):
+    table = builtin_lookup_table()
+    # a table where W is always the most disordered next residue
+    values = np.full(table.values.shape, 0.5)
+    values[:, AMINO_ACIDS.index('W')] = 0.9
+    only_w = LookupTable(table.residue_classes, table.classes, 4, values, 'only_w')
+
+    before = backend.optimal_residue_candidates('KKKK', [], 0.6)
+    backend.set_optimal_residue_table(only_w)
+    assert backend._optimal_residue_candidates == {}
+    assert backend.optimal_residue_candidates('KKKK', [], 0.6) == ('W',)
+    assert backend.optimal_residue_candidates('KKKK', ['W'], 0.6) == ('A',)
+    backend.set_optimal_residue_table(None)
+    assert backend.optimal_residue_candidates('KKKK', [], 0.6) == before
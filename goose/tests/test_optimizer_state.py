@@ -0,0 +1,85 @@
+"""
+Regression tests for goose.backend.optimizer_state.PropertyState against
+the reference (residue by residue) versions in reference_protein.
+"""
+import random
+
+import pytest
+
+from goose.backend.optimizer_state import PropertyState
+from goose.tests import reference_protein as reference
+
+
+SEQUENCES = reference.random_sequences(30, max_length=200, seed=1)
+
+
+def _check_state(state):
+    sequence = state.sequence
+    assert len(state) == len(sequence)
+    assert state.FCR == reference.calc_FCR(sequence)
+    assert state.NCPR == reference.calc_NCPR(sequence)
+    assert state.sigma == reference.calc_sigma(sequence)
+    assert state.mean_hydropathy == pytest.approx(reference.calc_mean_hydro(sequence), abs=1e-6)
+    assert state.delta == pytest.approx(reference.calc_delta(sequence), abs=1e-6)
+    for aa in reference.AMINO_ACIDS:
+        positions = [position for position, residue in enumerate(sequence) if residue == aa]
+        assert state.positions.get(aa, []) == positions
+        assert state.count(aa) == len(positions)
+
+
+def test_initial_state_matches_reference():
+    for sequence in SEQUENCES:
+        _check_state(PropertyState(sequence))
+
+
+def test_changes_match_reference():
+    rng = random.Random(0)
+    for sequence in SEQUENCES:
+        state = PropertyState(sequence)
+        for _ in range(20):
+            if rng.random() < 0.5:
+                state.substitute(rng.randrange(len(state)), rng.choice(reference.AMINO_ACIDS))
+            else:
+                state.swap(rng.randrange(len(state)), rng.randrange(len(state)))
+            _check_state(state)
+
+
+def test_changes_without_charges():
+    rng = random.Random(1)
+    state = PropertyState('GSGSGSGSGSGS')
+    for _ in range(20):
+        state.substitute(rng.randrange(len(state)), rng.choice(reference.NEUTRAL_AMINO_ACIDS))
+        _check_state(state)
+    assert state.FCR == 0
+    assert state.sigma == 0
+    assert state.delta == 0
+
+
+def test_short_sequences():
+    for sequence in ['K', 'KE', 'GSG', 'KEKE', 'KEKEK', 'DDDDDD']:
+        state = PropertyState(sequence)
+        _check_state(state)
+        state.substitute(0, 'R')
+        state.swap(0, len(sequence)-1)
+        _check_state(state)
+    assert PropertyState('KKKK').delta == 0
+
+
+def test_hydropathy_after_substitution():
+    state = PropertyState('MKKEEDDSSGGPPAAL')
+    for position in range(len(state)):
+        for aa in reference.AMINO_ACIDS:
+            residues = list(state.sequence)
+            residues[position] = aa
+            expected = reference.calc_mean_hydro(''.join(residues))
+            assert state.hydropathy_after_substitution(position, aa) == pytest.approx(expected, abs=1e-6)
+    # the state itself is unchanged
+    assert state.sequence == 'MKKEEDDSSGGPPAAL'
+
+
+def test_invalid_amino_acid():
+    with pytest.raises(Exception):
+        PropertyState('ACDXB')
+    state = PropertyState('ACDE')
+    with pytest.raises(Exception):
+        state.substitute(0, 'B')
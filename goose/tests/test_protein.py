@@ -0,0 +1,131 @@
+"""
+Regression tests for goose.backend.protein against the reference
+(residue by residue) versions in reference_protein.
+"""
+import numpy as np
+import pytest
+
+from goose.backend.protein import Protein, calc_properties_batch, _SCD_from_charges, _ASCII_CHARGE
+from goose.goose_exceptions import GooseInputError
+from goose.tests import reference_protein as reference
+
+
+SEQUENCES = reference.random_sequences(60, max_length=500)
+
+
+def test_basic_properties_match_reference():
+    for sequence in SEQUENCES:
+        assert Protein.calc_FCR(sequence) == reference.calc_FCR(sequence)
+        assert Protein.calc_NCPR(sequence) == reference.calc_NCPR(sequence)
+        assert Protein.calc_sigma(sequence) == reference.calc_sigma(sequence)
+        assert Protein.calc_mean_hydro(sequence) == reference.calc_mean_hydro(sequence)
+        assert Protein.calc_frac(sequence) == reference.calc_frac(sequence)
+
+
+def test_all_properties_match_reference():
+    for sequence in SEQUENCES:
+        assert Protein.calc_all_properties(sequence) == reference.calc_all_properties(sequence)
+        basic = {name: value for name, value in reference.calc_all_properties(sequence).items() if name in ('length', 'FCR', 'NCPR', 'hydropathy')}
+        assert Protein.calc_basic_properties(sequence) == basic
+
+
+def test_protein_object_matches_reference():
+    for sequence in SEQUENCES:
+        protein = Protein(sequence)
+        assert protein.FCR == reference.calc_FCR(sequence)
+        assert protein.NCPR == reference.calc_NCPR(sequence)
+        assert protein.sigma == reference.calc_sigma(sequence)
+        assert protein.hydropathy == reference.calc_mean_hydro(sequence)
+        assert protein.hydro == reference.calc_mean_hydro(sequence)
+        assert protein.delta == reference.calc_delta(sequence)
+        assert protein.scd == reference.calc_SCD(sequence)
+        assert protein.fractions == reference.calc_frac(sequence)
+        assert protein.properties == reference.calc_all_properties(sequence)
+
+
+def test_percent_helpers():
+    # the helpers have always returned 1.0 for any sequence (see
+    # Protein._percent_from_codes) and keep doing so
+    assert Protein.calc_percent_aromatic('FWYAA') == 1.0
+    assert Protein.calc_percent_polar('QNSTGG') == 1.0
+    assert Protein.calc_percent_aliphatic('GGGG') == 1.0
+    assert Protein('AILVGG').percent_polar == 1.0
+    assert Protein('AILVGG').percent_aliphatic == 1.0
+
+
+def test_invalid_amino_acid():
+    with pytest.raises(Exception):
+        Protein.calc_FCR('ACDXB')
+    with pytest.raises(Exception):
+        Protein('ACDXB')
+
+
+def test_SCD_matches_reference():
+    for sequence in SEQUENCES:
+        assert Protein.calc_SCD(sequence) == reference.calc_SCD(sequence)
+
+
+def test_SCD_short_and_uncharged():
+    for sequence in ['K', 'KE', 'KEK', 'DDDDD', 'GGGGGG', 'S'*50, 'KKKKKKKKKK']:
+        assert Protein.calc_SCD(sequence) == reference.calc_SCD(sequence)
+    # no charges gives 0.0, not -0.0
+    assert str(Protein.calc_SCD('GSGSG')) == '0.0'
+
+
+def test_SCD_from_charges_batch():
+    for length in (1, 2, 5, 6, 37):
+        sequences = [sequence for sequence in reference.random_sequences(20, min_length=length, max_length=length, seed=length)
+                     if len(sequence) == length]
+        charges = np.array([_ASCII_CHARGE[np.frombuffer(sequence.encode(), dtype=np.uint8)] for sequence in sequences])
+        assert _SCD_from_charges(charges) == [reference.calc_SCD(sequence) for sequence in sequences]
+
+
+def test_delta_matches_reference():
+    for sequence in SEQUENCES:
+        assert Protein.calc_delta(sequence) == reference.calc_delta(sequence)
+        for bloblen in (5, 6):
+            assert Protein.delta_pre(sequence, bloblen=bloblen) == reference.delta_pre(sequence, bloblen=bloblen)
+
+
+def test_delta_short_and_uncharged():
+    for sequence in ['K', 'KEKE', 'KEKEK', 'GSGSG', 'GSGSGS', 'S'*40, 'KKKKKKE']:
+        assert Protein.calc_delta(sequence) == reference.calc_delta(sequence)
+    # no blobs of 6 in a sequence of 5
+    assert Protein.delta_pre('KEKEK', bloblen=6) == 0
+
+
+def test_delta_batch_matches_reference():
+    assert Protein.calc_delta_batch(SEQUENCES) == [reference.calc_delta(sequence) for sequence in SEQUENCES]
+
+
+def _check_batch(sequences, columns):
+    expected = [reference.calc_all_properties(sequence) for sequence in sequences]
+    for name in ('length', 'FCR', 'NCPR', 'hydropathy', 'sigma', 'delta', 'SCD'):
+        assert columns[name].tolist() == [properties[name] for properties in expected], name
+    for amino_acid in reference.AMINO_ACIDS:
+        assert columns['fractions'][amino_acid].tolist() == [reference.calc_frac(sequence)[amino_acid] for sequence in sequences]
+
+
+def test_properties_batch_matches_reference():
+    _check_batch(SEQUENCES, calc_properties_batch(SEQUENCES))
+
+
+def test_properties_batch_from_ascii_array():
+    lengths = np.array([len(sequence) for sequence in SEQUENCES])
+    ascii_codes = np.full((len(SEQUENCES), lengths.max()), ord('X'), dtype=np.uint8)
+    for seq_num, sequence in enumerate(SEQUENCES):
+        ascii_codes[seq_num, :len(sequence)] = np.frombuffer(sequence.encode(), dtype=np.uint8)
+    _check_batch(SEQUENCES, calc_properties_batch(ascii_codes, lengths=lengths))
+
+
+def test_properties_batch_without_fractions():
+    columns = calc_properties_batch(['KKEE', 'GSGSGSGS'], fractions=False)
+    assert 'fractions' not in columns
+    assert columns['FCR'].tolist() == [1.0, 0.0]
+
+
+def test_properties_batch_bad_input():
+    with pytest.raises(GooseInputError):
+        calc_properties_batch(['KKEE', ''])
+    with pytest.raises(GooseInputError):
+        calc_properties_batch(['KKEB'])
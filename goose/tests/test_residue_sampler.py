@@ -0,0 +1,93 @@
+"""
+Tests for goose.backend.residue_sampler against the weighted lists
+in goose.backend.lists.
+"""
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from goose.backend import lists
+from goose.backend.residue_sampler import ResidueSampler, list_sampler, dict_sampler
+from goose.goose_exceptions import GooseInputError
+
+
+AMINO_ACIDS = ['A', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'K', 'L', 'M', 'N', 'P', 'Q', 'R', 'S', 'T', 'V', 'W', 'Y']
+
+
+def _counts(seq_list):
+    counts = Counter(seq_list)
+    return [counts[aa] for aa in AMINO_ACIDS]
+
+
+def test_list_samplers_match_lists():
+    names = lists.load_data_array('list_names').tolist() + ['disordered_list']
+    for name in names:
+        seq_list = getattr(lists, name)
+        sampler = list_sampler(name)
+        assert sampler.weights.tolist() == _counts(seq_list), name
+        assert np.allclose(sampler.probability_vector(), np.array(_counts(seq_list)) / len(seq_list), rtol=0, atol=1e-12)
+        assert list_sampler(name) is sampler
+    with pytest.raises(GooseInputError):
+        list_sampler('not_a_list')
+
+
+def test_dict_samplers_match_dicts():
+    for dict_name in ('HydroDict', 'NeutralHydroDict', 'alpha_helix_lists'):
+        for key, seq_list in getattr(lists, dict_name).items():
+            assert dict_sampler(dict_name, key).weights.tolist() == _counts(seq_list), (dict_name, key)
+    with pytest.raises(KeyError):
+        dict_sampler('HydroDict', 'not_a_key')
+
+
+def test_exclusion_renormalises():
+    seq_list = ['A']*5 + ['K']*3 + ['E']*2 + ['W']
+    sampler = ResidueSampler.from_list(seq_list)
+    for exclude in ([], ['W'], ['A', 'E'], ['K', 'C'], ['A', 'K', 'E']):
+        remaining = [aa for aa in seq_list if aa not in exclude]
+        expected = np.array(_counts(remaining)) / len(remaining)
+        assert np.allclose(sampler.probability_vector(exclude), expected, rtol=0, atol=1e-12)
+        assert sampler.cumulative_table(exclude)[-1] == 1.0
+        assert sampler.can_sample(exclude)
+        assert set(sampler.sample(500, exclude=exclude, rng=np.random.default_rng(0))) == set(remaining)
+
+
+def test_all_excluded():
+    sampler = ResidueSampler.from_list(['A', 'A', 'K'])
+    assert not sampler.can_sample(['A', 'K'])
+    with pytest.raises(GooseInputError):
+        sampler.cumulative_table(['A', 'K'])
+    with pytest.raises(GooseInputError):
+        sampler.sample(10, exclude=['A', 'K', 'E'])
+
+
+def test_sample_frequencies():
+    sampler = list_sampler('disordered_list')
+    codes = sampler.sample_codes(200, 500, rng=np.random.default_rng(1))
+    frequencies = np.array([np.mean(codes == ord(aa)) for aa in AMINO_ACIDS])
+    assert np.allclose(frequencies, sampler.probability_vector(), atol=0.01)
+    assert sampler.sample(0) == ''
+    assert len(sampler.sample_batch(3, 7)) == 3
+
+
+def test_seeded_from_random():
+    sampler = list_sampler('disordered_list')
+    random.seed(5)
+    first = sampler.sample_batch(4, 30)
+    random.seed(5)
+    assert sampler.sample_batch(4, 30) == first
+
+
+def test_bad_weights():
+    with pytest.raises(GooseInputError):
+        ResidueSampler([1]*19)
+    with pytest.raises(GooseInputError):
+        ResidueSampler([0]*20)
+    with pytest.raises(GooseInputError):
+        ResidueSampler.from_list([])
+    with pytest.raises(GooseInputError):
+        ResidueSampler.from_list(['A', 'B'])
+    with pytest.raises(GooseInputError):
+        ResidueSampler.from_counts({'B': 1})
+    assert ResidueSampler.from_counts({'A': 1, 'K': 3}).probabilities['K'] == 0.75
@@ -0,0 +1,22 @@
+"""
+Tests for goose.backend.sequence_generation.
+"""
+from goose.backend import sequence_generation
+
+
+def test_batched_generation_uses_allowed_hydro_error(monkeypatch):
+    hydro_errors = []
+    def fake_create_seq_by_props(length, allowed_hydro_error=None, **kwargs):
+        hydro_errors.append(allowed_hydro_error)
+        return 'GSGSGSGSGSGSGSGSGSGS'
+    monkeypatch.setattr(sequence_generation, 'create_seq_by_props', fake_create_seq_by_props)
+    monkeypatch.setattr(sequence_generation, 'check_disorder_batch', lambda sequences, **kwargs: [True]*len(sequences))
+
+    sequences = sequence_generation.generate_disordered_seqs_by_props(20, num_seqs=2, hydropathy=3.0, batch_size=4,
+                                                                      allowed_hydro_error=0.5)
+    assert sequences == ['GSGSGSGSGSGSGSGSGSGS']*2
+    assert hydro_errors == [0.5]*4
+
+    hydro_errors.clear()
+    sequence_generation.generate_disordered_seq_by_props(20, hydropathy=3.0, batch_size=4, allowed_hydro_error=0.25)
+    assert hydro_errors == [0.25]*4